@@ -1,80 +1,310 @@
+import io
+import os
+import asyncio
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import torch
 from PIL import Image
 from fastapi import FastAPI, UploadFile, Form
 from transformers import (
-    Blip2Processor, 
+    Blip2Processor,
     Blip2ForConditionalGeneration,
-    WhisperProcessor, 
+    WhisperProcessor,
     WhisperForConditionalGeneration,
     pipeline
 )
 
 app = FastAPI()
 
-# Initialize models
 device = "cuda" if torch.cuda.is_available() else "cpu"
 
-# Image processing model
-blip_processor = Blip2Processor.from_pretrained("Salesforce/blip2-opt-2.7b")
-blip_model = Blip2ForConditionalGeneration.from_pretrained(
-    "Salesforce/blip2-opt-2.7b", load_in_8bit=True, device_map="auto"
-)
+# Inference settings
+SAMPLE_RATE = 16000
+WHISPER_WINDOW_SECONDS = 30  # Whisper only ever sees 30 seconds of audio per input
+WHISPER_STRIDE_SECONDS = float(os.environ.get("WHISPER_STRIDE_SECONDS", 5))  # Audio shared by consecutive windows
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 8))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 20))
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", 2))
+TORCH_THREADS = int(os.environ.get("TORCH_THREADS", 0))  # 0 = torch default (all cores)
 
-# Audio processing model
-whisper_processor = WhisperProcessor.from_pretrained("openai/whisper-small")
-whisper_model = WhisperForConditionalGeneration.from_pretrained(
-    "openai/whisper-small"
-).to(device)
-
-# Text summarization pipeline
-summarizer = pipeline(
-    "summarization",
-    model="philschmid/flan-t5-base-samsum",
-    device=0 if device == "cuda" else -1
-)
+if TORCH_THREADS:
+    torch.set_num_threads(TORCH_THREADS)
+
+# Models are loaded on first use, not at import, so the server starts in
+# seconds and a worker only pays for the models its requests actually need
+_models = {}
+_load_lock = threading.Lock()
+
+def _load(name, loader):
+    model = _models.get(name)
+    if model is None:
+        with _load_lock:
+            model = _models.get(name)
+            if model is None:
+                model = _models[name] = loader()
+    return model
+
+def get_blip():
+    def load():
+        processor = Blip2Processor.from_pretrained("Salesforce/blip2-opt-2.7b")
+        if device == "cuda":
+            # 8-bit weights need bitsandbytes, which only runs on GPU
+            model = Blip2ForConditionalGeneration.from_pretrained(
+                "Salesforce/blip2-opt-2.7b", load_in_8bit=True, device_map="auto"
+            )
+        else:
+            model = Blip2ForConditionalGeneration.from_pretrained("Salesforce/blip2-opt-2.7b")
+        return processor, model.eval()
+    return _load("blip", load)
+
+def get_whisper():
+    def load():
+        processor = WhisperProcessor.from_pretrained("openai/whisper-small")
+        model = WhisperForConditionalGeneration.from_pretrained("openai/whisper-small").to(device)
+        return processor, model.eval()
+    return _load("whisper", load)
+
+def get_summarizer():
+    return _load("summarizer", lambda: pipeline(
+        "summarization",
+        model="philschmid/flan-t5-base-samsum",
+        device=0 if device == "cuda" else -1
+    ))
+
+def preload_models():
+    """
+    Load every model now instead of on first use.
+
+    Run under a pre-forking server (gunicorn --preload with uvicorn workers)
+    with PRELOAD_MODELS=1, the weights are loaded once in the master process
+    and shared copy-on-write by every forked worker instead of each worker
+    holding its own copy. Inference never writes to the weights, so the
+    pages stay shared.
+    """
+    get_whisper()
+    get_blip()
+    get_summarizer()
+
+if os.environ.get("PRELOAD_MODELS", "").lower() in ("1", "true", "yes"):
+    preload_models()
+
+# Inference runs here, off the event loop; torch releases the GIL inside its kernels
+_executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+
+class DynamicBatcher:
+    """
+    Groups concurrent requests into one batched forward pass.
+
+    A batch is run as soon as max_size items are waiting, or max_wait_ms
+    after the first item arrived, whichever comes first. Under load this
+    trades a few milliseconds of latency for far fewer, larger forward
+    passes; with a single request in flight it adds at most max_wait_ms.
+    """
+
+    def __init__(self, batch_fn, max_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        """
+        Args:
+            batch_fn (callable): Takes a list of inputs and returns a list of outputs in the same order
+            max_size (int): Largest batch
+            max_wait_ms (float): Longest a request waits for others to join its batch
+        """
+        self.batch_fn = batch_fn
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+
+    async def submit(self, item):
+        """Queue one input and wait for its output."""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def submit_many(self, items):
+        """Queue several inputs at once; they may share batches with other requests."""
+        return await asyncio.gather(*(self.submit(item) for item in items))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(_executor, self.batch_fn, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+def iter_audio_windows(audio_file, window_seconds=WHISPER_WINDOW_SECONDS, stride_seconds=WHISPER_STRIDE_SECONDS):
+    # Decode audio with ffmpeg as it streams in and cut it into overlapping
+    # windows of 16 kHz mono float32; only one window is held in memory
+    process = subprocess.Popen(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", "pipe:1"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+
+    def feed():
+        try:
+            while True:
+                chunk = audio_file.read(1024 * 1024)
+                if not chunk:
+                    break
+                process.stdin.write(chunk)
+        except BrokenPipeError:
+            pass
+        finally:
+            process.stdin.close()
 
-def process_audio(audio_file):
-    # Convert audio to text using Whisper
-    audio_input = whisper_processor(
-        audio_file.read(), 
-        sampling_rate=16000, 
+    threading.Thread(target=feed, daemon=True).start()
+
+    window = int(window_seconds * SAMPLE_RATE)
+    hop = window - int(stride_seconds * SAMPLE_RATE)
+    buffer = np.zeros(0, dtype=np.float32)
+    start = 0
+    try:
+        while True:
+            data = process.stdout.read((window - len(buffer)) * 4)
+            buffer = np.concatenate([buffer, np.frombuffer(data, dtype=np.float32)])
+            if len(buffer) < window:
+                # End of the audio; skip a tail that only repeats the previous window's overlap
+                if len(buffer) > (window - hop if start else 0):
+                    yield start / SAMPLE_RATE, buffer
+                break
+            yield start / SAMPLE_RATE, buffer
+            buffer = buffer[hop:]
+            start += hop
+    finally:
+        process.stdout.close()
+        process.wait()
+
+def transcribe_windows(windows):
+    # Transcribe up to 30-second windows of 16 kHz audio in one forward pass,
+    # returning timestamped segments relative to the start of each window
+    whisper_processor, whisper_model = get_whisper()
+    input_features = whisper_processor(
+        windows,
+        sampling_rate=SAMPLE_RATE,
         return_tensors="pt"
-    ).input_values.to(device)
-    
-    predicted_ids = whisper_model.generate(audio_input)
-    transcript = whisper_processor.batch_decode(predicted_ids, skip_special_tokens=True)
-    return transcript[0]
+    ).input_features.to(device)
+
+    with torch.inference_mode():
+        predicted_ids = whisper_model.generate(input_features, return_timestamps=True)
+    decoded = whisper_processor.batch_decode(predicted_ids, skip_special_tokens=True, output_offsets=True)
+
+    results = []
+    for window, output in zip(windows, decoded):
+        length = len(window) / SAMPLE_RATE
+        results.append([
+            {
+                "start": offset["timestamp"][0] or 0.0,
+                "end": offset["timestamp"][1] if offset["timestamp"][1] is not None else length,
+                "text": offset["text"].strip()
+            }
+            for offset in output["offsets"] if offset["text"].strip()
+        ])
+    return results
+
+def merge_windows(window_results, stride_seconds=WHISPER_STRIDE_SECONDS):
+    # Consecutive windows share stride_seconds of audio; each segment in the
+    # overlap is kept from whichever window has its midpoint further from the edge
+    segments = []
+    for index, (start, window_segments) in enumerate(window_results):
+        owned_from = start + stride_seconds / 2 if index else float("-inf")
+        owned_to = window_results[index + 1][0] + stride_seconds / 2 if index + 1 < len(window_results) else float("inf")
+        for segment in window_segments:
+            segment_start, segment_end = start + segment["start"], start + segment["end"]
+            if owned_from <= (segment_start + segment_end) / 2 < owned_to:
+                segments.append({"start": segment_start, "end": segment_end, "text": segment["text"]})
+    return segments
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
 
-def process_image(image_file):
+def caption_images(images):
+    # Describe a batch of images with BLIP-2
+    blip_processor, blip_model = get_blip()
+    inputs = blip_processor(images=images, return_tensors="pt").to(device)
+
+    with torch.inference_mode():
+        generated_ids = blip_model.generate(**inputs, max_new_tokens=100)
+    return [text.strip() for text in blip_processor.batch_decode(generated_ids, skip_special_tokens=True)]
+
+whisper_batcher = DynamicBatcher(transcribe_windows)
+blip_batcher = DynamicBatcher(caption_images)
+
+async def process_audio(audio_file):
+    # Transcribe a recording of any length using Whisper. Windows are decoded
+    # while earlier ones are transcribed, and at most two batches of windows
+    # per request are in memory at once
+    windows = iter_audio_windows(audio_file)
+    in_flight = []
+    window_results = []
+    try:
+        while True:
+            group = await asyncio.to_thread(lambda: [window for _, window in zip(range(BATCH_MAX_SIZE), windows)])
+            if not group:
+                break
+            starts = [start for start, _ in group]
+            in_flight.append((starts, asyncio.ensure_future(whisper_batcher.submit_many([samples for _, samples in group]))))
+            if len(in_flight) > 1:
+                starts, task = in_flight.pop(0)
+                window_results.extend(zip(starts, await task))
+        for starts, task in in_flight:
+            window_results.extend(zip(starts, await task))
+    finally:
+        windows.close()
+    return merge_windows(window_results)
+
+async def process_image(data):
     # Process image with BLIP-2
-    raw_image = Image.open(image_file).convert("RGB")
-    inputs = blip_processor(raw_image, return_tensors="pt").to(device)
-    
-    generated_ids = blip_model.generate(**inputs, max_new_tokens=100)
-    description = blip_processor.batch_decode(generated_ids, skip_special_tokens=True)
-    return description[0]
+    loop = asyncio.get_running_loop()
+    raw_image = await loop.run_in_executor(_executor, lambda: Image.open(io.BytesIO(data)).convert("RGB"))
+    return await blip_batcher.submit(raw_image)
 
 def generate_summary(texts):
     # Combine and summarize information
     combined_text = "\n".join(texts)
-    
+
     # Structured summary prompt
     prompt = f"""Generate structured meeting summary with these sections:
     1. Key Decisions
     2. Action Items
     3. Technical Insights
     4. Next Steps
-    
+
     Input: {combined_text}
     Summary:"""
-    
-    summary = summarizer(
+
+    summary = get_summarizer()(
         prompt,
         max_length=500,
         do_sample=True,
         temperature=0.7,
     )[0]['summary_text']
-    
+
     return summary
 
 @app.post("/process_meeting")
@@ -83,26 +313,38 @@ async def process_meeting(
     images: list[UploadFile] = None,
     text: str = Form(None)
 ):
+    image_data = [await image.read() for image in images or []]
+
+    # Audio and images are processed concurrently, batched with other requests
+    audio_task = asyncio.ensure_future(process_audio(audio.file)) if audio else None
+    image_texts = await asyncio.gather(*(process_image(data) for data in image_data))
+
     processed_texts = []
-    
-    if audio:
-        processed_texts.append(f"Audio Transcript: {process_audio(audio.file)}")
-        
-    if images:
-        for image in images:
-            img_text = process_image(image.file)
-            processed_texts.append(f"Image Description: {img_text}")
-    
+    segments = []
+
+    if audio_task:
+        segments = await audio_task
+        lines = "\n".join(
+            f"[{format_timestamp(segment['start'])} - {format_timestamp(segment['end'])}] {segment['text']}"
+            for segment in segments
+        )
+        processed_texts.append(f"Audio Transcript:\n{lines}")
+
+    for img_text in image_texts:
+        processed_texts.append(f"Image Description: {img_text}")
+
     if text:
         processed_texts.append(f"Additional Notes: {text}")
-    
-    summary = generate_summary(processed_texts)
-    
+
+    loop = asyncio.get_running_loop()
+    summary = await loop.run_in_executor(_executor, generate_summary, processed_texts)
+
     return {
         "transcript": "\n".join(processed_texts),
+        "segments": segments,
         "summary": summary
     }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
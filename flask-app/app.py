@@ -1,48 +1,179 @@
 import os
+import sqlite3
 import logging
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from sqlalchemy.orm import DeclarativeBase
-from datetime import datetime
-import uuid
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 
 class Base(DeclarativeBase):
     pass
 
-# Initialize SQLAlchemy
+# Initialize SQLAlchemy; bound to an application by create_app
 db = SQLAlchemy(model_class=Base)
 
-# Create the Flask app
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET")
+def configure_logging():
+    """Configure root logging for an entry point (main.py, worker.py, gunicorn.conf.py) from LOG_LEVEL."""
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "DEBUG").upper())
 
-# Configure the database
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///meeting_assistant.db")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
+def create_app():
+    """
+    Create and configure the Flask application.
 
-# Configure file uploads
-app.config["UPLOAD_FOLDER"] = os.path.join(os.getcwd(), "uploads")
-app.config["MAX_CONTENT_LENGTH"] = 100 * 1024 * 1024  # 100GB limit
-app.config["ALLOWED_EXTENSIONS"] = {"mp3", "wav", "m4a", "ogg"}
+    Importing this module has no side effects: nothing here opens a database
+    connection, creates an API client or starts a thread. Each process calls
+    create_app once. The schema is set up here when DB_AUTO_INIT is on (the
+    default); with it off, run `flask init-db` once per deploy instead.
+    Background workers are started separately, see start_workers.
 
-# Create uploads directory if it doesn't exist
-os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    Returns:
+        Flask: The application
+    """
+    # Create the Flask app
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET")
+    
+    # Configure the database
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///meeting_assistant.db")
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+    }
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        # Each gunicorn worker has its own pool; size them so workers * (pool_size + max_overflow) fits max_connections
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"].update({
+            "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+            "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+            "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        })
+    
+    # SQLite settings applied to every new connection. WAL lets readers run
+    # alongside the single writer, the busy timeout makes writers queue instead
+    # of failing with "database is locked", and synchronous=NORMAL is durable
+    # across application crashes in WAL mode while skipping most fsyncs.
+    app.config["SQLITE_JOURNAL_MODE"] = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    app.config["SQLITE_BUSY_TIMEOUT_MS"] = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 30000))
+    app.config["SQLITE_SYNCHRONOUS"] = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    
+    # Configure file uploads
+    app.config["UPLOAD_FOLDER"] = os.path.join(os.getcwd(), "uploads")
+    app.config["MAX_CONTENT_LENGTH"] = 100 * 1024 * 1024  # 100GB limit
+    app.config["ALLOWED_EXTENSIONS"] = {"mp3", "wav", "m4a", "ogg"}
+    app.config["UPLOAD_CHUNK_SIZE"] = int(os.environ.get("UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+    app.config["MAX_UPLOAD_SIZE"] = int(os.environ.get("MAX_UPLOAD_SIZE", 2 * 1024 * 1024 * 1024))  # Total size for chunked uploads
+    app.config["UPLOAD_SESSION_TTL"] = int(os.environ.get("UPLOAD_SESSION_TTL", 24 * 3600))  # Unfinished uploads idle this long are deleted
+    app.config["HISTORY_PAGE_SIZE"] = int(os.environ.get("HISTORY_PAGE_SIZE", 25))
+    app.config["SEARCH_RESULT_LIMIT"] = int(os.environ.get("SEARCH_RESULT_LIMIT", 20))
+    app.config["ASK_PASSAGE_LIMIT"] = int(os.environ.get("ASK_PASSAGE_LIMIT", 8))  # Transcript passages sent with each question
+    
+    # Configure status updates pushed to the summary page
+    app.config["STATUS_CHECK_INTERVAL"] = float(os.environ.get("STATUS_CHECK_INTERVAL", 1.0))
+    app.config["STATUS_LONG_POLL_SECONDS"] = int(os.environ.get("STATUS_LONG_POLL_SECONDS", 30))
+    app.config["SSE_MAX_SECONDS"] = int(os.environ.get("SSE_MAX_SECONDS", 300))
+    # Each open stream holds a server thread; keep this well below the threads per process (see gunicorn.conf.py)
+    app.config["SSE_MAX_STREAMS"] = int(os.environ.get("SSE_MAX_STREAMS", 4))
+    app.config["SSE_RETRY_MS"] = int(os.environ.get("SSE_RETRY_MS", 5000))  # Client reconnect delay after a stream ends
+    
+    # Configure background processing
+    app.config["WORKER_COUNT"] = int(os.environ.get("WORKER_COUNT", 2))  # 0 = run worker.py separately
+    app.config["JOB_MAX_ATTEMPTS"] = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+    app.config["JOB_POLL_INTERVAL"] = float(os.environ.get("JOB_POLL_INTERVAL", 2.0))
+    app.config["JOB_RETRY_DELAY"] = int(os.environ.get("JOB_RETRY_DELAY", 30))
+    app.config["JOB_STALE_SECONDS"] = int(os.environ.get("JOB_STALE_SECONDS", 1800))
+    app.config["JOB_HEARTBEAT_SECONDS"] = int(os.environ.get("JOB_HEARTBEAT_SECONDS", 60))  # While a job runs
+    # Lowest job priority this process's workers claim; unset = all (bulk imports are -10, see jobs.py)
+    app.config["JOB_MIN_PRIORITY"] = int(os.environ["JOB_MIN_PRIORITY"]) if os.environ.get("JOB_MIN_PRIORITY") else None
+    app.config["IMPORT_BATCH_SIZE"] = int(os.environ.get("IMPORT_BATCH_SIZE", 500))
+    
+    # Create and upgrade the schema in create_app; turn off to run `flask init-db` once per deploy instead
+    app.config["DB_AUTO_INIT"] = os.environ.get("DB_AUTO_INIT", "true").lower() in ("1", "true", "yes")
+    
+    # Create uploads directory if it doesn't exist
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    
+    # Initialize SQLAlchemy with app
+    db.init_app(app)
+    
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", lambda dbapi_connection, record: _configure_sqlite(app, dbapi_connection))
+        
+        # Import models, routes and commands here to avoid circular imports
+        import models
+        from routes import register_routes
+        register_routes(app)
+        from importer import register_commands
+        register_commands(app)
+        import vector_index
+        vector_index.register_commands(app)
+        import uploads
+        uploads.register_commands(app)
+        
+        if app.config["DB_AUTO_INIT"]:
+            init_db()
+    
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create the tables and bring an existing database up to date."""
+        init_db()
+        click.echo("Database is up to date")
+    
+    return app
 
-# Initialize SQLAlchemy with app
-db.init_app(app)
+def _configure_sqlite(app, dbapi_connection):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}")
+    cursor.execute(f"PRAGMA busy_timeout={app.config['SQLITE_BUSY_TIMEOUT_MS']}")
+    cursor.execute(f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}")
+    cursor.close()
 
-# Import routes after app initialization to avoid circular imports
-with app.app_context():
-    # Import models and create tables
-    import models
+def init_db():
+    """Create missing tables, upgrade existing ones and build the search index. Needs an app context."""
     db.create_all()
-    
-    # Import and register routes
-    from routes import register_routes
-    register_routes(app)
+    from migrations import upgrade_schema
+    upgrade_schema()
+    from search import ensure_search_index
+    ensure_search_index()
+
+def start_workers(app):
+    """
+    Start this process's background workers; jobs left pending by a previous run are picked up again.
+
+    Live meetings abandoned by a previous run are finished from their
+    recordings (see live.recover_live_meetings).
+
+    Call after any fork (see gunicorn.conf.py), since threads do not survive one.
+
+    Args:
+        app: The Flask application
+
+    Returns:
+        WorkerPool or None: The running pool, None when WORKER_COUNT is 0
+    """
+    from routes import process_meeting_recording
+    from jobs import start_worker_pool
+    from live import recover_live_meetings
+    with app.app_context():
+        recover_live_meetings()
+        db.session.remove()
+    return start_worker_pool(app, process_meeting_recording)
+
+def after_fork(app):
+    """
+    Prepare a forked child of a process that already created the app, e.g. a preloaded gunicorn worker.
+
+    Pooled database connections inherited from the parent are dropped
+    without closing them, so the parent's connections stay usable. The
+    OpenAI clients, result cache, vector index and worker pool reset
+    themselves in the child (see their os.register_at_fork hooks).
+
+    Args:
+        app: The Flask application
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
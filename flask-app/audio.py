@@ -0,0 +1,231 @@
+import io
+import re
+import sys
+import wave
+import shutil
+import logging
+import subprocess
+from array import array
+
+logger = logging.getLogger(__name__)
+
+FFMPEG = shutil.which("ffmpeg")
+FFPROBE = shutil.which("ffprobe")
+
+_SILENCE_START = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end: (-?[\d.]+)")
+
+def ffmpeg_available():
+    """Whether the ffmpeg and ffprobe binaries are installed."""
+    return bool(FFMPEG and FFPROBE)
+
+def probe_duration(audio_file_path):
+    """
+    Get the duration of an audio file without decoding it.
+
+    Args:
+        audio_file_path (str): Path to the audio file
+
+    Returns:
+        float: Duration in seconds
+    """
+    output = subprocess.run(
+        [FFPROBE, "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", audio_file_path],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip())
+
+def detect_silences(audio_file_path, noise_db=-35, min_silence=0.5):
+    """
+    Find silent stretches in an audio file.
+
+    ffmpeg streams through the file, so memory use does not depend on its length.
+
+    Args:
+        audio_file_path (str): Path to the audio file
+        noise_db (int): Volume in dB below which audio counts as silence
+        min_silence (float): Shortest silence to report, in seconds
+
+    Returns:
+        list: (start, end) tuples in seconds
+    """
+    result = subprocess.run(
+        [FFMPEG, "-hide_banner", "-nostats", "-i", audio_file_path,
+         "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}", "-f", "null", "-"],
+        capture_output=True, text=True, check=True
+    )
+    silences = []
+    start = None
+    for line in result.stderr.splitlines():
+        match = _SILENCE_START.search(line)
+        if match:
+            start = max(float(match.group(1)), 0.0)
+            continue
+        match = _SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+def plan_segments(duration, silences, segment_seconds, overlap_seconds, search_seconds=30):
+    """
+    Choose where to split a recording into segments.
+
+    Each cut is placed in the middle of the last silence within search_seconds
+    before the target length, or at the target length if there is none. Every
+    segment also starts overlap_seconds before the previous cut and runs
+    overlap_seconds past its own, so that words spoken across a hard cut are
+    heard whole by both segments; each is kept by the segment it starts in.
+
+    Args:
+        duration (float): Length of the recording in seconds
+        silences (list): (start, end) tuples from detect_silences
+        segment_seconds (float): Target segment length
+        overlap_seconds (float): Audio shared by consecutive segments
+        search_seconds (float): How far before the target to look for silence
+
+    Returns:
+        list: (start, begin, cut, end) tuples; audio in [start, end) is
+        transcribed and text starting in [begin, cut) belongs to this segment
+        (the last segment's cut is the end of the recording)
+    """
+    segments = []
+    begin = 0.0
+    while begin < duration:
+        start = max(begin - overlap_seconds, 0.0)
+        target = begin + segment_seconds
+        if target >= duration:
+            segments.append((start, begin, duration, duration))
+            break
+
+        cut = target
+        for silence_start, silence_end in reversed(silences):
+            midpoint = (silence_start + silence_end) / 2
+            if target - search_seconds <= midpoint <= target and midpoint > begin:
+                cut = midpoint
+                break
+
+        segments.append((start, begin, cut, min(cut + overlap_seconds, duration)))
+        begin = cut
+    return segments
+
+def extract_segment(audio_file_path, start, duration, output_path):
+    """
+    Cut a segment out of an audio file, re-encoded as mono MP3, or as Opus if output_path ends in .ogg.
+
+    Args:
+        audio_file_path (str): Path to the source audio file
+        start (float): Segment start in seconds
+        duration (float): Segment length in seconds
+        output_path (str): Where to write the segment
+    """
+    codec = ["-c:a", "libopus", "-b:a", "24k", "-application", "voip"] if output_path.endswith(".ogg") else ["-b:a", "64k"]
+    subprocess.run(
+        [FFMPEG, "-hide_banner", "-loglevel", "error", "-y",
+         "-ss", f"{start:.3f}", "-t", f"{duration:.3f}", "-i", audio_file_path,
+         "-ac", "1", *codec, output_path],
+        check=True
+    )
+
+def speech_bounds(audio_file_path, noise_db=-50, min_silence=1.0):
+    """
+    Find where speech starts and ends, ignoring leading and trailing silence.
+
+    Args:
+        audio_file_path (str): Path to the audio file
+        noise_db (int): Volume in dB below which audio counts as silence
+        min_silence (float): Shortest silence worth trimming, in seconds
+
+    Returns:
+        tuple: (start, end) in seconds
+    """
+    duration = probe_duration(audio_file_path)
+    silences = detect_silences(audio_file_path, noise_db, min_silence)
+    start, end = 0.0, duration
+    if silences and silences[0][0] <= 0.05:
+        start = silences[0][1]
+    if silences and silences[-1][1] >= duration - 0.05 and silences[-1][0] > start:
+        end = silences[-1][0]
+    if end <= start:
+        # Nothing but silence; keep the recording whole rather than sending an empty file
+        return 0.0, duration
+    return start, end
+
+def preprocess(audio_file_path, output_path, sample_rate=16000, bitrate="24k", trim_silence=True):
+    """
+    Shrink a recording for transcription: mono, resampled, trimmed and re-encoded as Opus.
+
+    Speech recognition models work on 16 kHz mono audio anyway, so this
+    drops nothing they use. ffmpeg streams through the file in both passes,
+    so memory use does not depend on its length.
+
+    Args:
+        audio_file_path (str): Path to the source recording
+        output_path (str): Where to write the result; should end in .ogg
+        sample_rate (int): Output sample rate in Hz
+        bitrate (str): Opus bitrate, e.g. "24k"
+        trim_silence (bool): Whether to cut leading and trailing silence
+
+    Returns:
+        float: Seconds trimmed from the start; add it to timestamps in the
+        output to get timestamps in the original recording
+    """
+    start, end = speech_bounds(audio_file_path) if trim_silence else (0.0, None)
+    command = [FFMPEG, "-hide_banner", "-loglevel", "error", "-y", "-ss", f"{start:.3f}"]
+    if end is not None:
+        command += ["-t", f"{end - start:.3f}"]
+    command += [
+        "-i", audio_file_path, "-vn", "-map_metadata", "-1",
+        "-ac", "1", "-ar", str(sample_rate),
+        "-c:a", "libopus", "-b:a", bitrate, "-application", "voip",
+        output_path
+    ]
+    subprocess.run(command, check=True)
+    return start
+
+def pcm_to_wav(pcm, sample_rate=16000):
+    """
+    Wrap raw 16-bit little-endian mono PCM in a WAV container.
+
+    Args:
+        pcm (bytes): The samples
+        sample_rate (int): Sample rate in Hz
+
+    Returns:
+        bytes: A complete WAV file
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+def quietest_cut(pcm, sample_rate=16000, search_seconds=2.0, block_seconds=0.1):
+    """
+    Pick a place near the end of a PCM buffer to cut it, preferring a pause in speech.
+
+    Args:
+        pcm (bytes): 16-bit little-endian mono samples
+        sample_rate (int): Sample rate in Hz
+        search_seconds (float): How far back from the end to look
+        block_seconds (float): Resolution of the search
+
+    Returns:
+        int: Byte offset of the start of the quietest block in the search range
+    """
+    block_bytes = int(sample_rate * block_seconds) * 2
+    search_start = max(0, len(pcm) - int(sample_rate * search_seconds) * 2)
+    search_start -= search_start % 2
+
+    best_offset, best_energy = len(pcm), None
+    for offset in range(search_start, len(pcm) - block_bytes + 1, block_bytes):
+        samples = array("h", pcm[offset:offset + block_bytes])
+        if sys.byteorder == "big":
+            samples.byteswap()
+        energy = sum(sample * sample for sample in samples)
+        if best_energy is None or energy < best_energy:
+            best_offset, best_energy = offset, energy
+    return best_offset
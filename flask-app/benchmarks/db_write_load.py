@@ -0,0 +1,190 @@
+"""
+Database write load test: many processes running the pipeline's writes at once.
+
+Each process creates the app (as a gunicorn worker would) and runs threads
+that upload meetings and push them through process_meeting_recording, with
+the OpenAI calls replaced by sleeps of --api-latency-ms. Reader threads page
+through the history at the same time. Reports meetings per second, latency
+of the database work itself (time beyond the simulated API calls), and
+"database is locked" failures.
+
+    python benchmarks/db_write_load.py --processes 4 --threads 4 --meetings 25
+    python benchmarks/db_write_load.py --compare-untuned
+
+--compare-untuned runs the same load twice: with SQLite's defaults (rollback
+journal, synchronous=FULL, 5 s busy timeout) and with the app's tuned
+settings, so the effect of the configuration shows in one report.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import multiprocessing
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+UNTUNED_SQLITE = {"SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL", "SQLITE_BUSY_TIMEOUT_MS": "5000"}
+
+def _percentile(sorted_samples, percent):
+    if not sorted_samples:
+        return None
+    rank = max(1, -(-len(sorted_samples) * percent // 100))
+    return sorted_samples[int(rank) - 1]
+
+def _worker(index, args, env, results):
+    os.environ.update(env)
+    os.chdir(env["BENCHMARK_WORKDIR"])
+    sys.path.insert(0, APP_DIR)
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    from app import create_app, db, init_db
+    app = create_app()
+    import routes
+    from models import Meeting
+    from jobs import enqueue_meeting
+
+    api_latency = args.api_latency_ms / 1000
+    transcript = "We agreed to ship the release on Friday and Sam will update the changelog. " * 200
+
+    def fake_transcribe(file_path):
+        time.sleep(api_latency)
+        return {"text": transcript, "segments": [{"start": 0.0, "end": 5.0, "text": transcript[:80]}]}
+
+    def fake_summary(text, on_item=None):
+        time.sleep(api_latency)
+        return {
+            "summary": "Release planning.",
+            "decisions": ["Ship the release on Friday"],
+            "action_items": [{"task": "Update the changelog", "assignee": "Sam", "deadline": "2026-11-01"}]
+        }
+
+    routes.transcribe_audio_with_segments = fake_transcribe
+    routes.generate_meeting_summary = fake_summary
+    if index < 0:
+        with app.app_context():
+            init_db()
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_readers = threading.Event()
+
+    def writer(thread_index):
+        for n in range(args.meetings):
+            started = time.perf_counter()
+            try:
+                with app.app_context():
+                    meeting = Meeting(
+                        title=f"Load {index}-{thread_index}-{n}",
+                        recording_filename="load.mp3",
+                        original_filename="load.mp3"
+                    )
+                    db.session.add(meeting)
+                    db.session.flush()
+                    enqueue_meeting(meeting.id, "load.mp3")
+                    db.session.commit()
+                    meeting_id = meeting.id
+                    routes.process_meeting_recording(meeting_id, "load.mp3")
+                    db.session.remove()
+            except Exception as e:
+                with lock:
+                    errors.append(str(e).splitlines()[0])
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started - 2 * api_latency)
+
+    def reader():
+        while not stop_readers.is_set():
+            try:
+                with app.app_context():
+                    routes.list_meetings_page(None, 25)
+                    db.session.remove()
+            except Exception as e:
+                with lock:
+                    errors.append(str(e).splitlines()[0])
+            time.sleep(0.01)
+
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(args.threads)]
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop_readers.set()
+    for thread in readers:
+        thread.join()
+    results.put({"latencies": latencies, "errors": errors})
+
+def run(args, extra_env):
+    workdir = tempfile.mkdtemp(prefix="db-load-")
+    env = {
+        "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        "OPENAI_API_KEY": "load-test",
+        "SESSION_SECRET": "load-test",
+        "WORKER_COUNT": "0",
+        "RESULT_CACHE_PATH": "",
+        "EMBEDDER": "none",
+        "DB_AUTO_INIT": "false",
+        "BENCHMARK_WORKDIR": workdir,
+        **extra_env
+    }
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    # Create the schema once so the workers do not race to migrate it
+    setup = context.Process(target=_worker, args=(-1, argparse.Namespace(**{**vars(args), "meetings": 0, "readers": 0}), env, results))
+    setup.start()
+    results.get()
+    setup.join()
+
+    started = time.monotonic()
+    processes = [context.Process(target=_worker, args=(i, args, env, results)) for i in range(args.processes)]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.monotonic() - started
+
+    latencies = sorted(latency for result in collected for latency in result["latencies"])
+    errors = [error for result in collected for error in result["errors"]]
+    return {
+        "settings": extra_env or "app defaults",
+        "meetings": len(latencies),
+        "failed": len(errors),
+        "locked_errors": sum("locked" in error for error in errors),
+        "meetings_per_second": len(latencies) / elapsed,
+        "db_p50_ms": (_percentile(latencies, 50) or 0) * 1000,
+        "db_p95_ms": (_percentile(latencies, 95) or 0) * 1000,
+        "db_p99_ms": (_percentile(latencies, 99) or 0) * 1000,
+        "wall_seconds": elapsed,
+        "sample_errors": sorted(set(errors))[:5]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4, help="Processes, like gunicorn workers")
+    parser.add_argument("--threads", type=int, default=4, help="Writer threads per process")
+    parser.add_argument("--readers", type=int, default=2, help="History reader threads per process")
+    parser.add_argument("--meetings", type=int, default=25, help="Meetings processed by each writer thread")
+    parser.add_argument("--api-latency-ms", type=float, default=200, help="Simulated duration of each OpenAI call")
+    parser.add_argument("--database-url", help="Database to load (default: a fresh SQLite file)")
+    parser.add_argument("--compare-untuned", action="store_true", help="Also run with SQLite's default settings")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    report = {"config": vars(args), "runs": []}
+    if args.compare_untuned:
+        report["runs"].append(run(args, UNTUNED_SQLITE))
+    report["runs"].append(run(args, {}))
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+A local stand-in for the OpenAI API, for benchmarks and offline runs.
+
+Serves the endpoints the app uses (audio transcriptions, chat completions,
+embeddings, and files and batches for batch summaries) with configurable latency, error rate and a requests-per-minute limit that
+answers 429 with Retry-After, like the real service.
+
+    python benchmarks/fake_openai.py --port 8100 --latency-ms 800 --error-rate 0.02 --rpm 600
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8100/v1.
+"""
+import json
+import time
+import uuid
+import zlib
+import base64
+import struct
+import random
+import argparse
+import threading
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUMMARY = {
+    "summary": "The team reviewed the release plan and agreed on next steps.",
+    "decisions": ["Ship the release on Friday"],
+    "action_items": [{"task": "Update the changelog", "assignee": "Sam", "deadline": "2026-11-01"}]
+}
+
+class FakeOpenAIConfig:
+    def __init__(self, latency_ms=500, jitter_ms=100, error_rate=0.0, rpm=0, transcript_words=600):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.transcript_words = transcript_words
+        self.requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.files = {}
+        self.batches = {}
+        self._window = []
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """Return seconds to wait if the request exceeds the rate limit, else None."""
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            if not self.rpm:
+                return None
+            self._window = [t for t in self._window if t > now - 60]
+            if len(self._window) >= self.rpm:
+                self.rate_limited += 1
+                return max(self._window[0] + 60 - now, 0.1)
+            self._window.append(now)
+            return None
+
+def make_handler(config):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            retry_after = config.admit()
+            if retry_after is not None:
+                return self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                       {"retry-after": f"{retry_after:.2f}"})
+
+            time.sleep(max(0, random.gauss(config.latency_ms, config.jitter_ms)) / 1000)
+            if random.random() < config.error_rate:
+                with config._lock:
+                    config.errors += 1
+                return self._send_json(500, {"error": {"message": "Injected failure", "type": "server_error"}})
+
+            if self.path.endswith("/audio/transcriptions"):
+                return self._send_json(200, self._transcription())
+            if self.path.endswith("/chat/completions"):
+                request = json.loads(body)
+                if request.get("stream"):
+                    return self._stream_chat_completion(request)
+                return self._send_json(200, self._chat_completion(request))
+            if self.path.endswith("/embeddings"):
+                return self._send_json(200, self._embeddings(json.loads(body)))
+            if self.path.endswith("/files"):
+                return self._send_json(200, self._upload_file(body))
+            if self.path.endswith("/batches"):
+                return self._send_json(200, self._create_batch(json.loads(body)))
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        def do_GET(self):
+            parts = self.path.rstrip("/").split("/")
+            if parts[-2] == "batches" and parts[-1] in config.batches:
+                return self._send_json(200, config.batches[parts[-1]])
+            if parts[-1] == "content" and parts[-2] in config.files:
+                content = config.files[parts[-2]]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+                return
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        def _upload_file(self, body):
+            message = BytesParser().parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+            )
+            content = next(part.get_payload(decode=True) for part in message.get_payload()
+                           if part.get_param("name", header="content-disposition") == "file")
+            file_id = f"file-{uuid.uuid4().hex}"
+            config.files[file_id] = content
+            return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                    "filename": "upload.jsonl", "purpose": "batch", "status": "processed"}
+
+        def _create_batch(self, request):
+            # Batches complete immediately; the real service takes minutes to hours
+            lines = []
+            for line in config.files[request["input_file_id"]].decode().splitlines():
+                item = json.loads(line)
+                lines.append(json.dumps({
+                    "id": f"batch_req_{uuid.uuid4().hex}", "custom_id": item["custom_id"],
+                    "response": {"status_code": 200, "request_id": "fake", "body": self._chat_completion(item["body"])},
+                    "error": None
+                }))
+            output_file_id = f"file-{uuid.uuid4().hex}"
+            config.files[output_file_id] = "\n".join(lines).encode()
+            batch_id = f"batch_{uuid.uuid4().hex}"
+            config.batches[batch_id] = {
+                "id": batch_id, "object": "batch", "endpoint": request["endpoint"], "errors": None,
+                "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+                "status": "completed", "output_file_id": output_file_id, "error_file_id": None,
+                "created_at": int(time.time()), "completed_at": int(time.time()),
+                "request_counts": {"total": len(lines), "completed": len(lines), "failed": 0},
+                "metadata": request.get("metadata")
+            }
+            return config.batches[batch_id]
+
+        def _transcription(self):
+            words = ["word"] * config.transcript_words
+            segments = []
+            for index in range(0, len(words), 30):
+                text = " ".join(words[index:index + 30]) + "."
+                segments.append({
+                    "id": len(segments), "seek": 0, "start": index * 0.4, "end": (index + 30) * 0.4,
+                    "text": text, "tokens": [], "temperature": 0.0, "avg_logprob": -0.2,
+                    "compression_ratio": 1.0, "no_speech_prob": 0.0
+                })
+            return {
+                "task": "transcribe", "language": "english", "duration": len(words) * 0.4,
+                "text": " ".join(segment["text"] for segment in segments), "segments": segments
+            }
+
+        def _chat_completion(self, request):
+            content = json.dumps(SUMMARY)
+            # Roughly four characters per token, like the real tokenizer on English text
+            prompt_tokens = sum(len(message.get("content") or "") for message in request.get("messages", [])) // 4
+            completion_tokens = len(content) // 4
+            return {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                "model": request.get("model", "gpt-3.5-turbo"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens}
+            }
+
+        def _embeddings(self, request):
+            # Pseudo-random but deterministic vectors, so the same text always embeds the same way
+            texts = request["input"] if isinstance(request["input"], list) else [request["input"]]
+            dimensions = request.get("dimensions") or 1536
+            data = []
+            for index, text in enumerate(texts):
+                seed = random.Random(zlib.crc32(text.encode("utf-8")))
+                vector = [seed.gauss(0, 1) for _ in range(dimensions)]
+                if request.get("encoding_format") == "base64":
+                    vector = base64.b64encode(struct.pack(f"<{dimensions}f", *vector)).decode()
+                data.append({"object": "embedding", "index": index, "embedding": vector})
+            tokens = sum(len(text) for text in texts) // 4
+            return {
+                "object": "list", "data": data, "model": request.get("model"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+            }
+
+        def _stream_chat_completion(self, request):
+            # Server-sent chunks of a few characters, spread over another latency_ms like real token generation
+            completion = self._chat_completion(request)
+            content = completion["choices"][0]["message"]["content"]
+            pieces = [content[i:i + 8] for i in range(0, len(content), 8)]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            def send(delta, finish_reason=None, usage=None):
+                chunk = {
+                    "id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"],
+                    "model": completion["model"],
+                    "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    "usage": usage
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+
+            send({"role": "assistant", "content": ""})
+            for piece in pieces:
+                time.sleep(config.latency_ms / 1000 / len(pieces))
+                send({"content": piece})
+            send({}, finish_reason="stop")
+            if (request.get("stream_options") or {}).get("include_usage"):
+                send({}, usage=completion["usage"])
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return Handler
+
+def start_fake_openai(port=0, **settings):
+    """
+    Start the fake API on a background thread.
+
+    Returns:
+        tuple: (server, config); the base URL is http://127.0.0.1:<server.server_port>/v1
+    """
+    config = FakeOpenAIConfig(**settings)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, config
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before answering 429 (0 = unlimited)")
+    args = parser.parse_args()
+
+    server, _ = start_fake_openai(
+        args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rpm=args.rpm
+    )
+    print(f"Fake OpenAI API listening on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
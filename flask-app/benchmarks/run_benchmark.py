@@ -0,0 +1,349 @@
+"""
+End-to-end benchmark of the app against the local fake OpenAI API.
+
+Starts the fake API in this process and the app in a subprocess (gunicorn
+when installed, otherwise the threaded Werkzeug server) with a throwaway
+database and upload folder, then drives /upload, /history and
+/api/meeting/<id> concurrently until every uploaded recording is processed.
+
+Reports p50/p95/p99 latency per endpoint, processed jobs per minute and the
+app's peak RSS, and writes them as JSON so runs can be compared:
+
+    python benchmarks/run_benchmark.py --uploads 50 --concurrency 8 --output results/main.json
+    python benchmarks/run_benchmark.py --uploads 50 --concurrency 8 --compare results/main.json
+
+With --compare the exit status is 1 if any metric regressed by more than
+--threshold percent, so the run can gate a deploy.
+"""
+import os
+import sys
+import io
+import json
+import time
+import uuid
+import wave
+import random
+import socket
+import argparse
+import resource
+import platform
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_openai import start_fake_openai
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metrics where a larger value is a regression; everything else is better when larger
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+class LatencyRecorder:
+    """Thread-safe collection of request timings for one endpoint."""
+
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self.samples.append(seconds)
+            if not ok:
+                self.errors += 1
+
+    def summary(self):
+        samples = sorted(self.samples)
+        if not samples:
+            return {"count": 0, "errors": self.errors}
+        return {
+            "count": len(samples),
+            "errors": self.errors,
+            "error_rate": self.errors / len(samples),
+            "p50_ms": _percentile(samples, 50) * 1000,
+            "p95_ms": _percentile(samples, 95) * 1000,
+            "p99_ms": _percentile(samples, 99) * 1000
+        }
+
+def _percentile(sorted_samples, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(sorted_samples) * percent // 100))
+    return sorted_samples[int(rank) - 1]
+
+def _request(url, data=None, headers=None, method=None):
+    """Send a request; returns (status, headers, body) without following redirects."""
+    req = urllib.request.Request(url, data=data, headers=headers or {}, method=method)
+    try:
+        with _opener.open(req, timeout=60) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+def _multipart(fields, filename, content):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: audio/mpeg\r\n\r\n'.encode() + content + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+def _silent_wav(size):
+    """A valid 16 kHz mono WAV file of about size bytes, mostly silence with a unique start."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        samples = max(size - 44, 64) // 2 * 2
+        wav.writeframes(os.urandom(32) + bytes(samples - 32))
+    return buffer.getvalue()
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_app(port, workdir, openai_url, args):
+    """Launch the app in a subprocess and wait until it answers."""
+    env = dict(
+        os.environ,
+        PYTHONPATH=APP_DIR,
+        OPENAI_BASE_URL=openai_url,
+        OPENAI_API_KEY="benchmark",
+        SESSION_SECRET="benchmark",
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+        RESULT_CACHE_PATH="",
+        WORKER_COUNT=str(args.workers),
+        JOB_POLL_INTERVAL="0.2",
+        JOB_RETRY_DELAY="1",
+        # Measure the app and the API round trips, not ffmpeg, whether or not it is installed
+        TRANSCRIBE_LONG_AUDIO="never",
+        AUDIO_PREPROCESS="never"
+    )
+    server = args.server
+    if server == "auto":
+        try:
+            import gunicorn  # noqa: F401
+            server = "gunicorn"
+        except ImportError:
+            server = "werkzeug"
+
+    if server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "--config", os.path.join(APP_DIR, "gunicorn.conf.py"),
+                   "--bind", f"127.0.0.1:{port}", "--workers", "1", "--threads", str(args.concurrency * 2), "main:app"]
+    else:
+        command = [sys.executable, "-c",
+                   f"from main import app, start_workers; start_workers(app); "
+                   f"app.run(host='127.0.0.1', port={port}, threaded=True, use_reloader=False)"]
+
+    log = open(os.path.join(workdir, "app.log"), "wb")
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited during startup, see {log.name}")
+        try:
+            if _request(base_url + "/")[0] == 200:
+                return process, server, base_url
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("App did not start within 60 seconds")
+
+def run(args):
+    fake, fake_config = start_fake_openai(
+        latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 5,
+        error_rate=args.error_rate, rpm=args.rpm
+    )
+    openai_url = f"http://127.0.0.1:{fake.server_port}/v1"
+    workdir = tempfile.mkdtemp(prefix="meeting-benchmark-")
+    process, server, base_url = start_app(_free_port(), workdir, openai_url, args)
+
+    recorders = {name: LatencyRecorder() for name in ("upload", "history", "meeting")}
+    meeting_ids = []
+    ids_lock = threading.Lock()
+    done = threading.Event()
+
+    def upload(index):
+        body, content_type = _multipart({"title": f"Benchmark meeting {index}"},
+                                        "meeting.wav", _silent_wav(args.file_kb * 1024))
+        started = time.perf_counter()
+        status, headers, _ = _request(base_url + "/upload", data=body, headers={"Content-Type": content_type})
+        location = headers.get("Location", "")
+        ok = status == 302 and "/summary/" in location
+        recorders["upload"].record(time.perf_counter() - started, ok)
+        if ok:
+            with ids_lock:
+                meeting_ids.append(location.rsplit("/", 1)[-1])
+
+    def read_traffic():
+        # Clients browsing history and polling meetings while uploads are processed
+        while not done.is_set():
+            if random.random() < 0.3:
+                started = time.perf_counter()
+                status = _request(base_url + "/history")[0]
+                recorders["history"].record(time.perf_counter() - started, status == 200)
+            else:
+                with ids_lock:
+                    meeting_id = random.choice(meeting_ids) if meeting_ids else None
+                if meeting_id is None:
+                    time.sleep(0.05)
+                    continue
+                started = time.perf_counter()
+                status = _request(f"{base_url}/api/meeting/{meeting_id}")[0]
+                recorders["meeting"].record(time.perf_counter() - started, status == 200)
+            time.sleep(args.think_ms / 1000)
+
+    started = time.monotonic()
+    readers = [threading.Thread(target=read_traffic, daemon=True) for _ in range(args.readers)]
+    for reader in readers:
+        reader.start()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(upload, range(args.uploads)))
+
+    # Wait for the workers to drain the queue
+    processed = failed = 0
+    pending = list(meeting_ids)
+    deadline = time.monotonic() + args.timeout
+    while pending and time.monotonic() < deadline:
+        remaining = []
+        for meeting_id in pending:
+            status, _, body = _request(f"{base_url}/api/meeting/{meeting_id}/status")
+            state = json.loads(body).get("status") if status == 200 else None
+            if state == "done":
+                processed += 1
+            elif state == "error":
+                failed += 1
+            else:
+                remaining.append(meeting_id)
+        pending = remaining
+        if pending:
+            time.sleep(0.5)
+    elapsed = time.monotonic() - started
+
+    done.set()
+    for reader in readers:
+        reader.join()
+    process.terminate()
+    process.wait()
+    fake.shutdown()
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "commit": _git_commit(),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {
+            "server": server, "uploads": args.uploads, "concurrency": args.concurrency,
+            "readers": args.readers, "workers": args.workers, "file_kb": args.file_kb,
+            "latency_ms": args.latency_ms, "error_rate": args.error_rate, "rpm": args.rpm
+        },
+        "endpoints": {name: recorder.summary() for name, recorder in recorders.items()},
+        "jobs": {
+            "processed": processed,
+            "failed": failed,
+            "unfinished": len(pending),
+            "jobs_per_minute": processed / elapsed * 60 if elapsed else 0.0
+        },
+        "openai": {"requests": fake_config.requests, "rate_limited": fake_config.rate_limited,
+                   "errors": fake_config.errors},
+        "peak_rss_mb": _children_peak_rss_mb(),
+        "wall_seconds": elapsed,
+        "workdir": workdir
+    }
+
+def _children_peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _flatten(results):
+    """The comparable metrics of a result file as {name: value}."""
+    metrics = {"jobs.jobs_per_minute": results["jobs"]["jobs_per_minute"], "peak_rss_mb": results["peak_rss_mb"]}
+    for endpoint, summary in results["endpoints"].items():
+        for key in ("p50_ms", "p95_ms", "p99_ms", "error_rate"):
+            if key in summary:
+                metrics[f"{endpoint}.{key}"] = summary[key]
+    return metrics
+
+def compare(baseline, current, threshold):
+    """
+    Print per-metric changes against a baseline run.
+
+    Returns:
+        list: Names of metrics that regressed by more than threshold percent
+    """
+    regressions = []
+    before, after = _flatten(baseline), _flatten(current)
+    print(f"{'metric':<24}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        if name.endswith("error_rate"):
+            # Rates are usually zero, so compare absolute percentage points
+            change = (new - old) * 100
+            worse = change > threshold
+        else:
+            change = (new - old) / old * 100 if old else 0.0
+            worse = change > threshold if name.endswith(LOWER_IS_BETTER) else change < -threshold
+        if worse:
+            regressions.append(name)
+        print(f"{name:<24}{old:>12.2f}{new:>12.2f}{change:>+9.1f}%{'  REGRESSION' if worse else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=20, help="Recordings to upload")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent uploaders")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent clients reading /history and /api/meeting")
+    parser.add_argument("--think-ms", type=float, default=100, help="Pause between a reader's requests")
+    parser.add_argument("--workers", type=int, default=2, help="Background worker threads in the app")
+    parser.add_argument("--file-kb", type=int, default=512, help="Size of each uploaded recording")
+    parser.add_argument("--latency-ms", type=float, default=300, help="Mean latency of the fake OpenAI API")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake API calls answering 500")
+    parser.add_argument("--rpm", type=int, default=0, help="Fake API requests per minute before 429 (0 = unlimited)")
+    parser.add_argument("--server", choices=("auto", "gunicorn", "werkzeug"), default="auto")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for processing to finish")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
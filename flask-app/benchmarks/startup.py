@@ -0,0 +1,136 @@
+"""
+Startup benchmark: how long a process takes to import, create the app and serve its first request.
+
+Each measurement runs in a fresh interpreter so nothing is already imported:
+
+- import: `import app` on its own, what every module, test and CLI pays
+- create_app: building the application, with and without schema setup (DB_AUTO_INIT)
+- first request: the home page through the test client
+
+Worker spawn is then measured both ways gunicorn can start --workers
+processes: "spawn" starts each in a fresh interpreter that creates its own
+app (no preload), "fork" creates the app once and forks the workers from it
+(preload_app, see gunicorn.conf.py). Reported is the time until every
+worker has served a request.
+
+    python benchmarks/startup.py --repeat 5 --workers 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _environment(workdir, auto_init):
+    return dict(
+        os.environ,
+        PYTHONPATH=APP_DIR,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        OPENAI_API_KEY="startup",
+        SESSION_SECRET="startup",
+        WORKER_COUNT="0",
+        RESULT_CACHE_PATH="",
+        EMBEDDER="none",
+        DB_AUTO_INIT="true" if auto_init else "false"
+    )
+
+def _measure_process():
+    """Runs in the child interpreter: time each startup stage and print them as JSON."""
+    started = time.perf_counter()
+    import app as app_module
+    imported = time.perf_counter()
+    app = app_module.create_app()
+    created = time.perf_counter()
+    status = app.test_client().get("/").status_code
+    served = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+        "first_request_ms": (served - created) * 1000,
+        "status": status
+    }))
+
+def _spawn_workers(workers):
+    """Runs in the child interpreter: start workers as fresh interpreters, time until all have served."""
+    started = time.perf_counter()
+    code = "import app; app.create_app().test_client().get('/')"
+    processes = [subprocess.Popen([sys.executable, "-c", code]) for _ in range(workers)]
+    failed = sum(process.wait() != 0 for process in processes)
+    print(json.dumps({"spawn_ms": (time.perf_counter() - started) * 1000, "failed": failed}))
+
+def _fork_workers(workers):
+    """Runs in the child interpreter: create the app once, fork workers from it, time until all have served."""
+    import app as app_module
+    app = app_module.create_app()
+    started = time.perf_counter()
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            app_module.after_fork(app)
+            code = 0 if app.test_client().get("/").status_code == 200 else 1
+            os._exit(code)
+        children.append(pid)
+    failed = sum(os.waitpid(pid, 0)[1] != 0 for pid in children)
+    print(json.dumps({"fork_ms": (time.perf_counter() - started) * 1000, "failed": failed}))
+
+def _run_child(mode, workdir, auto_init, workers=0):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--workers", str(workers)],
+        cwd=workdir, env=_environment(workdir, auto_init), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def _median(samples, key):
+    return statistics.median(sample[key] for sample in samples)
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="startup-benchmark-")
+    # Create the schema once, so later runs measure an up-to-date database like a restart does
+    _run_child("process", workdir, auto_init=True)
+
+    report = {"config": vars(args)}
+    for auto_init in (False, True):
+        samples = [_run_child("process", workdir, auto_init) for _ in range(args.repeat)]
+        report["db_auto_init" if auto_init else "deferred_init"] = {
+            "import_ms": _median(samples, "import_ms"),
+            "create_app_ms": _median(samples, "create_app_ms"),
+            "first_request_ms": _median(samples, "first_request_ms")
+        }
+    report["spawn_workers_ms"] = _median(
+        [_run_child("spawn", workdir, auto_init=True, workers=args.workers) for _ in range(args.repeat)], "spawn_ms"
+    )
+    if hasattr(os, "fork"):
+        report["fork_workers_ms"] = _median(
+            [_run_child("fork", workdir, auto_init=True, workers=args.workers) for _ in range(args.repeat)], "fork_ms"
+        )
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported")
+    parser.add_argument("--workers", type=int, default=4, help="Workers started in the spawn and fork measurements")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--child", choices=["process", "spawn", "fork"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import logging
+        logging.disable(logging.CRITICAL)
+        {"process": lambda: _measure_process(), "spawn": lambda: _spawn_workers(args.workers),
+         "fork": lambda: _fork_workers(args.workers)}[args.child]()
+        return
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import json
+import zipfile
+
+# Large fields are emitted in slices of this many characters so no single
+# chunk of the response holds a whole transcript
+CHUNK_CHARS = 64 * 1024
+
+def _slices(text):
+    text = text or ""
+    for start in range(0, len(text), CHUNK_CHARS):
+        yield text[start:start + CHUNK_CHARS]
+
+def iter_text(meeting):
+    """
+    Stream a meeting as plain text.
+
+    Args:
+        meeting (Meeting): A processed meeting
+
+    Yields:
+        str: Consecutive pieces of the export
+    """
+    yield f"MEETING SUMMARY: {meeting.title}\n"
+    yield f"Date: {meeting.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    yield "SUMMARY:\n"
+    yield from _slices(meeting.summary)
+    yield "\n\nDECISIONS:\n"
+    yield from _slices(meeting.decisions)
+    yield "\n\nACTION ITEMS:\n"
+    yield from _slices(meeting.action_items)
+    yield "\n\n--------------------------------------------------\n"
+    yield "Full Transcript:\n"
+    yield from _slices(meeting.transcript)
+    yield "\n"
+
+def iter_markdown(meeting):
+    """
+    Stream a meeting as Markdown.
+
+    Args:
+        meeting (Meeting): A processed meeting
+
+    Yields:
+        str: Consecutive pieces of the export
+    """
+    yield f"# {meeting.title}\n\n"
+    yield f"*{meeting.created_at.strftime('%Y-%m-%d %H:%M:%S')}*\n\n"
+    yield "## Summary\n\n"
+    yield from _slices(meeting.summary)
+    yield "\n\n## Decisions\n\n"
+    for line in (meeting.decisions or "").splitlines():
+        if line.strip():
+            yield f"- {line}\n"
+    yield "\n## Action Items\n\n"
+    for line in (meeting.action_items or "").splitlines():
+        if line.strip():
+            yield f"- [ ] {line}\n"
+    yield "\n## Transcript\n\n"
+    yield from _slices(meeting.transcript)
+    yield "\n"
+
+def iter_json(meeting):
+    """
+    Stream a meeting as a JSON object.
+
+    Args:
+        meeting (Meeting): A processed meeting
+
+    Yields:
+        str: Consecutive pieces of the export
+    """
+    yield "{"
+    fields = [
+        ("id", meeting.id),
+        ("title", meeting.title),
+        ("created_at", meeting.created_at.isoformat()),
+        ("summary", meeting.summary),
+        ("decisions", [line for line in (meeting.decisions or "").splitlines() if line.strip()]),
+        ("action_items", [line for line in (meeting.action_items or "").splitlines() if line.strip()])
+    ]
+    for key, value in fields:
+        yield f"{json.dumps(key)}: {json.dumps(value)}, "
+
+    # JSON string escaping works character by character, so the transcript can be encoded slice by slice
+    yield '"transcript": "'
+    for piece in _slices(meeting.transcript):
+        yield json.dumps(piece)[1:-1]
+    yield '"}'
+
+EXPORT_FORMATS = {
+    "txt": ("text/plain", iter_text),
+    "md": ("text/markdown", iter_markdown),
+    "json": ("application/json", iter_json)
+}
+
+def export_filename(meeting, extension):
+    """A filesystem-safe download name for a meeting export."""
+    safe_title = "".join([c for c in meeting.title if c.isalpha() or c.isdigit() or c == ' ']).rstrip()
+    safe_title = safe_title.replace(' ', '_')
+    return f"{safe_title}_{meeting.created_at.strftime('%Y%m%d')}.{extension}"
+
+class _ChunkSink:
+    """A write-only file object that collects what zipfile writes so it can be yielded."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def iter_zip(meetings, extension):
+    """
+    Stream a zip archive with one export per meeting.
+
+    The archive is produced incrementally: zipfile writes to a non-seekable
+    sink, so entries use data descriptors and nothing is staged on disk.
+
+    Args:
+        meetings (iterable): Processed meetings, loaded lazily by the caller
+        extension (str): One of EXPORT_FORMATS
+
+    Yields:
+        bytes: Consecutive pieces of the archive
+    """
+    iter_export = EXPORT_FORMATS[extension][1]
+    sink = _ChunkSink()
+    used_names = set()
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for meeting in meetings:
+            name = export_filename(meeting, extension)
+            if name in used_names:
+                name = f"{meeting.id}_{name}"
+            used_names.add(name)
+
+            with archive.open(name, mode="w") as entry:
+                for piece in iter_export(meeting):
+                    entry.write(piece.encode("utf-8"))
+                    if sink.chunks:
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,39 @@
+"""
+Gunicorn settings, read automatically when gunicorn is started from this directory:
+
+    gunicorn main:app
+
+The app is created once in the master (preload_app), so schema setup runs
+once per deploy and workers fork with the code already imported. Each
+worker then drops the database connections it inherited and starts its own
+background job threads.
+
+With METRICS_ENABLED, the workers share a PROMETHEUS_MULTIPROC_DIR (a fresh
+temporary directory unless one is set), so /metrics reports the totals of
+all workers whichever one serves the scrape. Standalone worker.py processes
+are only included when PROMETHEUS_MULTIPROC_DIR is set explicitly and shared
+with them.
+"""
+import os
+import tempfile
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+preload_app = True
+
+# Read by metrics.py when the app is loaded, which happens after this file
+if (os.environ.get("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+        and not os.environ.get("PROMETHEUS_MULTIPROC_DIR")):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="meeting-metrics-")
+
+def post_fork(server, worker):
+    from app import after_fork, start_workers
+    app = worker.app.wsgi()
+    after_fork(app)
+    start_workers(app)
+
+def child_exit(server, worker):
+    # A killed worker cannot drop its own live gauges; its counters stay in the totals
+    from metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,383 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import click
+from sqlalchemy import insert, update
+from sqlalchemy.orm import selectinload
+from werkzeug.utils import secure_filename
+from app import db
+from models import Job, Meeting
+from jobs import PRIORITY_BULK, WorkerPool
+from result_cache import sha256_file
+from search import index_meeting
+from vector_index import embed_meeting
+from summary_items import apply_summary
+from meeting_assistant import (
+    SUMMARY_SINGLE_PASS_TOKENS, count_tokens, fetch_summary_batch, generate_meeting_summary,
+    submit_summary_batch, transcribe_audio_with_segments
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_POLL_SECONDS = int(os.environ.get("IMPORT_BATCH_POLL_SECONDS", 60))
+SUMMARY_BATCH_MAX_REQUESTS = 50000  # Provider limit per batch
+
+class Checkpoint:
+    """
+    Progress of an import, saved as JSON so an interrupted run can resume.
+
+    Records the meeting each imported (or duplicate) file maps to and any
+    summary batches still running. The file is replaced atomically, so a
+    crash never leaves it half written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.summary_batches = []
+        if path and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.summary_batches = data.get("summary_batches", [])
+
+    def save(self):
+        if not self.path:
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"files": self.files, "summary_batches": self.summary_batches}, f)
+        os.replace(temp_path, self.path)
+
+def find_recordings(directory, allowed_extensions):
+    """All recordings under directory with an allowed extension, in a stable order."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if '.' in name and name.rsplit('.', 1)[1].lower() in allowed_extensions:
+                yield os.path.abspath(os.path.join(root, name))
+
+def store_recording(source_path, upload_folder):
+    """
+    Place a recording in the upload folder under a new unique name.
+
+    Hard-links when the archive is on the same filesystem, so a large
+    backfill needs no extra disk space or copy time; copies otherwise.
+
+    Returns:
+        str: The stored filename
+    """
+    extension = source_path.rsplit('.', 1)[1].lower()
+    stored_filename = f"{uuid.uuid4()}.{extension}"
+    target_path = os.path.join(upload_folder, stored_filename)
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copyfile(source_path, target_path)
+    return stored_filename
+
+def import_recordings(app, paths, checkpoint, batch_size=500, io_workers=8, enqueue=True):
+    """
+    Insert a Meeting for each new recording, deduplicated by content hash.
+
+    Files are hashed and stored in parallel, and meetings (and their jobs)
+    are inserted with one multi-row INSERT per batch of files. The
+    checkpoint is saved after each batch is committed.
+
+    Args:
+        app: The Flask application
+        paths (list): Recording paths not yet in the checkpoint
+        checkpoint (Checkpoint): Updated with the meeting for every path
+        batch_size (int): Files per transaction
+        io_workers (int): Threads hashing and storing files
+        enqueue (bool): Queue a low-priority processing job for each new meeting
+
+    Returns:
+        tuple: (imported, duplicates) counts
+    """
+    imported = duplicates = 0
+    seen = {}  # content hash -> meeting ID, for files repeated within this run
+
+    with ThreadPoolExecutor(max_workers=io_workers) as executor:
+        for start in range(0, len(paths), batch_size):
+            batch = paths[start:start + batch_size]
+            hashes = list(executor.map(sha256_file, batch))
+
+            existing = dict(db.session.query(Meeting.content_hash, Meeting.id).filter(
+                Meeting.content_hash.in_(set(hashes) - set(seen))
+            ).all())
+            seen.update(existing)
+
+            new_files = []
+            for path, content_hash in zip(batch, hashes):
+                if content_hash in seen:
+                    checkpoint.files[path] = seen[content_hash]
+                    duplicates += 1
+                else:
+                    seen[content_hash] = str(uuid.uuid4())
+                    new_files.append((path, content_hash))
+
+            stored = list(executor.map(lambda item: store_recording(item[0], app.config['UPLOAD_FOLDER']), new_files))
+
+            meetings, jobs = [], []
+            now = datetime.utcnow()
+            for (path, content_hash), stored_filename in zip(new_files, stored):
+                meeting_id = seen[content_hash]
+                filename = secure_filename(os.path.basename(path)) or stored_filename
+                meetings.append({
+                    "id": meeting_id,
+                    "title": os.path.splitext(os.path.basename(path))[0][:255],
+                    "recording_filename": stored_filename,
+                    "original_filename": filename[:255],
+                    "content_hash": content_hash,
+                    # Archived meetings keep their place in the history
+                    "created_at": datetime.utcfromtimestamp(os.path.getmtime(path)),
+                    "processed": False,
+                    "status": "uploaded"
+                })
+                if enqueue:
+                    jobs.append({
+                        "meeting_id": meeting_id,
+                        "file_path": os.path.join(app.config['UPLOAD_FOLDER'], stored_filename),
+                        "status": "pending",
+                        "attempts": 0,
+                        "max_attempts": app.config['JOB_MAX_ATTEMPTS'],
+                        "priority": PRIORITY_BULK,
+                        "run_after": now,
+                        "created_at": now,
+                        "updated_at": now
+                    })
+                checkpoint.files[path] = meeting_id
+
+            if meetings:
+                db.session.execute(insert(Meeting), meetings)
+            if jobs:
+                db.session.execute(insert(Job), jobs)
+            db.session.commit()
+            checkpoint.save()
+
+            imported += len(meetings)
+            click.echo(f"Imported {start + len(batch)}/{len(paths)} files ({imported} new, {duplicates} duplicates)")
+    return imported, duplicates
+
+def unfinished_meetings(meeting_ids):
+    """The meetings among meeting_ids that still need processing and have no job queued or running."""
+    unfinished = []
+    ids = list(meeting_ids)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        active = {meeting_id for (meeting_id,) in db.session.query(Job.meeting_id).filter(
+            Job.meeting_id.in_(chunk), Job.status.in_(("pending", "running"))
+        )}
+        unfinished.extend(
+            meeting_id for (meeting_id,) in db.session.query(Meeting.id).filter(
+                Meeting.id.in_(chunk), Meeting.status.in_(("uploaded", "transcribing", "summarizing"))
+            ) if meeting_id not in active
+        )
+    return unfinished
+
+def run_import_workers(app, workers, poll_interval=5.0):
+    """
+    Process queued bulk jobs in this process with a bounded pool until none are left.
+
+    The pool claims only bulk-priority jobs, so new uploads are left to the
+    web and worker processes.
+    """
+    from routes import process_meeting_recording
+
+    pool = WorkerPool(
+        app,
+        process_meeting_recording,
+        size=workers,
+        poll_interval=app.config["JOB_POLL_INTERVAL"],
+        retry_delay=app.config["JOB_RETRY_DELAY"],
+        stale_after=app.config["JOB_STALE_SECONDS"],
+        heartbeat_interval=app.config["JOB_HEARTBEAT_SECONDS"],
+        max_priority=PRIORITY_BULK
+    )
+    pool.start()
+    try:
+        while True:
+            remaining = db.session.query(Job).filter(
+                Job.priority == PRIORITY_BULK, Job.status.in_(("pending", "running"))
+            ).count()
+            db.session.remove()
+            if not remaining:
+                break
+            click.echo(f"{remaining} import job(s) remaining")
+            time.sleep(poll_interval)
+    finally:
+        pool.stop()
+
+def _finish_meeting(meeting_id, summary_data=None, error=None):
+    meeting = Meeting.query.get(meeting_id)
+    if error is None:
+        apply_summary(meeting, summary_data)
+        meeting.error = None
+        meeting.status = "done"
+        index_meeting(meeting)
+    else:
+        meeting.error = str(error)
+        meeting.status = "error"
+    meeting.processed = True
+    db.session.commit()
+    if error is None:
+        embed_meeting(meeting_id)
+    db.session.remove()
+
+def _transcribe_for_batch(app, meeting_id):
+    """Transcribe one meeting and store the transcript, leaving it in the summarizing stage."""
+    with app.app_context():
+        meeting = Meeting.query.get(meeting_id)
+        if meeting.transcript:
+            db.session.remove()
+            return
+        file_path = os.path.join(app.config['UPLOAD_FOLDER'], meeting.recording_filename)
+        db.session.execute(update(Meeting).where(Meeting.id == meeting_id).values(status="transcribing"))
+        db.session.commit()
+        db.session.close()
+
+        try:
+            transcription = transcribe_audio_with_segments(file_path)
+        except Exception as e:
+            logger.error(f"Import transcription failed for meeting {meeting_id}: {str(e)}")
+            _finish_meeting(meeting_id, error=e)
+            return
+
+        meeting = Meeting.query.get(meeting_id)
+        meeting.transcript = transcription['text']
+        meeting.transcript_segments = json.dumps(transcription['segments'])
+        meeting.status = "summarizing"
+        db.session.commit()
+        db.session.remove()
+
+def _summarize_directly(app, meeting_id):
+    with app.app_context():
+        transcript = Meeting.query.get(meeting_id).transcript
+        db.session.close()
+        try:
+            summary_data = generate_meeting_summary(transcript)
+        except Exception as e:
+            _finish_meeting(meeting_id, error=e)
+            return
+        _finish_meeting(meeting_id, summary_data)
+
+def _collect_batches(app, checkpoint, executor):
+    """Wait for the checkpoint's summary batches and store their results."""
+    while checkpoint.summary_batches:
+        for entry in list(checkpoint.summary_batches):
+            results = fetch_summary_batch(entry["id"])
+            if results is None:
+                continue
+            for meeting_id in entry["meeting_ids"]:
+                if meeting_id in results:
+                    _finish_meeting(meeting_id, results[meeting_id])
+            # Requests the batch could not complete are summarized one by one
+            missing = [meeting_id for meeting_id in entry["meeting_ids"] if meeting_id not in results]
+            list(executor.map(lambda meeting_id: _summarize_directly(app, meeting_id), missing))
+            checkpoint.summary_batches.remove(entry)
+            checkpoint.save()
+            click.echo(f"Summary batch {entry['id']} done ({len(results)} summarized, {len(missing)} retried directly)")
+        if checkpoint.summary_batches:
+            time.sleep(BATCH_POLL_SECONDS)
+
+def process_with_batch_summaries(app, meeting_ids, checkpoint, workers):
+    """
+    Transcribe meetings with a bounded pool, then summarize them through the Batch API.
+
+    Transcripts too long for a single prompt are summarized hierarchically
+    in this process instead. Batches are recorded in the checkpoint as soon
+    as they are submitted, so a resumed import collects them rather than
+    paying for them twice.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        _collect_batches(app, checkpoint, executor)
+
+        list(executor.map(lambda meeting_id: _transcribe_for_batch(app, meeting_id), meeting_ids))
+
+        batched = {meeting_id for entry in checkpoint.summary_batches for meeting_id in entry["meeting_ids"]}
+        transcripts = {meeting.id: meeting.transcript for meeting in Meeting.query.options(selectinload(Meeting.texts)).filter(
+            Meeting.id.in_(meeting_ids), Meeting.status == "summarizing"
+        )}
+        db.session.close()
+
+        short = {meeting_id: text for meeting_id, text in transcripts.items()
+                 if meeting_id not in batched and count_tokens(text) <= SUMMARY_SINGLE_PASS_TOKENS}
+        oversized = [meeting_id for meeting_id in transcripts if meeting_id not in batched and meeting_id not in short]
+
+        ids = list(short)
+        for start in range(0, len(ids), SUMMARY_BATCH_MAX_REQUESTS):
+            chunk = ids[start:start + SUMMARY_BATCH_MAX_REQUESTS]
+            batch_id = submit_summary_batch({meeting_id: short[meeting_id] for meeting_id in chunk})
+            checkpoint.summary_batches.append({"id": batch_id, "meeting_ids": chunk})
+            checkpoint.save()
+
+        list(executor.map(lambda meeting_id: _summarize_directly(app, meeting_id), oversized))
+        _collect_batches(app, checkpoint, executor)
+
+def register_commands(app):
+    """
+    Register the command line tools.
+
+    Args:
+        app: The Flask application
+    """
+
+    @app.cli.command("import-recordings")
+    @click.argument("directory", type=click.Path(exists=True, file_okay=False))
+    @click.option("--checkpoint", "checkpoint_path", type=click.Path(dir_okay=False),
+                  help="JSON file recording progress; rerun with the same file to resume")
+    @click.option("--workers", type=int, default=0,
+                  help="Process the imported recordings in this process with this many threads "
+                       "(default: leave them to the worker pools)")
+    @click.option("--batch-size", type=int, default=None, help="Files inserted per transaction")
+    @click.option("--io-workers", type=int, default=8, help="Threads hashing and storing files")
+    @click.option("--batch-summaries", is_flag=True,
+                  help="Summarize through the OpenAI Batch API: half the cost and no per-minute quota, "
+                       "but results can take up to 24 hours")
+    def import_recordings_command(directory, checkpoint_path, workers, batch_size, io_workers, batch_summaries):
+        """
+        Backfill an archive of recordings from DIRECTORY.
+
+        Recordings already in the database, or repeated in the archive, are
+        skipped by content hash. Processing jobs are queued at bulk priority,
+        so workers always take new uploads first; set JOB_MIN_PRIORITY=0 on
+        web processes to keep their workers off the backfill entirely.
+        """
+        checkpoint = Checkpoint(checkpoint_path)
+        paths = [path for path in find_recordings(directory, app.config['ALLOWED_EXTENSIONS'])
+                 if path not in checkpoint.files]
+        click.echo(f"Found {len(paths)} recording(s) to import ({len(checkpoint.files)} already in the checkpoint)")
+
+        imported, duplicates = import_recordings(
+            app, paths, checkpoint,
+            batch_size=batch_size or app.config['IMPORT_BATCH_SIZE'],
+            io_workers=io_workers,
+            enqueue=not batch_summaries
+        )
+        click.echo(f"Imported {imported} new recording(s), skipped {duplicates} duplicate(s)")
+
+        # Meetings from an earlier, interrupted run that still need work
+        pending = unfinished_meetings(set(checkpoint.files.values()))
+        if batch_summaries:
+            process_with_batch_summaries(app, pending, checkpoint, workers or 4)
+        else:
+            if pending:
+                for meeting_id in pending:
+                    meeting = Meeting.query.get(meeting_id)
+                    db.session.add(Job(
+                        meeting_id=meeting_id,
+                        file_path=os.path.join(app.config['UPLOAD_FOLDER'], meeting.recording_filename),
+                        max_attempts=app.config['JOB_MAX_ATTEMPTS'],
+                        priority=PRIORITY_BULK
+                    ))
+                db.session.commit()
+                click.echo(f"Queued {len(pending)} recording(s) left unprocessed by an earlier run")
+            if workers:
+                run_import_workers(app, workers)
+        click.echo("Import complete" if workers or batch_summaries else "Import queued")
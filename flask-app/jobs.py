@@ -0,0 +1,405 @@
+import os
+import socket
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app import db
+from models import Job, Meeting
+from metrics import Gauge, JOB_FAILURES
+
+logger = logging.getLogger(__name__)
+
+# Job priorities; workers always claim the highest-priority runnable job first
+PRIORITY_NORMAL = 0
+PRIORITY_BULK = -10  # Archive imports, see importer.py
+
+class JobLost(Exception):
+    """The job was re-queued and claimed again while this worker was still running it."""
+
+def enqueue_meeting(meeting_id, file_path, max_attempts=3, priority=PRIORITY_NORMAL):
+    """
+    Queue a meeting recording for background processing.
+
+    The job is added to the current session; the caller commits it together
+    with the meeting so that a crash can never leave a meeting without a job.
+
+    Args:
+        meeting_id (str): The ID of the meeting
+        file_path (str): Path to the audio file
+        max_attempts (int): How many times the job may run before it is marked failed
+        priority (int): PRIORITY_NORMAL, or PRIORITY_BULK for work that may wait behind uploads
+
+    Returns:
+        Job: The pending job
+    """
+    job = Job(meeting_id=meeting_id, file_path=file_path, max_attempts=max_attempts, priority=priority)
+    db.session.add(job)
+    return job
+
+def claim_next_job(worker_id, min_priority=None, max_priority=None):
+    """
+    Atomically claim the highest-priority runnable pending job, oldest first.
+
+    The conditional UPDATE guarantees that only one worker, in any process,
+    wins a given job.
+
+    Args:
+        worker_id (str): Identifier recorded on the claimed job
+        min_priority (int): Ignore jobs below this priority, or None to take any job
+        max_priority (int): Ignore jobs above this priority, or None to take any job
+
+    Returns:
+        int or None: The claimed job ID, or None if the queue is empty
+    """
+    now = datetime.utcnow()
+    query = db.session.query(Job.id).filter(
+        Job.status == "pending",
+        Job.run_after <= now
+    )
+    if min_priority is not None:
+        query = query.filter(Job.priority >= min_priority)
+    if max_priority is not None:
+        query = query.filter(Job.priority <= max_priority)
+    candidates = query.order_by(Job.priority.desc(), Job.id).limit(5).all()
+
+    for (job_id,) in candidates:
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "pending")
+            .values(status="running", worker_id=worker_id, attempts=Job.attempts + 1, updated_at=now)
+        )
+        db.session.commit()
+        if result.rowcount == 1:
+            return job_id
+    return None
+
+def recover_stale_jobs(stale_after_seconds):
+    """
+    Return jobs left running by a crashed or restarted worker to the queue.
+
+    A job that has already used all its attempts is marked failed, together
+    with its meeting, instead: a recording that kills its worker (out of
+    memory, a crash in a native library) would otherwise be retried forever.
+
+    Args:
+        stale_after_seconds (int): Jobs with no progress for this long are considered abandoned
+
+    Returns:
+        int: Number of jobs that were re-queued or failed
+    """
+    now = datetime.utcnow()
+    stale = (Job.status == "running", Job.updated_at < now - timedelta(seconds=stale_after_seconds))
+
+    exhausted = db.session.query(Job.id, Job.meeting_id).filter(*stale, Job.attempts >= Job.max_attempts).all()
+    failed = 0
+    for job_id, meeting_id in exhausted:
+        error = "The worker stopped while processing this recording on every attempt"
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, *stale)
+            .values(status="failed", worker_id=None, error=error, updated_at=now)
+        )
+        if result.rowcount != 1:
+            continue
+        db.session.execute(
+            update(Meeting).where(Meeting.id == meeting_id).values(error=error, processed=True, status="error")
+        )
+        failed += 1
+        JOB_FAILURES.inc(final="true")
+        logger.error(f"Job {job_id} failed permanently: its worker stopped on every attempt")
+
+    result = db.session.execute(
+        update(Job)
+        .where(*stale, Job.attempts < Job.max_attempts)
+        .values(status="pending", worker_id=None, run_after=now)
+    )
+    db.session.commit()
+    if result.rowcount:
+        logger.warning(f"Re-queued {result.rowcount} stale job(s)")
+    return result.rowcount + failed
+
+def _owned_by(job_id, worker_id, attempt):
+    """Conditions matching a job only while the given claim on it still holds."""
+    return (Job.id == job_id, Job.status == "running", Job.worker_id == worker_id, Job.attempts == attempt)
+
+def heartbeat(job_id, worker_id, attempt):
+    """
+    Mark a running job as alive so recover_stale_jobs leaves it alone.
+
+    Args:
+        job_id (int): The ID of the job
+        worker_id (str): The worker that claimed it
+        attempt (int): The job's attempts count when it was claimed
+
+    Returns:
+        bool: False if the claim has been lost, e.g. the job was re-queued
+    """
+    result = db.session.execute(
+        update(Job).where(*_owned_by(job_id, worker_id, attempt)).values(updated_at=datetime.utcnow())
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+def report_progress(job_id, stage, worker_id, attempt):
+    """
+    Record the stage a running job has reached. Also serves as a heartbeat.
+
+    Args:
+        job_id (int): The ID of the job
+        stage (str): The pipeline stage now in progress
+        worker_id (str): The worker that claimed it
+        attempt (int): The job's attempts count when it was claimed
+
+    Raises:
+        JobLost: If another worker has claimed the job since, so the caller
+            stops before writing results or paying for more API calls
+    """
+    result = db.session.execute(
+        update(Job)
+        .where(*_owned_by(job_id, worker_id, attempt))
+        .values(stage=stage, updated_at=datetime.utcnow())
+    )
+    db.session.commit()
+    if result.rowcount != 1:
+        raise JobLost(f"Job {job_id} is no longer held by {worker_id}")
+
+def queue_depth():
+    """Number of jobs waiting to be claimed."""
+    return db.session.query(Job).filter(Job.status == "pending").count()
+
+class WorkerPool:
+    """
+    A pool of threads that claim and run jobs from the job table.
+
+    Several pools, in several processes, may share the same database; job
+    claiming is atomic so each job runs on exactly one worker at a time.
+    """
+
+    def __init__(self, app, handler, size=2, poll_interval=2.0, retry_delay=30, stale_after=1800, min_priority=None,
+                 heartbeat_interval=60, max_priority=None):
+        """
+        Args:
+            app: The Flask application
+            handler (callable): Called as handler(meeting_id, file_path, progress=callback); the
+                callback raises JobLost once the job has been claimed by another worker
+            size (int): Number of worker threads
+            poll_interval (float): Seconds to sleep when the queue is empty
+            retry_delay (int): Base delay in seconds before a failed job is retried
+            stale_after (int): Seconds without a heartbeat before a running job is re-queued
+            min_priority (int): Only claim jobs at or above this priority, or None for all jobs
+            heartbeat_interval (float): Seconds between heartbeats of a running job; capped
+                at a third of stale_after so a live job is never considered stale
+            max_priority (int): Only claim jobs at or below this priority, or None for all jobs
+        """
+        self.app = app
+        self.handler = handler
+        self.size = size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.stale_after = stale_after
+        self.min_priority = min_priority
+        self.max_priority = max_priority
+        self.heartbeat_interval = min(heartbeat_interval, stale_after / 3)
+        self.busy = 0
+        self._busy_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._name = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        """Re-queue abandoned jobs and start the worker threads."""
+        with self.app.app_context():
+            recover_stale_jobs(self.stale_after)
+            db.session.remove()
+
+        for index in range(self.size):
+            thread = threading.Thread(
+                target=self._run,
+                args=(f"{self._name}:{index}",),
+                name=f"meeting-worker-{index}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        WORKER_THREADS.set(self.size)
+        self._add_busy(0)
+        logger.info(f"Started {self.size} meeting worker thread(s)")
+
+    def stop(self, timeout=None):
+        """Signal the workers to exit once their current job finishes."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        WORKER_THREADS.set(0)
+
+    def join(self):
+        """Block until every worker thread has exited."""
+        for thread in self._threads:
+            while thread.is_alive():
+                thread.join(1.0)
+
+    def _run(self, worker_id):
+        last_recovery = datetime.utcnow()
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    if (datetime.utcnow() - last_recovery).total_seconds() > self.poll_interval * 30:
+                        recover_stale_jobs(self.stale_after)
+                        last_recovery = datetime.utcnow()
+
+                    job_id = claim_next_job(worker_id, self.min_priority, self.max_priority)
+                    if job_id is None:
+                        db.session.remove()
+                        self._stop.wait(self.poll_interval)
+                        continue
+
+                    self._add_busy(1)
+                    try:
+                        self._execute(job_id, worker_id)
+                    finally:
+                        self._add_busy(-1)
+                        db.session.remove()
+            except Exception as e:
+                logger.error(f"Worker {worker_id} error: {str(e)}", exc_info=True)
+                self._stop.wait(self.poll_interval)
+
+    def _add_busy(self, delta):
+        with self._busy_lock:
+            self.busy += delta
+            WORKER_BUSY_THREADS.set(self.busy)
+            WORKER_UTILIZATION.set(self.busy / self.size if self.size else 0.0)
+
+    def _execute(self, job_id, worker_id):
+        job = Job.query.get(job_id)
+        meeting_id, file_path, attempt = job.meeting_id, job.file_path, job.attempts
+        logger.debug(f"Running job {job_id} for meeting {meeting_id} (attempt {attempt})")
+        # End the read transaction so none stays open while the handler runs
+        db.session.close()
+
+        # Stages can take far longer than JOB_STALE_SECONDS on long recordings, so keep the claim alive meanwhile
+        finished = threading.Event()
+        beat = threading.Thread(
+            target=self._heartbeat,
+            args=(job_id, worker_id, attempt, finished),
+            name=f"{threading.current_thread().name}-heartbeat",
+            daemon=True
+        )
+        beat.start()
+        try:
+            self.handler(meeting_id, file_path, progress=lambda stage: report_progress(job_id, stage, worker_id, attempt))
+        except JobLost as e:
+            db.session.rollback()
+            logger.warning(f"Stopped job {job_id}: {str(e)}")
+            return
+        except Exception as e:
+            db.session.rollback()
+            self._handle_failure(job_id, worker_id, attempt, e)
+            return
+        finally:
+            finished.set()
+            beat.join()
+
+        result = db.session.execute(
+            update(Job)
+            .where(*_owned_by(job_id, worker_id, attempt))
+            .values(status="done", error=None, updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+        if result.rowcount != 1:
+            logger.warning(f"Job {job_id} finished after another worker claimed it")
+
+    def _heartbeat(self, job_id, worker_id, attempt, finished):
+        while not finished.wait(self.heartbeat_interval):
+            try:
+                with self.app.app_context():
+                    alive = heartbeat(job_id, worker_id, attempt)
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f"Heartbeat for job {job_id} failed: {str(e)}")
+                continue
+            if not alive:
+                logger.warning(f"Job {job_id} was claimed by another worker; its next progress report stops it")
+                return
+
+    def _handle_failure(self, job_id, worker_id, attempt, error):
+        job = Job.query.get(job_id)
+        if (job.status, job.worker_id, job.attempts) != ("running", worker_id, attempt):
+            # Another worker owns the job now; its outcome is the one that counts
+            logger.warning(f"Job {job_id} failed after another worker claimed it: {str(error)}")
+            db.session.rollback()
+            return
+        job.error = str(error)
+        job.updated_at = datetime.utcnow()
+
+        if job.attempts < job.max_attempts:
+            delay = self.retry_delay * (2 ** (job.attempts - 1))
+            job.status = "pending"
+            job.worker_id = None
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            JOB_FAILURES.inc(final="false")
+            logger.warning(f"Job {job_id} failed (attempt {job.attempts}/{job.max_attempts}), retrying in {delay}s")
+        else:
+            job.status = "failed"
+            meeting = Meeting.query.get(job.meeting_id)
+            if meeting:
+                meeting.error = str(error)
+                meeting.processed = True
+                meeting.status = "error"
+            JOB_FAILURES.inc(final="true")
+            logger.error(f"Job {job_id} failed permanently: {str(error)}")
+        db.session.commit()
+
+_pool = None
+
+def _reset_after_fork():
+    # Threads do not survive a fork; the child starts its own pool
+    global _pool
+    _pool = None
+
+if hasattr(os, "register_at_fork"):  # Not available on Windows, which cannot fork
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def start_worker_pool(app, handler):
+    """
+    Start this process's worker pool, sized by the WORKER_COUNT setting.
+
+    A WORKER_COUNT of 0 leaves processing to a separate worker process
+    (see worker.py). JOB_MIN_PRIORITY keeps the pool off lower-priority
+    work, e.g. set it to 0 on web processes to leave bulk imports to
+    dedicated workers.
+
+    Args:
+        app: The Flask application
+        handler (callable): The job handler, see WorkerPool
+
+    Returns:
+        WorkerPool or None: The running pool
+    """
+    global _pool
+    if _pool is not None or app.config["WORKER_COUNT"] <= 0:
+        return _pool
+
+    _pool = WorkerPool(
+        app,
+        handler,
+        size=app.config["WORKER_COUNT"],
+        poll_interval=app.config["JOB_POLL_INTERVAL"],
+        retry_delay=app.config["JOB_RETRY_DELAY"],
+        stale_after=app.config["JOB_STALE_SECONDS"],
+        min_priority=app.config["JOB_MIN_PRIORITY"],
+        heartbeat_interval=app.config["JOB_HEARTBEAT_SECONDS"]
+    )
+    _pool.start()
+    return _pool
+
+def get_worker_pool():
+    """The worker pool running in this process, if any."""
+    return _pool
+
+Gauge("job_queue_depth", "Jobs waiting to be claimed, across all processes", callback=queue_depth)
+WORKER_THREADS = Gauge("worker_threads", "Worker threads in running processes", multiprocess_mode="livesum")
+WORKER_BUSY_THREADS = Gauge("worker_busy_threads", "Worker threads in running processes currently running a job",
+                            multiprocess_mode="livesum")
+WORKER_UTILIZATION = Gauge("worker_utilization", "Fraction of this process's worker threads that are busy",
+                           multiprocess_mode="liveall")
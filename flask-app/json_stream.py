@@ -0,0 +1,164 @@
+class JSONStreamParser:
+    """
+    Incremental parser for a JSON object arriving in pieces, e.g. streamed model output.
+
+    Text is consumed one character at a time as it is fed, so no buffer of
+    the whole output is kept or re-scanned. Anything before the first "{"
+    (such as a Markdown code fence) and after the object closes is ignored.
+    Values are reported as soon as they are complete, down to max_depth: with
+    the default of 2, each top-level field and each element of a top-level
+    array is reported individually.
+    """
+
+    _WHITESPACE = " \t\r\n"
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, max_depth=2):
+        """
+        Args:
+            max_depth (int): Deepest path length reported by feed
+        """
+        self.max_depth = max_depth
+        self.result = None
+        self.done = False
+        self._stack = []  # [container, key or index of the value being parsed]
+        self._state = "start"
+        self._token = []
+        self._unicode = ""
+        self._expect_key = False
+
+    def feed(self, text):
+        """
+        Parse the next piece of the output.
+
+        Args:
+            text (str): The new text
+
+        Returns:
+            list: (path, value) for every value completed by this text, where
+            path is a tuple of keys and indexes from the root, e.g. ("decisions", 0)
+        """
+        completed = []
+        for char in text:
+            if self.done:
+                break
+            self._consume(char, completed)
+        return completed
+
+    def _consume(self, char, completed):
+        state = self._state
+        if state == "start":
+            if char == "{":
+                self._open({})
+            return
+
+        if state == "string":
+            if char == '"':
+                self._state = "value"
+                self._scalar(self._string("".join(self._token)), completed)
+            elif char == "\\":
+                self._state = "escape"
+            else:
+                self._token.append(char)
+            return
+        if state == "escape":
+            if char == "u":
+                self._state = "unicode"
+                self._unicode = ""
+            else:
+                self._token.append(self._ESCAPES.get(char, char))
+                self._state = "string"
+            return
+        if state == "unicode":
+            self._unicode += char
+            if len(self._unicode) == 4:
+                self._token.append(chr(int(self._unicode, 16)))
+                self._state = "string"
+            return
+        if state == "literal":
+            if char not in self._WHITESPACE and char not in ",:]}":
+                self._token.append(char)
+                return
+            self._state = "value"
+            self._scalar(self._literal("".join(self._token)), completed)
+
+        # Between tokens
+        if char in self._WHITESPACE or char == ":":
+            return
+        if char == ",":
+            if isinstance(self._stack[-1][0], dict):
+                self._expect_key = True
+            return
+        if char == "{":
+            self._open({})
+        elif char == "[":
+            self._open([])
+        elif char in "}]":
+            self._close(completed)
+        elif char == '"':
+            self._state = "string"
+            self._token = []
+        else:
+            self._state = "literal"
+            self._token = [char]
+
+    def _open(self, container):
+        if self._stack:
+            self._attach(container)
+        self._stack.append([container, None])
+        self._expect_key = isinstance(container, dict)
+        self._state = "value"
+
+    def _close(self, completed):
+        container, _ = self._stack.pop()
+        if not self._stack:
+            self.result = container
+            self.done = True
+            return
+        self._completed(container, completed)
+
+    def _scalar(self, value, completed):
+        if self._expect_key and isinstance(self._stack[-1][0], dict):
+            self._stack[-1][1] = value
+            self._expect_key = False
+            return
+        self._attach(value)
+        self._completed(value, completed)
+
+    def _attach(self, value):
+        frame = self._stack[-1]
+        container = frame[0]
+        if isinstance(container, dict):
+            container[frame[1]] = value
+        else:
+            frame[1] = len(container)
+            container.append(value)
+        self._expect_key = False
+
+    def _completed(self, value, completed):
+        if isinstance(self._stack[-1][0], dict):
+            self._expect_key = True
+        if len(self._stack) <= self.max_depth:
+            completed.append((tuple(frame[1] for frame in self._stack), value))
+
+    @staticmethod
+    def _string(value):
+        try:
+            value.encode("utf-8")
+        except UnicodeEncodeError:
+            # Join \u escapes that encode a character outside the BMP as a surrogate pair
+            value = value.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+        return value
+
+    @staticmethod
+    def _literal(token):
+        if token == "true":
+            return True
+        if token == "false":
+            return False
+        if token == "null":
+            return None
+        try:
+            return int(token)
+        except ValueError:
+            return float(token)
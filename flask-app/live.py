@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import wave
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, update
+from app import db
+from models import Meeting
+from jobs import enqueue_meeting
+from audio import quietest_cut
+from meeting_assistant import count_tokens, generate_meeting_summary, transcribe_pcm, update_running_summary
+from search import index_meeting
+from vector_index import embed_meeting
+from summary_items import apply_summary
+
+logger = logging.getLogger(__name__)
+
+# Clients send 16-bit little-endian mono PCM at this rate
+LIVE_SAMPLE_RATE = 16000
+LIVE_WINDOW_SECONDS = float(os.environ.get("LIVE_WINDOW_SECONDS", 15))
+LIVE_SUMMARY_MIN_TOKENS = int(os.environ.get("LIVE_SUMMARY_MIN_TOKENS", 400))
+LIVE_PERSIST_SECONDS = float(os.environ.get("LIVE_PERSIST_SECONDS", 60))  # How often the transcript so far is saved
+LIVE_IDLE_TIMEOUT = int(os.environ.get("LIVE_IDLE_TIMEOUT", 600))  # A live meeting not saved for this long was abandoned
+PROMPT_CHARS = 400  # Preceding transcript passed to each window for continuity
+
+class LiveSession:
+    """
+    Incremental transcription and summarization of one live meeting.
+
+    Audio is appended to the meeting's recording on disk as it arrives and
+    buffered in memory only until a window is full. Each window is cut at the
+    quietest point near its end and transcribed on a background thread. The
+    transcript is kept in memory and saved to the meeting every
+    LIVE_PERSIST_SECONDS, which also tells recover_live_meetings the session
+    is alive. Once enough new text has accumulated, the running summary is
+    updated from that text alone, so when the meeting ends only the last few
+    seconds remain to be transcribed and summarized.
+    """
+
+    def __init__(self, app, meeting_id, recording_path, send=None):
+        """
+        Args:
+            app: The Flask application
+            meeting_id (str): The meeting being recorded, with status "live"
+            recording_path (str): Where the full recording is written as WAV
+            send (callable): Called with a dict for each transcript or summary update
+        """
+        self.app = app
+        self.meeting_id = meeting_id
+        self.send = send or (lambda message: None)
+        self.window_bytes = int(LIVE_WINDOW_SECONDS * LIVE_SAMPLE_RATE) * 2
+        self.buffer = bytearray()
+        self.offset = 0.0
+        self.prompt = ""
+        self.pending_text = []
+        self.notes = None
+        self.transcript = []
+        self.segments = []
+        self._saved_windows = 0
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        # One thread each keeps windows and summary updates in order
+        self._transcriber = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"live-transcribe-{meeting_id[:8]}")
+        self._summarizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"live-summary-{meeting_id[:8]}")
+
+        self._recording = wave.open(recording_path, "wb")
+        self._recording.setnchannels(1)
+        self._recording.setsampwidth(2)
+        self._recording.setframerate(LIVE_SAMPLE_RATE)
+
+    def feed(self, frame):
+        """
+        Add a frame of audio from the client.
+
+        Args:
+            frame (bytes): 16-bit little-endian mono PCM at LIVE_SAMPLE_RATE
+        """
+        if len(frame) % 2:
+            frame = frame[:-1]
+        self._recording.writeframes(frame)
+        self.buffer.extend(frame)
+
+        if len(self.buffer) >= self.window_bytes:
+            cut = quietest_cut(self.buffer, LIVE_SAMPLE_RATE)
+            self._submit_window(bytes(self.buffer[:cut]))
+            del self.buffer[:cut]
+
+    def finish(self):
+        """
+        Transcribe the remaining audio, bring the summary up to date and mark the meeting done.
+
+        Blocks until all outstanding work has finished.
+        """
+        self._recording.close()
+        if self.buffer:
+            self._submit_window(bytes(self.buffer))
+            self.buffer.clear()
+        self._transcriber.shutdown(wait=True)
+        self._submit_summary(force=True)
+        self._summarizer.shutdown(wait=True)
+
+        with self.app.app_context():
+            meeting = Meeting.query.get(self.meeting_id)
+            self._save_transcript(meeting)
+            if not self.transcript:
+                meeting.error = "No speech was captured during the live session"
+                meeting.status = "error"
+            else:
+                if self.pending_text or not self.notes:
+                    # The last incremental update failed; summarize the whole transcript instead
+                    try:
+                        self.notes = generate_meeting_summary(" ".join(self.transcript))
+                    except Exception as e:
+                        meeting.error = str(e)
+                if self.notes:
+                    apply_summary(meeting, self.notes)
+                    meeting.error = None
+                meeting.status = "error" if meeting.error else "done"
+                index_meeting(meeting)
+            meeting.processed = True
+            db.session.commit()
+            result = meeting.to_status_dict()
+        self.send({"type": "done", **result})
+        if result["status"] == "done":
+            with self.app.app_context():
+                embed_meeting(self.meeting_id)
+        logger.debug(f"Live session for meeting {self.meeting_id} finished")
+
+    def _submit_window(self, pcm):
+        offset = self.offset
+        self.offset += len(pcm) / 2 / LIVE_SAMPLE_RATE
+        self._transcriber.submit(self._transcribe_window, pcm, offset)
+
+    def _transcribe_window(self, pcm, offset):
+        self._add_window(pcm, offset)
+        if time.monotonic() - self._saved_at >= LIVE_PERSIST_SECONDS:
+            try:
+                with self.app.app_context():
+                    self._save_transcript(Meeting.query.get(self.meeting_id))
+                    db.session.commit()
+            except Exception as e:
+                # Kept in memory; the next save or finish() writes it
+                logger.error(f"Could not save the live transcript of meeting {self.meeting_id}: {str(e)}")
+
+    def _save_transcript(self, meeting):
+        """Copy the transcript gathered since the last save onto the meeting; the caller commits."""
+        if len(self.transcript) != self._saved_windows:
+            meeting.transcript = " ".join(self.transcript)
+            meeting.transcript_segments = json.dumps(self.segments)
+            self._saved_windows = len(self.transcript)
+        # Also marks the session as alive when nothing was said since the last save
+        meeting.updated_at = datetime.utcnow()
+        self._saved_at = time.monotonic()
+
+    def _add_window(self, pcm, offset):
+        try:
+            result = transcribe_pcm(pcm, LIVE_SAMPLE_RATE, offset, prompt=self.prompt[-PROMPT_CHARS:])
+        except Exception as e:
+            # A lost window leaves a gap in the transcript but should not end the meeting
+            logger.error(f"Live transcription failed for meeting {self.meeting_id} at {offset:.1f}s: {str(e)}")
+            self.send({"type": "error", "message": "Part of the audio could not be transcribed", "start": offset})
+            return
+        if not result["text"]:
+            return
+
+        self.transcript.append(result["text"])
+        self.segments.extend(result["segments"])
+        self.prompt = (self.prompt + " " + result["text"])[-PROMPT_CHARS:]
+        self.send({"type": "transcript", "text": result["text"], "segments": result["segments"]})
+        with self._lock:
+            self.pending_text.append(result["text"])
+        self._submit_summary()
+
+    def _submit_summary(self, force=False):
+        with self._lock:
+            new_text = " ".join(self.pending_text)
+            if not new_text or (not force and count_tokens(new_text) < LIVE_SUMMARY_MIN_TOKENS):
+                return
+            self.pending_text = []
+        self._summarizer.submit(self._update_summary, new_text)
+
+    def _update_summary(self, new_text):
+        try:
+            self.notes = update_running_summary(self.notes, new_text)
+        except Exception as e:
+            logger.error(f"Live summary update failed for meeting {self.meeting_id}: {str(e)}")
+            # Fold the text into the next update instead
+            with self._lock:
+                self.pending_text.insert(0, new_text)
+            return
+        self.send({"type": "summary", **self.notes})
+
+def recover_live_meetings(idle_seconds=LIVE_IDLE_TIMEOUT):
+    """
+    Finish live meetings whose session was lost, e.g. to a restart or crash.
+
+    A live meeting that has not been saved for idle_seconds is processed
+    like an upload from the audio recorded so far; one with no audio is
+    marked as failed. Safe to run from several processes at once. Needs an
+    app context.
+
+    Args:
+        idle_seconds (int): How long since the last save before a live meeting is abandoned
+
+    Returns:
+        int: Number of meetings recovered
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=idle_seconds)
+    stale = (Meeting.status == "live", func.coalesce(Meeting.updated_at, Meeting.created_at) < cutoff)
+    meetings = Meeting.query.filter(*stale).all()
+
+    recovered = 0
+    for meeting in meetings:
+        recording_path = os.path.join(current_app.config["UPLOAD_FOLDER"], meeting.recording_filename)
+        has_audio = _recorded_frames(recording_path) > 0
+        values = {"status": "uploaded"} if has_audio else {
+            "status": "error", "processed": True, "error": "The live session ended without any audio being saved"
+        }
+        # Only one process may take over the meeting
+        result = db.session.execute(update(Meeting).where(Meeting.id == meeting.id, *stale).values(**values))
+        if result.rowcount != 1:
+            db.session.rollback()
+            continue
+        if has_audio:
+            enqueue_meeting(meeting.id, recording_path, max_attempts=current_app.config["JOB_MAX_ATTEMPTS"])
+        db.session.commit()
+        recovered += 1
+        logger.warning(f"Live meeting {meeting.id} was abandoned; "
+                       f"{'processing its recording' if has_audio else 'marked as failed'}")
+    return recovered
+
+def _recorded_frames(path):
+    # The WAV header is updated after every write, so a recording cut off by a crash is still readable
+    try:
+        with wave.open(path, "rb") as recording:
+            return recording.getnframes()
+    except (OSError, EOFError, wave.Error):
+        return 0
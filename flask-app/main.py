@@ -1,4 +1,10 @@
-from app import app
+from app import configure_logging, create_app, start_workers
+
+configure_logging()
+
+# The WSGI application, e.g. for gunicorn (see gunicorn.conf.py)
+app = create_app()
 
 if __name__ == "__main__":
+    start_workers(app)
     app.run(host="0.0.0.0", port=5000, debug=True)
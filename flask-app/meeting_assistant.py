@@ -1,15 +1,52 @@
 import os
+import re
+import shutil
 import tempfile
 import json
+import hashlib
 import logging
-from openai import OpenAI
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import audio
+from json_stream import JSONStreamParser
+from metrics import AUDIO_BYTES_SENT, AUDIO_SECONDS, CACHE_LOOKUPS, OPENAI_TOKENS, span
+from openai_client import call_with_retries, get_client
+from result_cache import get_cache, make_key, sha256_file
 
-# Initialize OpenAI client
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-openai = OpenAI(api_key=OPENAI_API_KEY)
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
 logger = logging.getLogger(__name__)
 
+# Long-audio transcription settings
+WHISPER_MAX_BYTES = 25 * 1024 * 1024  # Provider upload limit per request
+TRANSCRIBE_LONG_AUDIO = os.environ.get("TRANSCRIBE_LONG_AUDIO", "auto")  # auto, always or never
+LONG_AUDIO_MIN_SECONDS = int(os.environ.get("LONG_AUDIO_MIN_SECONDS", 900))
+SEGMENT_SECONDS = int(os.environ.get("TRANSCRIBE_SEGMENT_SECONDS", 300))
+SEGMENT_OVERLAP_SECONDS = int(os.environ.get("TRANSCRIBE_SEGMENT_OVERLAP_SECONDS", 5))
+TRANSCRIBE_CONCURRENCY = int(os.environ.get("TRANSCRIBE_CONCURRENCY", 4))
+
+# Pre-processing before upload to the transcription API
+AUDIO_PREPROCESS = os.environ.get("AUDIO_PREPROCESS", "auto")  # auto, always or never
+AUDIO_PREPROCESS_MIN_BYTES = int(os.environ.get("AUDIO_PREPROCESS_MIN_BYTES", 1024 * 1024))
+AUDIO_SAMPLE_RATE = int(os.environ.get("AUDIO_SAMPLE_RATE", 16000))
+AUDIO_BITRATE = os.environ.get("AUDIO_BITRATE", "24k")
+AUDIO_TRIM_SILENCE = os.environ.get("AUDIO_TRIM_SILENCE", "true").lower() in ("1", "true", "yes")
+
+# Summarization settings
+SUMMARY_MODEL = "gpt-3.5-turbo"
+SUMMARY_PROMPT_VERSION = 1  # Bump when the summary prompts change so cached summaries are not reused
+SUMMARY_SINGLE_PASS_TOKENS = int(os.environ.get("SUMMARY_SINGLE_PASS_TOKENS", 12000))
+SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", 3000))
+SUMMARY_CONCURRENCY = int(os.environ.get("SUMMARY_CONCURRENCY", 4))
+SUMMARY_REDUCE_FAN_IN = max(2, int(os.environ.get("SUMMARY_REDUCE_FAN_IN", 8)))  # Below 2 the reduction would never finish
+SUMMARY_COMPLETION_TOKENS = 1000  # Expected completion size, counted against the token-per-minute limit
+SUMMARY_STREAMING = os.environ.get("SUMMARY_STREAMING", "true").lower() in ("1", "true", "yes")
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
 def transcribe_audio(audio_file_path):
     """
     Transcribe the given audio file using OpenAI Whisper.
@@ -20,24 +57,262 @@ def transcribe_audio(audio_file_path):
     Returns:
         str: Transcribed text
     """
+    return transcribe_audio_with_segments(audio_file_path)["text"]
+
+def transcribe_audio_with_segments(audio_file_path):
+    """
+    Transcribe the given audio file, keeping per-segment timestamps.
+    
+    Large recordings are first shrunk to compact mono audio (see
+    _use_preprocessing). Long recordings, and files over the provider's size
+    limit, are split on silence and transcribed concurrently (see
+    _transcribe_long_audio).
+    
+    Args:
+        audio_file_path (str): Path to the audio file
+        
+    Returns:
+        dict: "text" with the full transcript and "segments", a list of
+        {"start", "end", "text"} dicts with times in seconds
+    """
     try:
         logger.debug(f"Transcribing audio file: {audio_file_path}")
-        with open(audio_file_path, "rb") as audio_file:
-            response = openai.audio.transcriptions.create(
-                model="whisper-1", 
-                file=audio_file
+        preprocess = _use_preprocessing(audio_file_path)
+        cache = get_cache()
+        if cache:
+            cache_key = make_key(
+                "transcription", sha256_file(audio_file_path), "whisper-1", "verbose_json",
+                SEGMENT_SECONDS, SEGMENT_OVERLAP_SECONDS,
+                (AUDIO_SAMPLE_RATE, AUDIO_BITRATE, AUDIO_TRIM_SILENCE) if preprocess else None
             )
-        return response.text
+            cached = cache.get(cache_key)
+            CACHE_LOOKUPS.inc(kind="transcription", result="miss" if cached is None else "hit")
+            if cached is not None:
+                logger.debug(f"Using cached transcription for {audio_file_path}")
+                return cached
+
+        if preprocess:
+            result = _transcribe_preprocessed(audio_file_path)
+        else:
+            result = _transcribe_original(audio_file_path)
+        if result["segments"]:
+            AUDIO_SECONDS.inc(result["segments"][-1]["end"])
+
+        if cache:
+            cache.set(cache_key, result)
+        return result
     except Exception as e:
         logger.error(f"Error transcribing audio: {str(e)}")
         raise Exception(f"Failed to transcribe audio: {str(e)}")
 
-def generate_meeting_summary(transcript):
+def transcribe_pcm(pcm, sample_rate=16000, offset=0.0, prompt=None):
+    """
+    Transcribe a window of live audio held in memory.
+    
+    Args:
+        pcm (bytes): 16-bit little-endian mono samples
+        sample_rate (int): Sample rate in Hz
+        offset (float): Start of the window within the meeting, added to timestamps
+        prompt (str): Preceding transcript text, so words and names carry over between windows
+        
+    Returns:
+        dict: "text" and "segments", as returned by transcribe_audio_with_segments
+    """
+    wav = audio.pcm_to_wav(pcm, sample_rate)
+    
+    def request():
+        return get_client().audio.transcriptions.create(
+            model="whisper-1",
+            file=("window.wav", wav),
+            response_format="verbose_json",
+            **({"prompt": prompt} if prompt else {})
+        )
+    
+    response = call_with_retries(request, "audio")
+    AUDIO_BYTES_SENT.inc(len(wav))
+    AUDIO_SECONDS.inc(len(pcm) / 2 / sample_rate)
+    segments = [
+        {"start": offset + segment.start, "end": offset + segment.end, "text": segment.text.strip()}
+        for segment in (response.segments or [])
+    ]
+    return {"text": response.text.strip(), "segments": segments}
+
+def _use_preprocessing(audio_file_path):
+    if AUDIO_PREPROCESS == "never":
+        return False
+    if not audio.ffmpeg_available():
+        if AUDIO_PREPROCESS == "always":
+            raise Exception("ffmpeg is required for audio pre-processing")
+        return False
+    return AUDIO_PREPROCESS == "always" or os.path.getsize(audio_file_path) >= AUDIO_PREPROCESS_MIN_BYTES
+
+def _transcribe_original(audio_file_path):
+    if _use_long_audio_mode(audio_file_path):
+        return _transcribe_long_audio(audio_file_path)
+    return _transcribe_file(audio_file_path)
+
+def _transcribe_preprocessed(audio_file_path):
+    """Transcribe a compact mono copy of the recording, with timestamps mapped back to the original."""
+    work_dir = tempfile.mkdtemp(prefix="preprocess_")
+    try:
+        compact_path = os.path.join(work_dir, "audio.ogg")
+        with span("preprocess"):
+            offset = audio.preprocess(
+                audio_file_path, compact_path,
+                sample_rate=AUDIO_SAMPLE_RATE, bitrate=AUDIO_BITRATE, trim_silence=AUDIO_TRIM_SILENCE
+            )
+        logger.debug(
+            f"Pre-processed {audio_file_path}: {os.path.getsize(audio_file_path)} -> "
+            f"{os.path.getsize(compact_path)} bytes, {offset:.1f}s of leading silence trimmed"
+        )
+        result = _transcribe_original(compact_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for segment in result["segments"]:
+        segment["start"] += offset
+        segment["end"] += offset
+    return result
+
+def _use_long_audio_mode(audio_file_path):
+    if TRANSCRIBE_LONG_AUDIO == "never":
+        return False
+
+    too_large = os.path.getsize(audio_file_path) > WHISPER_MAX_BYTES
+    if not audio.ffmpeg_available():
+        if too_large or TRANSCRIBE_LONG_AUDIO == "always":
+            raise Exception("ffmpeg is required to split recordings for long-audio transcription")
+        return False
+
+    if too_large or TRANSCRIBE_LONG_AUDIO == "always":
+        return True
+    return audio.probe_duration(audio_file_path) > LONG_AUDIO_MIN_SECONDS
+
+def _transcribe_file(audio_file_path, offset=0.0):
+    """Transcribe a single file in one request, shifting timestamps by offset."""
+    def request():
+        # Reopened on every attempt so a retry uploads the whole file again
+        with open(audio_file_path, "rb") as audio_file:
+            return get_client().audio.transcriptions.create(
+                model="whisper-1", 
+                file=audio_file,
+                response_format="verbose_json"
+            )
+    
+    response = call_with_retries(request, "audio")
+    AUDIO_BYTES_SENT.inc(os.path.getsize(audio_file_path))
+    segments = [
+        {"start": offset + segment.start, "end": offset + segment.end, "text": segment.text.strip()}
+        for segment in (response.segments or [])
+    ]
+    return {"text": response.text, "segments": segments}
+
+def _transcribe_segment(audio_file_path, start, begin, cut, end, work_dir):
+    """Cut out and transcribe one segment of a plan_segments plan, keeping the text that starts in it."""
+    # Pre-processed recordings are already compact Opus; keep segments in the same codec
+    extension = "ogg" if audio_file_path.endswith(".ogg") else "mp3"
+    segment_path = os.path.join(work_dir, f"segment_{start:010.3f}.{extension}")
+    audio.extract_segment(audio_file_path, start, end - start, segment_path)
+
+    # API errors are already retried by call_with_retries; anything else fails the job, which is retried as a whole
+    result = _transcribe_file(segment_path, offset=start)
+
+    # Text starting outside [begin, cut) is kept by the neighbouring segment; it was only transcribed for context
+    return [
+        segment for segment in result["segments"]
+        if segment["start"] >= begin and (segment["start"] < cut or cut == end)
+    ]
+
+def _transcribe_long_audio(audio_file_path):
+    """
+    Split a recording on silence into overlapping segments and transcribe them concurrently.
+    """
+    duration = audio.probe_duration(audio_file_path)
+    silences = audio.detect_silences(audio_file_path)
+    plan = audio.plan_segments(duration, silences, SEGMENT_SECONDS, SEGMENT_OVERLAP_SECONDS)
+    logger.debug(f"Transcribing {duration:.0f}s of audio as {len(plan)} segments")
+
+    work_dir = tempfile.mkdtemp(prefix="transcribe_")
+    try:
+        with ThreadPoolExecutor(max_workers=TRANSCRIBE_CONCURRENCY) as executor:
+            results = list(executor.map(
+                lambda segment: _transcribe_segment(audio_file_path, *segment, work_dir),
+                plan
+            ))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    segments = [segment for segment_list in results for segment in segment_list]
+    text = " ".join(segment["text"] for segment in segments if segment["text"])
+    return {"text": text, "segments": segments}
+
+SYSTEM_PROMPT = "You are a software engineering meeting assistant that extracts key information from meeting transcripts."
+
+def count_tokens(text):
+    """
+    Count the tokens in text for the summary model.
+    
+    Uses tiktoken when it is installed and falls back to an estimate of four
+    characters per token otherwise.
+    
+    Args:
+        text (str): The text to measure
+        
+    Returns:
+        int: Number of tokens
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(text) // 4 + 1
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    # Loaded on first use: building the tokenizer's tables is slow and may download them
+    return tiktoken.encoding_for_model(SUMMARY_MODEL) if tiktoken else None
+
+def split_transcript(transcript, max_tokens):
+    """
+    Split a transcript into chunks of at most max_tokens, breaking between sentences.
+    
+    A single sentence longer than max_tokens becomes a chunk of its own.
+    
+    Args:
+        transcript (str): The meeting transcript
+        max_tokens (int): Token budget per chunk
+        
+    Returns:
+        list: Transcript chunks, in order
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for sentence in _SENTENCE_BOUNDARY.split(transcript):
+        sentence_tokens = count_tokens(sentence)
+        if current and current_tokens + sentence_tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current = []
+            current_tokens = 0
+        current.append(sentence)
+        current_tokens += sentence_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def generate_meeting_summary(transcript, on_item=None):
     """
     Generate a structured summary of the meeting transcript using OpenAI GPT-3.5-turbo. This works
     
+    Transcripts longer than SUMMARY_SINGLE_PASS_TOKENS are summarized
+    hierarchically (see _generate_hierarchical_summary). With on_item and
+    SUMMARY_STREAMING, the final completion is streamed and each part of the
+    summary is reported as soon as it has been generated.
+    
     Args:
         transcript (str): The meeting transcript
+        on_item (callable): Optional; called as on_item(kind, position, value) with kind
+            "summary", "decision" or "action_item". A retried request reports the
+            same positions again.
         
     Returns:
         dict: A dictionary containing summary, decisions, and action items
@@ -45,7 +320,37 @@ def generate_meeting_summary(transcript):
     try:
         logger.debug("Generating meeting summary")
         
-        prompt = f"""
+        cache = get_cache()
+        if cache:
+            cache_key = make_key(
+                "summary", hashlib.sha256(transcript.encode("utf-8")).hexdigest(), SUMMARY_MODEL,
+                SUMMARY_PROMPT_VERSION, SUMMARY_SINGLE_PASS_TOKENS, SUMMARY_CHUNK_TOKENS
+            )
+            cached = cache.get(cache_key)
+            CACHE_LOOKUPS.inc(kind="summary", result="miss" if cached is None else "hit")
+            if cached is not None:
+                logger.debug("Using cached meeting summary")
+                if on_item:
+                    _report_summary(cached, on_item)
+                return cached
+        
+        result = _generate_summary(transcript, on_item)
+        if cache:
+            cache.set(cache_key, result)
+        return result
+    except Exception as e:
+        logger.error(f"Error generating meeting summary: {str(e)}")
+        raise Exception(f"Failed to generate meeting summary: {str(e)}")
+
+def _generate_summary(transcript, on_item=None):
+    """Summarize in one call, or hierarchically when the transcript is too long for one prompt."""
+    if count_tokens(transcript) > SUMMARY_SINGLE_PASS_TOKENS:
+        return _generate_hierarchical_summary(transcript, on_item)
+
+    return _complete_json(_summary_prompt(transcript), on_item)
+
+def _summary_prompt(transcript):
+    return f"""
         You are an AI assistant specialized in summarizing software engineering meetings.
         Analyze the following meeting transcript and provide a structured response in JSON format with no additional text:
 
@@ -63,30 +368,335 @@ def generate_meeting_summary(transcript):
 
         Your answer should be only JSON.
         """
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a software engineering meeting assistant that extracts key information from meeting transcripts."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2
+
+def _chat_request(prompt):
+    """The chat completion parameters for a summarization prompt."""
+    return {
+        "model": SUMMARY_MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.2
+    }
+
+def _complete_json(prompt, on_item=None):
+    """Run a chat completion and parse the JSON object in its output."""
+    if on_item and SUMMARY_STREAMING:
+        return _stream_json(prompt, on_item)
+    
+    response = call_with_retries(
+        lambda: get_client().chat.completions.create(**_chat_request(prompt)),
+        "chat",
+        tokens=count_tokens(prompt) + SUMMARY_COMPLETION_TOKENS
+    )
+    
+    if response.usage:
+        OPENAI_TOKENS.inc(response.usage.prompt_tokens, type="prompt")
+        OPENAI_TOKENS.inc(response.usage.completion_tokens, type="completion")
+    result = _parse_json_output(response.choices[0].message.content)
+    if on_item:
+        _report_summary(result, on_item)
+    return result
+
+def _stream_json(prompt, on_item):
+    """
+    Run a streamed chat completion, parsing its JSON as the tokens arrive.
+    
+    Each finished summary, decision and action item is passed to on_item
+    while the rest is still being generated.
+    """
+    def request():
+        parser = JSONStreamParser()
+        stream = get_client().chat.completions.create(
+            **_chat_request(prompt),
+            stream=True,
+            stream_options={"include_usage": True}
         )
-        
-        # Debug: Print raw output
-        raw_output = response.choices[0].message.content
-        #print("Raw response from model:")
-        #print(raw_output)
-        
-        # Attempt to extract JSON from the raw output
-        import re
+        for chunk in stream:
+            if chunk.usage:
+                OPENAI_TOKENS.inc(chunk.usage.prompt_tokens, type="prompt")
+                OPENAI_TOKENS.inc(chunk.usage.completion_tokens, type="completion")
+            if chunk.choices and chunk.choices[0].delta.content:
+                for path, value in parser.feed(chunk.choices[0].delta.content):
+                    _report_item(path, value, on_item)
+        if parser.result is None:
+            raise Exception("Failed to extract JSON from the response.")
+        return parser.result
+    
+    return call_with_retries(request, "chat", tokens=count_tokens(prompt) + SUMMARY_COMPLETION_TOKENS)
+
+def _report_item(path, value, on_item):
+    if path == ("summary",):
+        on_item("summary", 0, value)
+    elif len(path) == 2 and path[0] == "decisions":
+        on_item("decision", path[1], value)
+    elif len(path) == 2 and path[0] == "action_items":
+        on_item("action_item", path[1], value)
+
+def _report_summary(result, on_item):
+    """Report every part of an already complete summary to on_item."""
+    if "summary" in result:
+        _report_item(("summary",), result["summary"], on_item)
+    for key in ("decisions", "action_items"):
+        for position, value in enumerate(result.get(key) or []):
+            _report_item((key, position), value, on_item)
+
+def _parse_json_output(raw_output):
+    # Attempt to extract JSON from the raw output
+    with span("json_extraction"):
         json_str_match = re.search(r'\{.*\}', raw_output, re.DOTALL)
         if json_str_match:
             json_str = json_str_match.group(0)
-            result = json.loads(json_str)
-        else:
-            raise Exception("Failed to extract JSON from the response.")
+            return json.loads(json_str)
+        raise Exception("Failed to extract JSON from the response.")
 
-        return result
-    except Exception as e:
-        logger.error(f"Error generating meeting summary: {str(e)}")
-        raise Exception(f"Failed to generate meeting summary: {str(e)}")
+def _generate_hierarchical_summary(transcript, on_item=None):
+    """
+    Map-reduce summarization for transcripts that do not fit in one prompt.
+    
+    The transcript is split into token-budgeted chunks, notes are extracted
+    from the chunks in parallel, and the notes are merged in a final reduce
+    call. Latency grows with the number of reduce levels, not with the length
+    of the meeting.
+    """
+    chunks = split_transcript(transcript, SUMMARY_CHUNK_TOKENS)
+    logger.debug(f"Summarizing transcript in {len(chunks)} chunks")
+    
+    with ThreadPoolExecutor(max_workers=SUMMARY_CONCURRENCY) as executor:
+        partials = list(executor.map(
+            lambda indexed: _extract_chunk_notes(indexed[1], indexed[0] + 1, len(chunks)),
+            enumerate(chunks)
+        ))
+    return _reduce_notes(partials, on_item)
+
+def _extract_chunk_notes(chunk, part, total_parts):
+    prompt = f"""
+        You are an AI assistant specialized in summarizing software engineering meetings.
+        The following is part {part} of {total_parts} of a meeting transcript. Provide a structured response in JSON format with no additional text:
+
+        1. Summarize the key topics discussed in this part (limit to 150 words).
+        2. Extract all decisions made in this part.
+        3. Extract all action items and tasks, including who is responsible and deadlines if mentioned.
+
+        Format your response as a JSON object with these keys:
+        - summary: The summary of this part.
+        - decisions: An array of decisions made.
+        - action_items: An array of objects with keys task, assignee and deadline (null if not mentioned).
+
+        Transcript part {part} of {total_parts}:
+        {chunk}
+
+        Your answer should be only JSON.
+        """
+    return _complete_json(prompt)
+
+def _reduce_notes(partials, on_item=None):
+    """Merge chunk notes into one summary, reducing in groups while they are too large for one prompt."""
+    while len(partials) > 1 and count_tokens(json.dumps(partials)) > SUMMARY_SINGLE_PASS_TOKENS:
+        groups = [partials[i:i + SUMMARY_REDUCE_FAN_IN] for i in range(0, len(partials), SUMMARY_REDUCE_FAN_IN)]
+        with ThreadPoolExecutor(max_workers=SUMMARY_CONCURRENCY) as executor:
+            partials = list(executor.map(_merge_notes, groups))
+    return _merge_notes(partials, on_item)
+
+def _merge_notes(partials, on_item=None):
+    notes = {
+        "summaries": [partial.get("summary", "") for partial in partials],
+        "decisions": _unique(decision for partial in partials for decision in partial.get("decisions", [])),
+        "action_items": _unique(item for partial in partials for item in partial.get("action_items", []))
+    }
+    prompt = f"""
+        You are an AI assistant specialized in summarizing software engineering meetings.
+        The following JSON holds notes taken from consecutive parts of one meeting. Combine them into a structured response in JSON format with no additional text:
+
+        1. Create a concise summary of the key topics discussed across the whole meeting (limit to 400 words).
+        2. Merge the decisions, removing duplicates and near-duplicates.
+        3. Merge the action items, removing duplicates and combining entries that describe the same task.
+
+        Format your response as a JSON object with these keys:
+        - summary: The meeting summary.
+        - decisions: An array of decisions made.
+        - action_items: An array of objects with keys task, assignee and deadline (null if not mentioned).
+
+        Meeting notes:
+        {json.dumps(notes)}
+
+        Your answer should be only JSON.
+        """
+    return _complete_json(prompt, on_item)
+
+def update_running_summary(notes, new_text):
+    """
+    Fold the newest part of a live meeting's transcript into its running summary.
+    
+    Only the new text and the current notes are sent, so each update costs
+    about the same however long the meeting has run.
+    
+    Args:
+        notes (dict): The running summary (summary, decisions, action_items), or None for the first update
+        new_text (str): Transcript text added since the last update
+        
+    Returns:
+        dict: The updated summary, in the format of generate_meeting_summary
+    """
+    if not notes:
+        return _extract_chunk_notes(new_text, 1, 1)
+
+    prompt = f"""
+        You are an AI assistant specialized in summarizing software engineering meetings.
+        The following JSON is a running summary of a meeting that is still in progress, followed by the newest part of its transcript. Update the summary and provide a structured response in JSON format with no additional text:
+
+        1. Create a concise summary of the key topics discussed so far (limit to 400 words).
+        2. Keep the existing decisions and add any decisions made in the new part.
+        3. Keep the existing action items, add new ones and update any the new part changes, including who is responsible and deadlines if mentioned.
+
+        Format your response as a JSON object with these keys:
+        - summary: The meeting summary.
+        - decisions: An array of decisions made.
+        - action_items: An array of objects with keys task, assignee and deadline (null if not mentioned).
+
+        Running summary:
+        {json.dumps(notes)}
+
+        Newest part of the transcript:
+        {new_text}
+
+        Your answer should be only JSON.
+        """
+    return _complete_json(prompt)
+
+def answer_question(question, passages):
+    """
+    Answer a question about past meetings from retrieved transcript passages.
+    
+    Only the passages are sent, not whole transcripts, so the prompt stays
+    a few thousand tokens however many meetings are stored.
+    
+    Args:
+        question (str): The question
+        passages (list): Passage dicts from vector_index.search_chunks
+        
+    Returns:
+        str: The answer, citing passages by their number
+    """
+    excerpts = "\n\n".join(
+        f"[{number}] {passage['meeting_title']} ({passage['meeting_created_at'][:10]}"
+        f"{_format_offset(passage['start'])}):\n{passage['text']}"
+        for number, passage in enumerate(passages, 1)
+    )
+    prompt = f"""
+        Answer the question below using only these numbered excerpts from meeting transcripts.
+        Cite the excerpts you use by number, like [2]. If the excerpts do not contain the answer, say so.
+
+        Excerpts:
+        {excerpts}
+
+        Question: {question}
+        """
+    request = _chat_request(prompt)
+    request["messages"][0]["content"] = "You are a software engineering meeting assistant that answers questions about past meetings."
+    response = call_with_retries(
+        lambda: get_client().chat.completions.create(**request),
+        "chat",
+        tokens=count_tokens(prompt) + SUMMARY_COMPLETION_TOKENS
+    )
+    if response.usage:
+        OPENAI_TOKENS.inc(response.usage.prompt_tokens, type="prompt")
+        OPENAI_TOKENS.inc(response.usage.completion_tokens, type="completion")
+    return response.choices[0].message.content.strip()
+
+def _format_offset(seconds):
+    """", at 12:34" for a passage that starts 12 minutes 34 seconds into the meeting."""
+    if seconds is None:
+        return ""
+    minutes, seconds = divmod(int(seconds), 60)
+    return f", at {minutes}:{seconds:02d}"
+
+def submit_summary_batch(transcripts):
+    """
+    Submit summaries of many transcripts as one OpenAI Batch API job.
+
+    Batch requests are billed at half the price of regular ones, run within
+    24 hours and do not count against the per-minute chat quota, so a
+    backfill does not compete with live traffic. Only transcripts that fit
+    in a single prompt can be batched.
+
+    Args:
+        transcripts (dict): Transcript text by meeting ID, each at most SUMMARY_SINGLE_PASS_TOKENS
+
+    Returns:
+        str: The batch ID, for fetch_summary_batch
+    """
+    lines = "\n".join(
+        json.dumps({
+            "custom_id": meeting_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _chat_request(_summary_prompt(transcript))
+        })
+        for meeting_id, transcript in transcripts.items()
+    )
+    batch_file = call_with_retries(
+        lambda: get_client().files.create(file=("summaries.jsonl", lines.encode("utf-8")), purpose="batch"),
+        "batch"
+    )
+    batch = call_with_retries(
+        lambda: get_client().batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={"prompt_version": str(SUMMARY_PROMPT_VERSION)}
+        ),
+        "batch"
+    )
+    logger.info(f"Submitted summary batch {batch.id} with {len(transcripts)} request(s)")
+    return batch.id
+
+def fetch_summary_batch(batch_id):
+    """
+    Collect the results of a summary batch, if it has finished.
+
+    Args:
+        batch_id (str): ID returned by submit_summary_batch
+
+    Returns:
+        dict or None: None while the batch is still running; otherwise the
+        summary dict by meeting ID. Requests that failed, or that the batch
+        never ran, are missing from the result.
+    """
+    batch = call_with_retries(lambda: get_client().batches.retrieve(batch_id), "batch")
+    if batch.status in ("validating", "in_progress", "finalizing", "cancelling"):
+        return None
+    if batch.status != "completed":
+        logger.warning(f"Summary batch {batch_id} ended with status {batch.status}")
+
+    results = {}
+    if batch.output_file_id:
+        output = call_with_retries(lambda: get_client().files.content(batch.output_file_id), "batch")
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            body = response["body"]
+            usage = body.get("usage") or {}
+            OPENAI_TOKENS.inc(usage.get("prompt_tokens", 0), type="prompt")
+            OPENAI_TOKENS.inc(usage.get("completion_tokens", 0), type="completion")
+            try:
+                results[record["custom_id"]] = _parse_json_output(body["choices"][0]["message"]["content"])
+            except Exception as e:
+                logger.warning(f"Unusable summary for meeting {record['custom_id']} in batch {batch_id}: {str(e)}")
+    return results
+
+def _unique(items):
+    """Drop exact duplicates (ignoring case and surrounding whitespace), keeping order."""
+    seen = set()
+    result = []
+    for item in items:
+        key = json.dumps(item, sort_keys=True).lower() if isinstance(item, dict) else str(item).strip().lower()
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
@@ -0,0 +1,212 @@
+import os
+import time
+import atexit
+import logging
+from contextlib import contextmanager
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+# Metrics cost a prometheus_client update per observation; with METRICS_ENABLED off they cost a flag check
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+if METRICS_ENABLED and prometheus_client is None:
+    logger.warning("METRICS_ENABLED is set but prometheus_client is not installed; metrics are disabled")
+    METRICS_ENABLED = False
+
+# prometheus_client's multiprocess mode: with several processes (gunicorn workers, worker.py), point
+# them all at one directory, empty when they start, and /metrics adds up their values. Unset, every
+# process reports only its own values (gunicorn.conf.py sets this up for its workers)
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+
+# Stage durations range from a DB commit (milliseconds) to a long transcription (many minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+_callback_gauges = []
+
+class _Metric:
+    """A prometheus_client metric that records nothing unless METRICS_ENABLED is set."""
+    metric_class = None
+
+    def __init__(self, name, documentation, labelnames=(), **kwargs):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._metric = None
+        if prometheus_client is not None:
+            self._metric = getattr(prometheus_client, self.metric_class)(
+                name, documentation, self.labelnames, **kwargs
+            )
+
+    def _child(self, labels):
+        return self._metric.labels(**labels) if self.labelnames else self._metric
+
+class Counter(_Metric):
+    """A monotonically increasing count, e.g. requests or tokens."""
+    metric_class = "Counter"
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        self._child(labels).inc(amount)
+
+class Histogram(_Metric):
+    """Observed values (usually durations) in cumulative buckets, with their count and sum."""
+    metric_class = "Histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames, buckets=buckets)
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        self._child(labels).observe(value)
+
+class Gauge(_Metric):
+    """
+    A value that goes up and down.
+
+    Either set by each process (set), with multiprocess_mode saying how the
+    values of several processes are combined (see prometheus_client, e.g.
+    "livesum" to add up the live processes or "liveall" to report each with
+    a pid label), or sampled from a callback returning a value or {label
+    tuple: value} by the process serving the scrape, for values every
+    process sees alike, e.g. read from the database.
+    """
+    metric_class = "Gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None, multiprocess_mode="livesum"):
+        self.callback = callback
+        if callback is None:
+            super().__init__(name, documentation, labelnames, multiprocess_mode=multiprocess_mode)
+        else:
+            self.name = name
+            self.documentation = documentation
+            self.labelnames = tuple(labelnames)
+            self._metric = None
+            _callback_gauges.append(self)
+
+    def set(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        self._child(labels).set(value)
+
+class _CallbackCollector:
+    """Samples the callback gauges at scrape time."""
+
+    def collect(self):
+        for gauge in _callback_gauges:
+            family = GaugeMetricFamily(gauge.name, gauge.documentation, labels=gauge.labelnames)
+            values = gauge.callback()
+            for key, value in (values.items() if isinstance(values, dict) else [((), values)]):
+                family.add_metric(list(key), value)
+            yield family
+
+_callbacks = _CallbackCollector()
+if prometheus_client is not None and not MULTIPROC_DIR:
+    prometheus_client.REGISTRY.register(_callbacks)
+
+STAGE_SECONDS = Histogram(
+    "meeting_stage_seconds",
+    "Time spent in each stage of handling a recording",
+    ["stage"]
+)
+STAGE_FAILURES = Counter(
+    "meeting_stage_failures_total",
+    "Pipeline stages that raised an error",
+    ["stage"]
+)
+OPENAI_TOKENS = Counter(
+    "openai_tokens_total",
+    "Tokens billed by chat completions",
+    ["type"]
+)
+OPENAI_REQUEST_FAILURES = Counter(
+    "openai_request_failures_total",
+    "OpenAI requests that failed, including ones that were retried",
+    ["kind", "error"]
+)
+AUDIO_SECONDS = Counter(
+    "audio_seconds_processed_total",
+    "Seconds of audio transcribed (cache hits excluded)"
+)
+AUDIO_BYTES_SENT = Counter(
+    "audio_bytes_sent_total",
+    "Bytes of audio uploaded to the transcription API (successful requests only)"
+)
+CACHE_LOOKUPS = Counter(
+    "result_cache_lookups_total",
+    "Result cache lookups",
+    ["kind", "result"]
+)
+JOB_FAILURES = Counter(
+    "job_failures_total",
+    "Failed job attempts; final is true when the job will not be retried",
+    ["final"]
+)
+
+@contextmanager
+def span(stage):
+    """
+    Time a block of work as one pipeline stage.
+
+    The duration is recorded in meeting_stage_seconds; an exception raised
+    inside the block is also counted in meeting_stage_failures_total.
+
+    Args:
+        stage (str): Stage name, e.g. "transcription"
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+def render_metrics():
+    """
+    Render every metric in the Prometheus text exposition format.
+
+    Without PROMETHEUS_MULTIPROC_DIR the values are this process's own.
+    With it, they are combined over every process that wrote to the
+    directory, so a scrape reports the same totals whichever worker serves
+    it. Counters of processes that have exited are kept, so totals never go
+    down.
+
+    Returns:
+        str: The exposition text
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=MULTIPROC_DIR)
+        registry.register(_callbacks)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry).decode()
+
+def mark_process_dead(pid):
+    """
+    Drop the live gauges of an exited process from PROMETHEUS_MULTIPROC_DIR, keeping its counters and histograms.
+
+    Processes do this themselves on a normal exit; gunicorn.conf.py also
+    calls it for workers that were killed.
+
+    Args:
+        pid (int): The process that exited
+    """
+    if prometheus_client is None or not MULTIPROC_DIR:
+        return
+    multiprocess.mark_process_dead(pid, MULTIPROC_DIR)
+
+# Looked up at exit, so a forked child marks itself rather than its parent
+atexit.register(lambda: mark_process_dead(os.getpid()))
@@ -0,0 +1,124 @@
+import logging
+from sqlalchemy import bindparam, inspect, text
+from app import db
+from models import MeetingText
+from summary_items import backfill_summary_items
+from textstore import compress_text
+
+logger = logging.getLogger(__name__)
+
+def upgrade_schema():
+    """
+    Bring an existing database up to date with the models.
+
+    db.create_all() only creates missing tables, so columns and indexes added
+    to existing models are created here. New columns are always added as
+    nullable and backfilled afterwards.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            logger.info(f"Adding column {table.name}.{column.name}")
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                logger.info(f"Creating index {index.name}")
+                index.create(engine, checkfirst=True)
+
+    _backfill_meeting_status()
+    _backfill_job_priority()
+    _move_meeting_text()
+    backfill_summary_items()
+
+def _backfill_meeting_status():
+    """Derive Meeting.status for rows created before the column existed."""
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE meeting SET status = CASE "
+            "WHEN error IS NOT NULL THEN 'error' "
+            "WHEN processed THEN 'done' "
+            "ELSE 'uploaded' END "
+            "WHERE status IS NULL"
+        ))
+
+def _backfill_job_priority():
+    """Give jobs queued before priorities existed the normal priority."""
+    with db.engine.begin() as conn:
+        conn.execute(text("UPDATE job SET priority = 0 WHERE priority IS NULL"))
+
+def _move_meeting_text(batch_size=200):
+    """
+    Move transcripts stored inline on the meeting table into compressed meeting_text rows.
+
+    The old columns are left in place but emptied; on SQLite the file is
+    then vacuumed to give the freed pages back (see reclaim_space).
+    """
+    columns = {column["name"] for column in inspect(db.engine).get_columns("meeting")}
+    fields = [field for field in ("transcript", "transcript_segments") if field in columns]
+    if not fields:
+        return
+
+    select_rows = text(
+        f"SELECT id, {', '.join(fields)} FROM meeting "
+        f"WHERE {' OR '.join(f'{field} IS NOT NULL' for field in fields)} LIMIT :limit"
+    )
+    clear_rows = text(
+        f"UPDATE meeting SET {', '.join(f'{field} = NULL' for field in fields)} WHERE id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+
+    moved = 0
+    while True:
+        with db.engine.begin() as conn:
+            rows = conn.execute(select_rows, {"limit": batch_size}).all()
+            if not rows:
+                break
+            entries = []
+            for row in rows:
+                for field, value in zip(fields, row[1:]):
+                    if value is not None:
+                        codec, data = compress_text(value)
+                        entries.append({"meeting_id": row[0], "field": field, "codec": codec,
+                                        "size": len(value.encode("utf-8")), "data": data})
+            ids = [row[0] for row in rows]
+            # Rows written by a newer process take precedence over the inline copy
+            existing = set(conn.execute(
+                MeetingText.__table__.select().with_only_columns(MeetingText.meeting_id, MeetingText.field)
+                .where(MeetingText.meeting_id.in_(ids))
+            ).all())
+            entries = [entry for entry in entries if (entry["meeting_id"], entry["field"]) not in existing]
+            if entries:
+                conn.execute(MeetingText.__table__.insert(), entries)
+            conn.execute(clear_rows, {"ids": ids})
+            moved += len(rows)
+
+    if moved:
+        logger.info(f"Moved the transcripts of {moved} meeting(s) into compressed storage")
+        reclaim_space()
+
+def reclaim_space():
+    """
+    Shrink the SQLite database file after a migration freed a large part of it.
+
+    SQLite keeps deleted pages in the file for reuse; VACUUM rewrites the
+    file without them. It needs free disk space about the size of the
+    database and blocks writers while it runs, so it is only called after
+    one-off migrations. Does nothing on other databases.
+    """
+    if db.engine.dialect.name != "sqlite":
+        return
+    logger.info("Vacuuming the database to reclaim freed space")
+    db.session.commit()
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
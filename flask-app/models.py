@@ -1,19 +1,73 @@
 from app import db
 from datetime import datetime
+from sqlalchemy.orm import deferred, selectinload, undefer_group
+from sqlalchemy.orm.collections import attribute_keyed_dict
+from textstore import compress_text, decompress_text
 import uuid
 
+# Processing stages reported on Meeting.status as a recording moves through the pipeline
+MEETING_STATUSES = ("uploaded", "live", "transcribing", "summarizing", "done", "error")
+
+# Lifecycle of a background processing job
+JOB_STATUSES = ("pending", "running", "done", "failed")
+
 class Meeting(db.Model):
+    __table_args__ = (
+        # Supports the keyset-paginated history listing (newest first)
+        db.Index("ix_meeting_created_at_id", "created_at", "id"),
+        db.Index("ix_meeting_status", "status"),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = db.Column(db.String(255), nullable=False)
     recording_filename = db.Column(db.String(255), nullable=False)
     original_filename = db.Column(db.String(255), nullable=False)
-    transcript = db.Column(db.Text, nullable=True)
-    summary = db.Column(db.Text, nullable=True)
-    decisions = db.Column(db.Text, nullable=True)
-    action_items = db.Column(db.Text, nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # SHA-256 of the recording
+    # The notes are loaded on first access, so fetching a meeting for its state does not read them
+    summary = deferred(db.Column(db.Text, nullable=True), group="notes")
+    decisions = deferred(db.Column(db.Text, nullable=True), group="notes")
+    action_items = deferred(db.Column(db.Text, nullable=True), group="notes")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     processed = db.Column(db.Boolean, default=False)
     error = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), default="uploaded")
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Transcript text, compressed in a side table and loaded only when read; see MeetingText
+    texts = db.relationship(
+        "MeetingText",
+        collection_class=attribute_keyed_dict("field"),
+        cascade="all, delete-orphan",
+        lazy="select"
+    )
+
+    def _get_text(self, field):
+        entry = self.texts.get(field)
+        return entry.text if entry is not None else None
+
+    def _set_text(self, field, value):
+        if value is None:
+            self.texts.pop(field, None)
+        elif field in self.texts:
+            self.texts[field].text = value
+        else:
+            self.texts[field] = MeetingText(field=field, text=value)
+
+    @property
+    def transcript(self):
+        return self._get_text("transcript")
+
+    @transcript.setter
+    def transcript(self, value):
+        self._set_text("transcript", value)
+
+    @property
+    def transcript_segments(self):
+        """JSON list of {"start", "end", "text"}."""
+        return self._get_text("transcript_segments")
+
+    @transcript_segments.setter
+    def transcript_segments(self, value):
+        self._set_text("transcript_segments", value)
 
     def to_dict(self):
         return {
@@ -26,5 +80,183 @@ class Meeting(db.Model):
             "action_items": self.action_items,
             "created_at": self.created_at.isoformat(),
             "processed": self.processed,
+            "status": self.status,
+            "error": self.error
+        }
+
+    def to_list_dict(self):
+        """The lightweight projection used by listings; touches none of the large text columns."""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "original_filename": self.original_filename,
+            "created_at": self.created_at.isoformat(),
+            "processed": self.processed,
+            "status": self.status,
             "error": self.error
         }
+
+    def to_status_dict(self):
+        """Processing state only; what status watchers need until the meeting completes."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "processed": self.processed,
+            "error": self.error
+        }
+
+class MeetingText(db.Model):
+    """
+    A large text field of a meeting, stored compressed (see textstore.py).
+
+    Transcripts grow with the length of the meeting and compress several
+    times over; keeping them out of the meeting table keeps its rows small
+    for listings, status checks and the page cache.
+    """
+    __tablename__ = "meeting_text"
+
+    meeting_id = db.Column(db.String(36), db.ForeignKey("meeting.id"), primary_key=True)
+    field = db.Column(db.String(32), primary_key=True)  # "transcript" or "transcript_segments"
+    codec = db.Column(db.String(8), nullable=False)
+    size = db.Column(db.Integer, nullable=False)  # Uncompressed size in bytes
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    @property
+    def text(self):
+        return decompress_text(self.codec, self.data)
+
+    @text.setter
+    def text(self, value):
+        self.codec, self.data = compress_text(value)
+        self.size = len(value.encode("utf-8"))
+
+# Loader options for code that reads a meeting's notes and transcript: two queries instead of one per group
+FULL_MEETING = (undefer_group("notes"), selectinload(Meeting.texts))
+
+class Decision(db.Model):
+    """A decision extracted from a meeting, one row per decision."""
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_id = db.Column(db.String(36), db.ForeignKey("meeting.id"), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "meeting_id": self.meeting_id,
+            "text": self.text,
+            "created_at": self.created_at.isoformat()
+        }
+
+class ActionItem(db.Model):
+    """An action item extracted from a meeting, queryable across meetings by assignee and deadline."""
+    __table_args__ = (
+        db.Index("ix_action_item_assignee_status", "assignee", "status"),
+        db.Index("ix_action_item_status_due_date", "status", "due_date"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_id = db.Column(db.String(36), db.ForeignKey("meeting.id"), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    task = db.Column(db.Text, nullable=False)
+    assignee = db.Column(db.String(255), nullable=True)
+    deadline = db.Column(db.String(255), nullable=True)  # As stated in the meeting, e.g. "End of the week"
+    due_date = db.Column(db.Date, nullable=True)  # Set when the deadline is an ISO date
+    status = db.Column(db.String(20), nullable=False, default="open")
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "meeting_id": self.meeting_id,
+            "task": self.task,
+            "assignee": self.assignee,
+            "deadline": self.deadline,
+            "due_date": self.due_date.isoformat() if self.due_date else None,
+            "status": self.status,
+            "created_at": self.created_at.isoformat()
+        }
+
+class TranscriptChunk(db.Model):
+    """
+    A passage of a meeting's transcript embedded in the vector index (see vector_index.py).
+
+    vector_row is the passage's row in the index file; rows whose chunk has
+    been replaced are ignored by searches.
+    """
+    __tablename__ = "transcript_chunk"
+
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_id = db.Column(db.String(36), db.ForeignKey("meeting.id"), nullable=False, index=True)
+    vector_row = db.Column(db.Integer, nullable=False, unique=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    start = db.Column(db.Float, nullable=True)  # Seconds into the recording, when the transcript has timestamps
+    end = db.Column(db.Float, nullable=True)
+    text = db.Column(db.Text, nullable=False)
+
+    def to_dict(self):
+        return {
+            "meeting_id": self.meeting_id,
+            "position": self.position,
+            "start": self.start,
+            "end": self.end,
+            "text": self.text
+        }
+
+class Job(db.Model):
+    """A durable unit of background work; one row per meeting recording to process."""
+    __table_args__ = (
+        # Supports claiming the highest-priority, oldest pending job
+        db.Index("ix_job_status_priority_id", "status", "priority", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_id = db.Column(db.String(36), db.ForeignKey("meeting.id"), nullable=False, index=True)
+    file_path = db.Column(db.String(1024), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending", index=True)
+    stage = db.Column(db.String(32), nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    priority = db.Column(db.Integer, nullable=False, default=0)  # Higher runs first; bulk imports are negative
+    worker_id = db.Column(db.String(64), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "meeting_id": self.meeting_id,
+            "status": self.status,
+            "stage": self.stage,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class UploadSession(db.Model):
+    """A resumable, chunked upload of one recording; see uploads.py."""
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    title = db.Column(db.String(255), nullable=False)
+    original_filename = db.Column(db.String(255), nullable=False)
+    stored_filename = db.Column(db.String(255), nullable=False)
+    total_size = db.Column(db.BigInteger, nullable=False)
+    received = db.Column(db.BigInteger, nullable=False, default=0)
+    sha256 = db.Column(db.String(64), nullable=True)
+    meeting_id = db.Column(db.String(36), db.ForeignKey("meeting.id"), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "original_filename": self.original_filename,
+            "size": self.total_size,
+            "offset": self.received,
+            "complete": self.meeting_id is not None,
+            "meeting_id": self.meeting_id
+        }
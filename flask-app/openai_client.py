@@ -0,0 +1,205 @@
+import os
+import time
+import random
+import logging
+import threading
+from metrics import OPENAI_REQUEST_FAILURES
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+
+# HTTP transport
+OPENAI_TIMEOUT = float(os.environ.get("OPENAI_TIMEOUT", 120))
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get("OPENAI_CONNECT_TIMEOUT", 10))
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", 32))
+OPENAI_MAX_KEEPALIVE = int(os.environ.get("OPENAI_MAX_KEEPALIVE", 16))
+
+# Retries with jittered exponential backoff
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", 6))
+OPENAI_BACKOFF_BASE = float(os.environ.get("OPENAI_BACKOFF_BASE", 1.0))
+OPENAI_BACKOFF_MAX = float(os.environ.get("OPENAI_BACKOFF_MAX", 60.0))
+
+# Per-process quotas; with several processes, set each to its share of the account limit (0 = unlimited)
+RATE_LIMITS = {
+    "chat": (int(os.environ.get("OPENAI_CHAT_RPM", 3500)), int(os.environ.get("OPENAI_CHAT_TPM", 90000))),
+    "audio": (int(os.environ.get("OPENAI_AUDIO_RPM", 50)), 0),
+    "embeddings": (int(os.environ.get("OPENAI_EMBEDDINGS_RPM", 3000)), int(os.environ.get("OPENAI_EMBEDDINGS_TPM", 1000000))),
+    "batch": (int(os.environ.get("OPENAI_BATCH_RPM", 100)), 0)  # File uploads and batch management, not the batched requests
+}
+
+# The openai package (and httpx under it) is imported on first use rather than
+# with this module: it takes most of a second to import, which every process
+# would otherwise pay at startup whether or not it calls the API.
+
+def _retryable_errors():
+    import openai
+    return (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+class TokenBucket:
+    """
+    A thread-safe token bucket refilled continuously at rate_per_minute.
+
+    Callers reserve tokens up front and then wait out any deficit, so waiting
+    callers are served in arrival order and never busy-loop.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        """
+        Args:
+            rate_per_minute (float): Refill rate
+            capacity (float): Largest burst; defaults to one minute's worth
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        """
+        Take amount tokens, going into debt if needed.
+
+        Args:
+            amount (float): Tokens needed; capped at capacity so oversized requests can still run
+
+        Returns:
+            float: Seconds the caller must wait before proceeding
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def drain(self, seconds):
+        """Push the bucket into debt so that no capacity is available for the given time."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class RateLimiter:
+    """Request-per-minute and token-per-minute limits for one API endpoint family."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute=0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, tokens=0):
+        """Block until a request using the given number of tokens may be sent."""
+        delay = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Hold back every caller for the given time, e.g. after the provider returned 429."""
+        if self.requests:
+            self.requests.drain(seconds)
+        if self.tokens:
+            self.tokens.drain(seconds)
+
+_client = None
+_limiters = {}
+_lock = threading.Lock()
+
+def get_client():
+    """
+    The shared OpenAI client, created on first use.
+
+    It uses a pooled HTTP transport with explicit timeouts. The SDK's own
+    retries are turned off because call_with_retries handles them.
+
+    Returns:
+        OpenAI: The client
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            import httpx
+            from openai import OpenAI
+            _client = OpenAI(
+                api_key=OPENAI_API_KEY,
+                max_retries=0,
+                http_client=httpx.Client(
+                    timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE
+                    )
+                )
+            )
+        return _client
+
+def _reset_after_fork():
+    """Forget the parent process's clients and limiters in a forked child; their connections and locks belong to the parent."""
+    global _client, _limiters, _lock
+    _client = None
+    _limiters = {}
+    _lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):  # Not available on Windows, which cannot fork
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_rate_limiter(kind):
+    """
+    The process-wide rate limiter for an endpoint family.
+
+    Args:
+        kind (str): "chat", "audio", "embeddings" or "batch"
+
+    Returns:
+        RateLimiter: The limiter, configured from RATE_LIMITS
+    """
+    with _lock:
+        if kind not in _limiters:
+            _limiters[kind] = RateLimiter(*RATE_LIMITS[kind])
+        return _limiters[kind]
+
+def _backoff_delay(attempt, error):
+    """Honour Retry-After when the provider sends it, otherwise use full-jitter exponential backoff."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), OPENAI_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(OPENAI_BACKOFF_MAX, OPENAI_BACKOFF_BASE * 2 ** attempt))
+
+def call_with_retries(request, kind, tokens=0):
+    """
+    Send a request through the rate limiter, retrying transient failures.
+
+    Args:
+        request (callable): Performs the API call; called again on each retry,
+            so it must reopen any files it uploads
+        kind (str): Rate limiter to use, see get_rate_limiter
+        tokens (int): Estimated tokens the request consumes
+
+    Returns:
+        The API response
+    """
+    import openai
+    limiter = get_rate_limiter(kind)
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        limiter.acquire(tokens)
+        try:
+            return request()
+        except _retryable_errors() as e:
+            OPENAI_REQUEST_FAILURES.inc(kind=kind, error=e.__class__.__name__)
+            if attempt == OPENAI_MAX_RETRIES:
+                raise
+            delay = _backoff_delay(attempt, e)
+            logger.warning(f"OpenAI {kind} request failed ({e.__class__.__name__}), retry {attempt + 1} in {delay:.1f}s")
+            if isinstance(e, openai.RateLimitError):
+                # Hold back every caller in this process, not just this one; the next acquire waits it out
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
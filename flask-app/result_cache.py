@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def sha256_file(path, block_size=1024 * 1024):
+    """
+    Hash a file without reading it into memory at once.
+
+    Args:
+        path (str): Path to the file
+        block_size (int): Bytes read per step
+
+    Returns:
+        str: Hex SHA-256 digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_key(*parts):
+    """Build a cache key from JSON-serializable parts (content hashes, model names, parameters)."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """
+    A size-bounded cache of API results stored in a SQLite file.
+
+    Every process that opens the same file shares the entries, so all
+    gunicorn workers benefit from each other's calls. Entries expire after
+    ttl_seconds and the least recently used entries are evicted once the
+    stored values exceed max_bytes.
+
+    Lookups only read, so they do not queue behind each other for the write
+    lock: hits and misses are counted in memory per process, and an entry's
+    last use is recorded at most once per touch_seconds.
+    """
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024, ttl_seconds=30 * 24 * 3600, touch_seconds=3600):
+        """
+        Args:
+            path (str): Path to the SQLite cache file
+            max_bytes (int): Upper bound on the total size of stored values
+            ttl_seconds (int): Lifetime of an entry
+            touch_seconds (int): How stale an entry's last-used time may get before a hit updates it
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.touch_seconds = touch_seconds
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed_at ON entries (accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_created_at ON entries (created_at)")
+            # Running total of the stored sizes, so a set does not have to add them all up
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO counters SELECT 'bytes', COALESCE(SUM(size), 0) FROM entries")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """
+        Look up a cached value.
+
+        Args:
+            key (str): Cache key, see make_key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT value, created_at, accessed_at FROM entries WHERE key = ?", (key,)).fetchone()
+        # Expired entries are left for the next set to delete
+        hit = row is not None and row[1] >= now - self.ttl_seconds
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not hit:
+            return None
+
+        if row[2] < now - self.touch_seconds:
+            with conn:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """
+        Store a JSON-serializable value, evicting old entries if the cache is full.
+
+        Args:
+            key (str): Cache key, see make_key
+            value: The value to store
+        """
+        data = json.dumps(value)
+        now = time.time()
+        with self._connect() as conn:
+            # Take the write lock up front so the running total cannot miss a concurrent write
+            conn.execute("BEGIN IMMEDIATE")
+            replaced = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now)
+            )
+            self._add_bytes(conn, len(data) - (replaced[0] if replaced else 0))
+            self._evict(conn, now)
+
+    def _add_bytes(self, conn, delta):
+        conn.execute("UPDATE counters SET value = value + ? WHERE name = 'bytes'", (delta,))
+
+    def _evict(self, conn, now):
+        cutoff = now - self.ttl_seconds
+        expired = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries WHERE created_at < ?", (cutoff,)).fetchone()[0]
+        if expired:
+            conn.execute("DELETE FROM entries WHERE created_at < ?", (cutoff,))
+            self._add_bytes(conn, -expired)
+        total = conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Free down to 90% of the limit so eviction does not run on every insert
+        excess = total - int(self.max_bytes * 0.9)
+        evicted = []
+        freed = 0
+        cursor = conn.execute("SELECT key, size FROM entries ORDER BY accessed_at")
+        for key, size in cursor:
+            if freed >= excess:
+                break
+            evicted.append((key,))
+            freed += size
+        cursor.close()
+        conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self._add_bytes(conn, -freed)
+        logger.debug(f"Evicted {len(evicted)} cache entries")
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits and misses of this process; entries and bytes for the whole cache file
+        """
+        conn = self._connect()
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        size = conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+_cache = None
+
+def _reset_after_fork():
+    # SQLite connections must not be shared with the parent process
+    global _cache
+    _cache = None
+
+if hasattr(os, "register_at_fork"):  # Not available on Windows, which cannot fork
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_cache():
+    """
+    The process-wide result cache, configured from the environment.
+
+    RESULT_CACHE_PATH sets the cache file (empty disables caching),
+    RESULT_CACHE_MAX_BYTES the size bound and RESULT_CACHE_TTL the entry
+    lifetime in seconds.
+
+    Returns:
+        ResultCache or None: None when caching is disabled
+    """
+    global _cache
+    path = os.environ.get("RESULT_CACHE_PATH", os.path.join(os.getcwd(), "cache", "results.db"))
+    if not path:
+        return None
+    if _cache is None:
+        _cache = ResultCache(
+            path,
+            max_bytes=int(os.environ.get("RESULT_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+            ttl_seconds=int(os.environ.get("RESULT_CACHE_TTL", 30 * 24 * 3600))
+        )
+    return _cache
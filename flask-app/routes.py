@@ -1,12 +1,33 @@
 import os
 import uuid
+import json
+import time
+import base64
+import hashlib
 import logging
-from flask import render_template, request, redirect, url_for, flash, jsonify, send_file, abort
 import threading
+from datetime import datetime
+from flask import render_template, request, redirect, url_for, flash, jsonify, send_file, abort, Response, stream_with_context
 from werkzeug.utils import secure_filename
+from sqlalchemy import and_, or_, func, update
+from sqlalchemy.orm import load_only
 from app import db
-from models import Meeting
-from meeting_assistant import transcribe_audio, generate_meeting_summary
+from models import FULL_MEETING, Meeting, Job, UploadSession, Decision, ActionItem
+from jobs import enqueue_meeting
+from search import index_meeting, search_meetings
+from exporters import EXPORT_FORMATS, export_filename, iter_zip
+from uploads import UploadConflict, UploadInterrupted, create_upload_session, expire_upload_sessions, parse_content_range, write_chunk
+from result_cache import sha256_file
+from summary_items import apply_summary, load_partial_summary, parse_due_date, save_partial_item, save_summary_items
+from meeting_assistant import transcribe_audio_with_segments, generate_meeting_summary, answer_question
+from metrics import METRICS_ENABLED, render_metrics, span
+from vector_index import embed_meeting, related_meetings, search_chunks
+
+try:
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+except ImportError:
+    Sock = None
 
 logger = logging.getLogger(__name__)
 
@@ -14,64 +35,154 @@ def allowed_file(filename, allowed_extensions):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
-def process_meeting_recording(meeting_id, file_path):
+def encode_cursor(meeting):
+    """Encode the position after the given meeting as an opaque pagination cursor."""
+    raw = f"{meeting.created_at.isoformat()}|{meeting.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """
+    Decode a pagination cursor.
+    
+    Args:
+        cursor (str): Cursor produced by encode_cursor
+        
+    Returns:
+        tuple: (created_at, meeting_id), or None if the cursor is invalid
+    """
+    try:
+        created_at, meeting_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), meeting_id
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def list_meetings_page(cursor=None, limit=25):
+    """
+    Fetch one page of meetings, newest first, using keyset pagination.
+    
+    Only the columns needed for listings are loaded, and the cost of a page
+    does not depend on how many meetings precede it.
+    
+    Args:
+        cursor (str): Cursor returned with the previous page, or None for the first page
+        limit (int): Page size
+        
+    Returns:
+        tuple: (meetings, next_cursor); next_cursor is None on the last page
+    """
+    query = Meeting.query.options(load_only(
+        Meeting.id, Meeting.title, Meeting.original_filename, Meeting.created_at,
+        Meeting.processed, Meeting.status, Meeting.error
+    ))
+    
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, meeting_id = position
+        query = query.filter(or_(
+            Meeting.created_at < created_at,
+            and_(Meeting.created_at == created_at, Meeting.id < meeting_id)
+        ))
+    
+    meetings = query.order_by(Meeting.created_at.desc(), Meeting.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(meetings[limit - 1]) if len(meetings) > limit else None
+    return meetings[:limit], next_cursor
+
+def load_meeting_status(meeting_id):
+    """
+    Load only the processing-state columns of a meeting.
+    
+    Args:
+        meeting_id (str): The ID of the meeting
+        
+    Returns:
+        dict: See Meeting.to_status_dict, or None if the meeting does not exist
+    """
+    meeting = Meeting.query.options(load_only(
+        Meeting.id, Meeting.status, Meeting.processed, Meeting.error
+    )).filter_by(id=meeting_id).first()
+    return meeting.to_status_dict() if meeting else None
+
+def status_etag(status):
+    """A strong ETag for a status dict; changes whenever the processing state does."""
+    return hashlib.sha1(json.dumps(status, sort_keys=True).encode()).hexdigest()
+
+def process_meeting_recording(meeting_id, file_path, progress=None):
     """
-    Process the meeting recording in a background thread.
+    Process the meeting recording. Runs on a background worker (see jobs.py).
+    
+    No transaction (or pooled connection) is held while the transcription and
+    summary APIs are called; stage changes are single-row updates and all
+    results are written together in one short transaction at the end.
     
     Args:
         meeting_id (str): The ID of the meeting
         file_path (str): Path to the audio file
+        progress (callable): Optional callback invoked with the name of each stage as it starts
+        
+    Raises:
+        Exception: If transcription or summarization fails, so the job can be retried
     """
+    def set_stage(stage):
+        db.session.execute(update(Meeting).where(Meeting.id == meeting_id).values(status=stage))
+        db.session.commit()
+        if progress:
+            progress(stage)
+        # Return the connection to the pool before the next long call
+        db.session.close()
+
     try:
-        # Retrieve the meeting from the database
-        
-        meeting = Meeting.query.get(meeting_id)
-        if not meeting:
+        # Make sure the meeting still exists
+        if db.session.query(Meeting.id).filter_by(id=meeting_id).first() is None:
             logger.error(f"Meeting with ID {meeting_id} not found")
             return
             
         # Transcribe the audio
         logger.debug(f"Starting transcription for meeting {meeting_id}")
-        transcript = transcribe_audio(file_path)
+        set_stage('transcribing')
+        with span('transcription'):
+            transcription = transcribe_audio_with_segments(file_path)
         
-        meeting.transcript = transcript
+        # Generate meeting summary, saving each part as soon as it has been generated
+        logger.debug(f"Generating summary for meeting {meeting_id}")
+        set_stage('summarizing')
+        # Drop anything saved by an earlier attempt that failed part way
+        db.session.execute(update(Meeting).where(Meeting.id == meeting_id).values(summary=None))
+        save_summary_items(meeting_id, [], [])
         db.session.commit()
+        with span('summary'):
+            summary_data = generate_meeting_summary(
+                transcription['text'],
+                on_item=lambda kind, position, value: save_partial_item(meeting_id, kind, position, value)
+            )
         
-        # Generate meeting summary
-        logger.debug(f"Generating summary for meeting {meeting_id}")
-        summary_data = generate_meeting_summary(transcript)
+        # Make sure this worker still holds the job before writing (raises JobLost otherwise)
+        if progress:
+            progress('saving')
         
-        # Update the meeting object with the summary data
-        meeting.summary = summary_data.get('summary', '')
-        meeting.decisions = '\n'.join(summary_data.get('decisions', []))
+        # Store the transcript and summary in one transaction
+        with span('db_commit'):
+            meeting = Meeting.query.get(meeting_id)
+            meeting.transcript = transcription['text']
+            meeting.transcript_segments = json.dumps(transcription['segments'])
+            apply_summary(meeting, summary_data)
+            meeting.processed = True
+            meeting.error = None
+            meeting.status = 'done'
+            index_meeting(meeting)
+            db.session.commit()
+        if progress:
+            progress('done')
         
-
-        #meeting.action_items = '\n'.join(summary_data.get('action_items', []))
-        #meeting.action_items = '\n'.join(str(item) for item in summary_data.get('action_items', []))
-        # Assuming summary_data.get('action_items', []) returns a list of dictionaries:
-        meeting.action_items = '\n'.join(
-            f"{item['task']} (Assigned to: {item['assignee']}, Deadline: {item['deadline']})"
-            for item in summary_data.get('action_items', [])
-        )
-
-        logger.info(meeting.decisions)
-        logger.info(meeting.action_items)
-
-        # Convert Each Dictionary to a String:
-        #meeting.action_items = '\n'.join(str(item) for item in summary_data.get('action_items', []))
-        meeting.processed = True
-        db.session.commit()
+        # Add the transcript to the vector index for related meetings and questions
+        with span('embedding'):
+            embed_meeting(meeting_id)
         
         logger.debug(f"Processing completed for meeting {meeting_id}")
     except Exception as e:
         #logger.error(f"Error processing meeting {meeting_id}: {str(e)}")
         logger.error(f"Error processing meeting {meeting_id}: {str(e)}", exc_info=True)
-        # Update the meeting with the error
-        meeting = Meeting.query.get(meeting_id)
-        if meeting:
-            meeting.error = str(e)
-            meeting.processed = True
-            db.session.commit()
+        # The job worker records the error on the meeting once retries are exhausted
+        raise
 
 def register_routes(app):
     """
@@ -80,6 +191,8 @@ def register_routes(app):
     Args:
         app: The Flask application
     """
+    # Server-Sent Event streams open in this process; see stream_meeting_status
+    sse_slots = threading.BoundedSemaphore(app.config['SSE_MAX_STREAMS'])
     
     @app.route('/')
     def index():
@@ -107,18 +220,14 @@ def register_routes(app):
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
             
             # Save the file
-            file.save(file_path)
-            
-            # Create a new Meeting record
-            meeting = Meeting(
-                title=title,
-                recording_filename=unique_filename,
-                original_filename=filename
-            )
-            db.session.add(meeting)
-            db.session.commit()
+            with span('upload_save'):
+                file.save(file_path)
+                content_hash = sha256_file(file_path)
             
-            process_meeting_recording(meeting_id=meeting.id, file_path=file_path)
+            # Create a new Meeting record and queue it for the background workers
+            with span('db_insert'):
+                meeting = queue_recording(title, unique_filename, filename, content_hash)
+                db.session.commit()
             
             # Redirect to the summary page
             flash('Your meeting recording has been uploaded and is being processed.', 'success')
@@ -127,70 +236,469 @@ def register_routes(app):
             flash(f'Invalid file format. Allowed formats: {", ".join(app.config["ALLOWED_EXTENSIONS"])}', 'danger')
             return redirect(request.url)
     
+    def queue_recording(title, stored_filename, original_filename, content_hash):
+        """Create the Meeting for a saved recording and queue it for processing. The caller commits."""
+        meeting = Meeting(
+            title=title,
+            recording_filename=stored_filename,
+            original_filename=original_filename,
+            content_hash=content_hash
+        )
+        db.session.add(meeting)
+        db.session.flush()
+        
+        file_path = os.path.join(app.config['UPLOAD_FOLDER'], stored_filename)
+        enqueue_meeting(meeting.id, file_path, max_attempts=app.config['JOB_MAX_ATTEMPTS'])
+        return meeting
+    
+    def upload_state(upload):
+        """The client-facing state of a chunked upload."""
+        result = upload.to_dict()
+        result["chunk_size"] = app.config['UPLOAD_CHUNK_SIZE']
+        result["upload_url"] = url_for('upload_chunk', upload_id=upload.id)
+        if upload.meeting_id:
+            result["summary_url"] = url_for('view_summary', meeting_id=upload.meeting_id)
+        return result
+    
+    @app.route('/api/uploads', methods=['POST'])
+    def create_upload():
+        """
+        Start a resumable chunked upload.
+        
+        Expects JSON with filename, size and an optional title. Chunks are then
+        sent with PUT /api/uploads/<id> and a Content-Range header. Uploads
+        abandoned for longer than UPLOAD_SESSION_TTL are cleaned up here.
+        """
+        data = request.get_json(silent=True) or {}
+        filename = secure_filename(data.get('filename') or '')
+        size = data.get('size')
+        
+        if not filename or not allowed_file(filename, app.config['ALLOWED_EXTENSIONS']):
+            return jsonify({"error": f'Invalid file format. Allowed formats: {", ".join(app.config["ALLOWED_EXTENSIONS"])}'}), 400
+        if not isinstance(size, int) or size <= 0 or size > app.config['MAX_UPLOAD_SIZE']:
+            return jsonify({"error": "Invalid or too large file size"}), 400
+        
+        expire_upload_sessions(app.config['UPLOAD_SESSION_TTL'], app.config['UPLOAD_FOLDER'])
+        upload = create_upload_session(data.get('title') or 'Untitled Meeting', filename, size, app.config['UPLOAD_FOLDER'])
+        db.session.commit()
+        return jsonify(upload_state(upload)), 201
+    
+    @app.route('/api/uploads/<upload_id>', methods=['GET'])
+    def get_upload(upload_id):
+        """API endpoint to get the offset an interrupted upload should resume from."""
+        upload = UploadSession.query.get_or_404(upload_id)
+        return jsonify(upload_state(upload))
+    
+    @app.route('/api/uploads/<upload_id>', methods=['PUT'])
+    def upload_chunk(upload_id):
+        """
+        Receive one chunk of a chunked upload.
+        
+        The body is written straight to the upload folder. A chunk that does
+        not start at the current offset is rejected with 409, and one whose body
+        ends early with 400, both with the offset to resume from. Processing is queued as soon as the final chunk lands.
+        """
+        upload = UploadSession.query.get_or_404(upload_id)
+        if upload.meeting_id:
+            return jsonify(upload_state(upload))
+        
+        content_range = parse_content_range(request.headers.get('Content-Range'))
+        if not content_range or content_range[2] != upload.total_size:
+            return jsonify({"error": "Missing or invalid Content-Range header"}), 400
+        
+        start, end, _ = content_range
+        length = end - start + 1
+        if request.content_length is not None and request.content_length != length:
+            return jsonify({"error": "Content-Length does not match Content-Range"}), 400
+        
+        try:
+            with span('upload_save'):
+                complete = write_chunk(upload, start, length, request.stream, app.config['UPLOAD_FOLDER'])
+        except UploadConflict as e:
+            return jsonify({"error": str(e), "offset": e.offset}), 409
+        except UploadInterrupted as e:
+            return jsonify({"error": str(e), "offset": e.offset}), 400
+        
+        if complete:
+            with span('db_insert'):
+                meeting = queue_recording(upload.title, upload.stored_filename, upload.original_filename, upload.sha256)
+                upload.meeting_id = meeting.id
+                db.session.commit()
+        return jsonify(upload_state(upload))
+    
+    @app.route('/live')
+    def live():
+        """Record a meeting in the browser with live transcription."""
+        return render_template('live.html', live_available=Sock is not None)
+    
+    @app.route('/api/live', methods=['POST'])
+    def create_live_meeting():
+        """
+        Start a live meeting.
+        
+        Expects a JSON body with an optional title. Audio is then streamed to
+        the returned WebSocket URL as binary frames of 16-bit little-endian mono
+        PCM at sample_rate; sending {"type": "stop"} ends the meeting.
+        """
+        if Sock is None:
+            return jsonify({"error": "Live meetings require the flask-sock package"}), 501
+        
+        from live import LIVE_SAMPLE_RATE
+        title = (request.get_json(silent=True) or {}).get('title') or 'Live Meeting'
+        meeting = Meeting(
+            title=title[:255],
+            recording_filename=f"{uuid.uuid4()}.wav",
+            original_filename="live.wav",
+            status='live'
+        )
+        db.session.add(meeting)
+        db.session.commit()
+        return jsonify({
+            "meeting_id": meeting.id,
+            "websocket": url_for('live_ingest', meeting_id=meeting.id),
+            "sample_rate": LIVE_SAMPLE_RATE
+        }), 201
+    
+    if Sock is not None:
+        sock = Sock(app)
+        
+        @sock.route('/ws/live/<meeting_id>')
+        def live_ingest(ws, meeting_id):
+            """Receive audio for a live meeting and push transcript and summary updates back."""
+            from live import LiveSession
+            
+            meeting = Meeting.query.get(meeting_id)
+            if not meeting or meeting.status != 'live':
+                ws.close(reason=1008, message="Not a live meeting in progress")
+                return
+            recording_path = os.path.join(app.config['UPLOAD_FOLDER'], meeting.recording_filename)
+            # Do not hold a database connection for the length of the meeting
+            db.session.remove()
+            
+            send_lock = threading.Lock()
+            def send(message):
+                try:
+                    with send_lock:
+                        ws.send(json.dumps(message))
+                except ConnectionClosed:
+                    pass
+            
+            session = LiveSession(app, meeting_id, recording_path, send)
+            try:
+                while True:
+                    message = ws.receive()
+                    if isinstance(message, (bytes, bytearray)):
+                        session.feed(message)
+                    elif message and json.loads(message).get('type') == 'stop':
+                        break
+            except ConnectionClosed:
+                logger.warning(f"Live meeting {meeting_id} disconnected; finishing with the audio received")
+            finally:
+                session.finish()
+    
     @app.route('/summary/<meeting_id>')
     def view_summary(meeting_id):
         """Display the meeting summary."""
-        meeting = Meeting.query.get_or_404(meeting_id)
+        # The notes and transcript are fetched by the page itself, through the API
+        meeting = Meeting.query.options(load_only(
+            Meeting.id, Meeting.title, Meeting.original_filename, Meeting.created_at
+        )).filter_by(id=meeting_id).first_or_404()
         return render_template('summary.html', meeting=meeting)
     
     @app.route('/history')
     def view_history():
         """Display the meeting history."""
-        meetings = Meeting.query.order_by(Meeting.created_at.desc()).all()
-        return render_template('history.html', meetings=meetings)
+        cursor = request.args.get('cursor')
+        meetings, next_cursor = list_meetings_page(cursor, app.config['HISTORY_PAGE_SIZE'])
+        return render_template('history.html', meetings=meetings, cursor=cursor, next_cursor=next_cursor)
+    
+    @app.route('/search')
+    def search():
+        """Search meetings by transcript, decisions and action items."""
+        query = request.args.get('q', '').strip()
+        results = search_meetings(query, app.config['SEARCH_RESULT_LIMIT']) if query else []
+        return render_template('search.html', query=query, results=results)
+    
+    @app.route('/api/search')
+    def api_search():
+        """API endpoint for ranked full-text search over meetings."""
+        limit = min(request.args.get('limit', app.config['SEARCH_RESULT_LIMIT'], type=int), 100)
+        results = search_meetings(request.args.get('q', ''), max(limit, 1))
+        return jsonify({"results": results})
+    
+    @app.route('/api/ask', methods=['POST'])
+    def ask_question():
+        """
+        API endpoint answering a question about past meetings.
+        
+        Only the most similar transcript passages from the vector index are
+        sent to the model; they are returned as sources alongside the answer.
+        """
+        data = request.get_json(silent=True)
+        data = data if isinstance(data, dict) else {}
+        question = data.get('question')
+        if not isinstance(question, str) or not question.strip():
+            return jsonify({"error": "question is required"}), 400
+        limit = data.get('limit', app.config['ASK_PASSAGE_LIMIT'])
+        if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= 20:
+            return jsonify({"error": "limit must be an integer from 1 to 20"}), 400
+        
+        try:
+            passages = search_chunks(question.strip(), limit)
+            if not passages:
+                return jsonify({"answer": None, "sources": [], "error": "No indexed meetings to answer from"}), 404
+            answer = answer_question(question.strip(), passages)
+        except Exception as e:
+            logger.error(f"Error answering question: {str(e)}", exc_info=True)
+            return jsonify({"error": "The question could not be answered right now"}), 502
+        return jsonify({"answer": answer, "sources": passages})
+    
+    @app.route('/api/action-items')
+    def list_action_items():
+        """
+        API endpoint to query action items across all meetings.
+        
+        Filters: assignee, status (default open), due_before / due_after
+        (YYYY-MM-DD), meeting_id. Results are ordered by due date, then newest first.
+        """
+        query = db.session.query(ActionItem, Meeting.title).join(Meeting, Meeting.id == ActionItem.meeting_id)
+        
+        status = request.args.get('status', 'open')
+        if status != 'all':
+            query = query.filter(ActionItem.status == status)
+        if request.args.get('assignee'):
+            query = query.filter(ActionItem.assignee == request.args['assignee'])
+        if request.args.get('meeting_id'):
+            query = query.filter(ActionItem.meeting_id == request.args['meeting_id'])
+        
+        for arg, compare in (('due_before', ActionItem.due_date.__le__), ('due_after', ActionItem.due_date.__ge__)):
+            if request.args.get(arg):
+                due = parse_due_date(request.args[arg])
+                if due is None:
+                    return jsonify({"error": f"{arg} must be a YYYY-MM-DD date"}), 400
+                query = query.filter(compare(due))
+        
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        rows = query.order_by(
+            ActionItem.due_date.is_(None), ActionItem.due_date, ActionItem.id.desc()
+        ).limit(max(limit, 1)).all()
+        return jsonify({"action_items": [dict(item.to_dict(), meeting_title=title) for item, title in rows]})
+    
+    @app.route('/api/action-items/<int:item_id>', methods=['PATCH'])
+    def update_action_item(item_id):
+        """API endpoint to mark an action item open or done."""
+        item = ActionItem.query.get_or_404(item_id)
+        status = (request.get_json(silent=True) or {}).get('status')
+        if status not in ('open', 'done'):
+            return jsonify({"error": "status must be 'open' or 'done'"}), 400
+        item.status = status
+        db.session.commit()
+        return jsonify(item.to_dict())
+    
+    @app.route('/api/action-items/assignees')
+    def list_assignees():
+        """API endpoint counting open action items per assignee."""
+        rows = db.session.query(ActionItem.assignee, func.count(ActionItem.id)).filter(
+            ActionItem.status == 'open'
+        ).group_by(ActionItem.assignee).order_by(func.count(ActionItem.id).desc()).all()
+        return jsonify({"assignees": [{"assignee": assignee, "open": count} for assignee, count in rows]})
+    
+    @app.route('/api/decisions')
+    def list_decisions():
+        """API endpoint to list decisions across meetings, newest first (optionally for one meeting_id)."""
+        query = db.session.query(Decision, Meeting.title).join(Meeting, Meeting.id == Decision.meeting_id)
+        if request.args.get('meeting_id'):
+            query = query.filter(Decision.meeting_id == request.args['meeting_id'])
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        rows = query.order_by(Decision.created_at.desc(), Decision.position).limit(max(limit, 1)).all()
+        return jsonify({"decisions": [dict(decision.to_dict(), meeting_title=title) for decision, title in rows]})
+    
+    @app.route('/api/meetings')
+    def list_meetings():
+        """API endpoint to list meetings, newest first, one page at a time."""
+        limit = min(request.args.get('limit', app.config['HISTORY_PAGE_SIZE'], type=int), 100)
+        meetings, next_cursor = list_meetings_page(request.args.get('cursor'), max(limit, 1))
+        return jsonify({
+            "meetings": [meeting.to_list_dict() for meeting in meetings],
+            "next_cursor": next_cursor
+        })
     
     @app.route('/api/meeting/<meeting_id>')
     def get_meeting_status(meeting_id):
         """API endpoint to get meeting processing status."""
-        meeting = Meeting.query.get_or_404(meeting_id)
-        return jsonify(meeting.to_dict())
+        meeting = Meeting.query.options(*FULL_MEETING).filter_by(id=meeting_id).first_or_404()
+        response = jsonify(meeting.to_dict())
+        response.add_etag()
+        return response.make_conditional(request)
+    
+    @app.route('/api/meeting/<meeting_id>/status')
+    def get_meeting_processing_status(meeting_id):
+        """
+        Long-poll endpoint for the processing state of a meeting.
+        
+        With If-None-Match and ?wait=<seconds>, the request is held until the
+        state changes or the wait expires (304). The full meeting is only
+        fetched from /api/meeting/<id> once processing has finished.
+        """
+        wait = min(request.args.get('wait', 0, type=float), app.config['STATUS_LONG_POLL_SECONDS'])
+        deadline = time.monotonic() + wait
+        
+        while True:
+            status = load_meeting_status(meeting_id)
+            if status is None:
+                abort(404)
+            
+            etag = status_etag(status)
+            if etag not in request.if_none_match or status['processed'] or time.monotonic() >= deadline:
+                break
+            
+            # End the read transaction so the next check sees new commits
+            db.session.rollback()
+            time.sleep(app.config['STATUS_CHECK_INTERVAL'])
+        
+        response = jsonify(status)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+    
+    @app.route('/api/meeting/<meeting_id>/events')
+    def stream_meeting_status(meeting_id):
+        """
+        Server-Sent Events stream of processing-stage transitions.
+        
+        Emits a "status" event on every change, "partial" events with the
+        summary, decisions and action items generated so far while the summary
+        is being written, and a final "complete" event carrying the full
+        meeting once processing has finished. The stream closes after
+        SSE_MAX_SECONDS; EventSource clients reconnect by themselves after
+        SSE_RETRY_MS. Each stream holds a server thread, so at most
+        SSE_MAX_STREAMS are open per process; beyond that the request gets
+        a 503 and the summary page falls back to long-polling the status.
+        """
+        if load_meeting_status(meeting_id) is None:
+            abort(404)
+        db.session.rollback()
+        if not sse_slots.acquire(blocking=False):
+            response = jsonify({"error": "Too many open event streams; poll /status instead"})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(app.config['SSE_RETRY_MS'] // 1000)
+            return response
+        
+        def events():
+            deadline = time.monotonic() + app.config['SSE_MAX_SECONDS']
+            yield f"retry: {app.config['SSE_RETRY_MS']}\n\n"
+            last_sent = time.monotonic()
+            previous = None
+            previous_partial = None
+            while time.monotonic() < deadline:
+                status = load_meeting_status(meeting_id)
+                if status is None:
+                    return
+                
+                if status['processed']:
+                    meeting = Meeting.query.options(*FULL_MEETING).filter_by(id=meeting_id).first()
+                    yield f"event: complete\ndata: {json.dumps(meeting.to_dict())}\n\n"
+                    return
+                
+                if status != previous:
+                    yield f"event: status\ndata: {json.dumps(status)}\n\n"
+                    previous = status
+                    last_sent = time.monotonic()
+                
+                if status['status'] == 'summarizing':
+                    partial = load_partial_summary(meeting_id)
+                    if partial != previous_partial and (partial['summary'] or partial['decisions'] or partial['action_items']):
+                        yield f"event: partial\ndata: {json.dumps(partial)}\n\n"
+                        previous_partial = partial
+                        last_sent = time.monotonic()
+                
+                if time.monotonic() - last_sent > 15:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    last_sent = time.monotonic()
+                
+                db.session.rollback()
+                time.sleep(app.config['STATUS_CHECK_INTERVAL'])
+        
+        response = Response(
+            stream_with_context(events()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        # Runs when the stream ends or the client goes away, even if the body was never started
+        response.call_on_close(sse_slots.release)
+        return response
+    
+    @app.route('/api/meeting/<meeting_id>/job')
+    def get_meeting_job(meeting_id):
+        """API endpoint to get the latest processing job for a meeting."""
+        job = Job.query.filter_by(meeting_id=meeting_id).order_by(Job.id.desc()).first_or_404()
+        return jsonify(job.to_dict())
+    
+    @app.route('/api/meeting/<meeting_id>/related')
+    def get_related_meetings(meeting_id):
+        """API endpoint listing the meetings whose transcripts are most similar to this one."""
+        if db.session.query(Meeting.id).filter_by(id=meeting_id).first() is None:
+            abort(404)
+        limit = min(request.args.get('limit', 5, type=int), 20)
+        return jsonify({"related": related_meetings(meeting_id, max(limit, 1))})
     
     @app.route('/export/<meeting_id>', methods=['GET'])
     def export_summary(meeting_id):
-        """Export the meeting summary as a text file."""
-        meeting = Meeting.query.get_or_404(meeting_id)
-        if not meeting.processed or meeting.error:
+        """Export the meeting summary as text, Markdown (?format=md) or JSON (?format=json)."""
+        state = Meeting.query.options(load_only(
+            Meeting.id, Meeting.processed, Meeting.error
+        )).filter_by(id=meeting_id).first_or_404()
+        if not state.processed or state.error:
             flash('Meeting processing is not complete', 'warning')
             return redirect(url_for('view_summary', meeting_id=meeting_id))
-            
-        export_content = f"""
-        MEETING SUMMARY: {meeting.title}
-        Date: {meeting.created_at.strftime('%Y-%m-%d %H:%M:%S')}
-
-        SUMMARY:
-        {meeting.summary}
-
-        DECISIONS:
-        {meeting.decisions}
-
-        ACTION ITEMS:
-        {meeting.action_items}
-
-        --------------------------------------------------
-        Full Transcript:
-        {meeting.transcript}
-        """
         
-        # Create a temporary file for download
-        import tempfile
-        fd, path = tempfile.mkstemp(suffix='.txt')
-        with os.fdopen(fd, 'w') as tmp:
-            tmp.write(export_content)
+        extension = request.args.get('format', 'txt')
+        if extension not in EXPORT_FORMATS:
+            abort(400)
+        mimetype, iter_export = EXPORT_FORMATS[extension]
+        
+        # Only now load the notes and transcript, onto the same identity-mapped instance
+        meeting = Meeting.query.options(*FULL_MEETING).populate_existing().filter_by(id=meeting_id).one()
+        
+        # Stream the export straight into the response
+        return Response(
+            stream_with_context(iter_export(meeting)),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment;filename={export_filename(meeting, extension)}"}
+        )
+    
+    @app.route('/export', methods=['GET', 'POST'])
+    def export_many():
+        """Export several meetings (?ids=..., or all processed meetings) as a streamed zip archive."""
+        extension = request.values.get('format', 'txt')
+        if extension not in EXPORT_FORMATS:
+            abort(400)
         
-        return_data = open(path, 'rb').read()
-        os.unlink(path)  # Delete the temp file
+        meeting_ids = [meeting_id for value in request.values.getlist('ids') for meeting_id in value.split(',') if meeting_id]
         
-        # Generate a clean filename
-        safe_title = "".join([c for c in meeting.title if c.isalpha() or c.isdigit() or c==' ']).rstrip()
-        safe_title = safe_title.replace(' ', '_')
-        download_name = f"{safe_title}_{meeting.created_at.strftime('%Y%m%d')}.txt"
+        def meetings():
+            query = Meeting.query.options(*FULL_MEETING).filter(Meeting.processed.is_(True), Meeting.error.is_(None))
+            if meeting_ids:
+                query = query.filter(Meeting.id.in_(meeting_ids))
+            # Load meetings in small batches and drop each one once it has been written
+            for meeting in query.order_by(Meeting.created_at.desc()).yield_per(20):
+                yield meeting
+                db.session.expunge(meeting)
         
-        response = app.response_class(
-            return_data,
-            mimetype='text/plain',
+        download_name = f"meetings_{datetime.utcnow().strftime('%Y%m%d')}.zip"
+        return Response(
+            stream_with_context(iter_zip(meetings(), extension)),
+            mimetype='application/zip',
             headers={"Content-Disposition": f"attachment;filename={download_name}"}
         )
-        return response
+    
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics, for all processes sharing PROMETHEUS_MULTIPROC_DIR. Disabled unless METRICS_ENABLED is set."""
+        if not METRICS_ENABLED:
+            abort(404)
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
     
     @app.errorhandler(404)
     def page_not_found(e):
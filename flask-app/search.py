@@ -0,0 +1,225 @@
+import re
+import logging
+from collections import namedtuple
+from datetime import datetime
+from markupsafe import escape
+from sqlalchemy import inspect, text
+from app import db
+from models import FULL_MEETING, Meeting
+
+logger = logging.getLogger(__name__)
+
+_SnippetRow = namedtuple("_SnippetRow", "id title created_at snippet")
+
+# Highlight markers placed by the database; swapped for <mark> tags after the snippet is HTML-escaped
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+# Title matches rank highest, then decisions and action items, then the transcript
+_PG_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce({prefix}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({prefix}decisions, '') || ' ' || coalesce({prefix}action_items, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce({prefix}transcript, '')), 'C')"
+)
+
+# Without contentless_delete, the index is rebuilt at startup once entries left
+# behind by re-indexed meetings exceed this fraction of the live ones
+FTS_REBUILD_DEAD_FRACTION = 0.25
+
+def ensure_search_index():
+    """
+    Create the full-text index if it does not exist yet and fill it from existing meetings.
+
+    SQLite uses a contentless FTS5 virtual table (meeting_fts) that keeps
+    only the index, not a copy of the text; meeting_fts_docs maps its rowids
+    to meetings. PostgreSQL uses a tsvector side table (meeting_search) with
+    a GIN index.
+
+    An existing SQLite index is rebuilt if it still stores a copy of the
+    text, if it can be switched to contentless_delete, or if too many entries
+    of re-indexed meetings have piled up in it (see index_meeting).
+    """
+    dialect = db.engine.dialect.name
+    table = "meeting_fts" if dialect == "sqlite" else "meeting_search"
+    if inspect(db.engine).has_table(table):
+        reason = _fts_rebuild_reason() if dialect == "sqlite" else None
+        if reason is None:
+            return
+        logger.info(f"Rebuilding {table}: {reason}")
+        with db.engine.begin() as conn:
+            conn.execute(text("DROP TABLE meeting_fts"))
+        rebuilt = True
+    else:
+        rebuilt = False
+
+    logger.info(f"Creating full-text index {table}")
+    with db.engine.begin() as conn:
+        if dialect == "sqlite":
+            options = ", contentless_delete = 1" if _supports_contentless_delete() else ""
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE meeting_fts USING fts5("
+                "title, decisions, action_items, transcript, "
+                f"content = ''{options}, tokenize = 'porter unicode61')"
+            ))
+            conn.execute(text("DROP TABLE IF EXISTS meeting_fts_docs"))
+            conn.execute(text(
+                "CREATE TABLE meeting_fts_docs ("
+                "docid INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "meeting_id VARCHAR(36) NOT NULL UNIQUE REFERENCES meeting (id))"
+            ))
+        else:
+            conn.execute(text(
+                "CREATE TABLE meeting_search ("
+                "meeting_id VARCHAR(36) PRIMARY KEY REFERENCES meeting (id) ON DELETE CASCADE, "
+                "document TSVECTOR NOT NULL)"
+            ))
+            conn.execute(text("CREATE INDEX ix_meeting_search_document ON meeting_search USING GIN (document)"))
+
+    # Transcripts are stored compressed, so existing meetings are indexed from Python
+    meeting_ids = [meeting_id for (meeting_id,) in db.session.query(Meeting.id).filter(
+        Meeting.processed.is_(True), Meeting.error.is_(None)
+    )]
+    for start in range(0, len(meeting_ids), 100):
+        for meeting in Meeting.query.options(*FULL_MEETING).filter(Meeting.id.in_(meeting_ids[start:start + 100])):
+            index_meeting(meeting)
+        db.session.commit()
+
+    if rebuilt:
+        from migrations import reclaim_space
+        reclaim_space()
+
+def _supports_contentless_delete():
+    # DELETE on a contentless FTS5 table needs SQLite 3.43
+    return db.engine.dialect.dbapi.sqlite_version_info >= (3, 43, 0)
+
+def _fts_definition():
+    return db.session.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'meeting_fts'")
+    ).scalar() or ""
+
+def _fts_rebuild_reason():
+    sql = _fts_definition()
+    if "content = ''" not in sql:
+        # Earlier versions stored an uncompressed copy of every transcript in the index
+        return "stored content"
+    if "contentless_delete" in sql:
+        return None
+    if _supports_contentless_delete():
+        return "switching to contentless_delete"
+    entries = db.session.execute(text("SELECT count(*) FROM meeting_fts")).scalar()
+    live = db.session.execute(text("SELECT count(*) FROM meeting_fts_docs")).scalar()
+    if entries - live > live * FTS_REBUILD_DEAD_FRACTION:
+        return f"{entries - live} entries of re-indexed meetings"
+    return None
+
+def index_meeting(meeting):
+    """
+    Add or refresh a meeting in the full-text index.
+
+    Runs in the current session, so the index changes commit together with
+    the meeting's results.
+
+    On SQLite 3.43 and later the meeting's old entry is deleted from the
+    contentless index (contentless_delete). Older versions cannot delete an
+    entry without its original text, so the meeting gets a new document ID
+    and the old entry stays behind, unreachable, until ensure_search_index
+    rebuilds the index at startup.
+
+    Args:
+        meeting (Meeting): A processed meeting
+    """
+    params = {
+        "meeting_id": meeting.id,
+        "title": meeting.title,
+        "decisions": meeting.decisions,
+        "action_items": meeting.action_items,
+        "transcript": meeting.transcript
+    }
+    if db.engine.dialect.name == "sqlite":
+        old_docid = db.session.execute(
+            text("SELECT docid FROM meeting_fts_docs WHERE meeting_id = :meeting_id"), params
+        ).scalar()
+        if old_docid is not None:
+            if "contentless_delete" in _fts_definition():
+                db.session.execute(text("DELETE FROM meeting_fts WHERE rowid = :docid"), {"docid": old_docid})
+            db.session.execute(text("DELETE FROM meeting_fts_docs WHERE docid = :docid"), {"docid": old_docid})
+        params["docid"] = db.session.execute(text(
+            "INSERT INTO meeting_fts_docs (meeting_id) VALUES (:meeting_id) RETURNING docid"
+        ), params).scalar()
+        db.session.execute(text(
+            "INSERT INTO meeting_fts (rowid, title, decisions, action_items, transcript) "
+            "VALUES (:docid, :title, :decisions, :action_items, :transcript)"
+        ), params)
+    else:
+        document = _PG_DOCUMENT.format(prefix=":")
+        db.session.execute(text(
+            f"INSERT INTO meeting_search (meeting_id, document) VALUES (:meeting_id, {document}) "
+            f"ON CONFLICT (meeting_id) DO UPDATE SET document = EXCLUDED.document"
+        ), params)
+
+def search_meetings(query, limit=20):
+    """
+    Search processed meetings by title, decisions, action items and transcript.
+
+    Args:
+        query (str): Free-text search terms
+        limit (int): Maximum number of hits
+
+    Returns:
+        list: Hits, best first, as dicts with id, title, created_at and an
+        HTML-safe snippet with matches wrapped in <mark>
+    """
+    terms = query.split()
+    if not terms:
+        return []
+
+    if db.engine.dialect.name == "sqlite":
+        # Quote every term so user input is never parsed as FTS5 query syntax
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        # The index keeps no text for snippet(), so like PostgreSQL the snippet comes from the summary and decisions
+        hits = db.session.execute(text(
+            "SELECT m.id, m.title, m.created_at, m.summary, m.decisions "
+            "FROM meeting_fts JOIN meeting_fts_docs d ON d.docid = meeting_fts.rowid "
+            "JOIN meeting m ON m.id = d.meeting_id "
+            "WHERE meeting_fts MATCH :match "
+            "ORDER BY bm25(meeting_fts, 10.0, 5.0, 5.0, 1.0) LIMIT :limit"
+        ), {"match": match, "limit": limit}).all()
+        rows = [
+            _SnippetRow(hit.id, hit.title, hit.created_at, _highlight(f"{hit.summary or ''} {hit.decisions or ''}", terms))
+            for hit in hits
+        ]
+    else:
+        # ts_headline re-parses the text, so it only runs on the page of top hits. The
+        # transcript is compressed, so the snippet comes from the summary and decisions
+        rows = db.session.execute(text(
+            "SELECT m.id, m.title, m.created_at, "
+            "ts_headline('english', coalesce(m.summary, '') || ' ' || coalesce(m.decisions, ''), hits.q, "
+            f"'StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords=32, MinWords=12') AS snippet "
+            "FROM (SELECT s.meeting_id, q, ts_rank(s.document, q) AS rank "
+            "      FROM meeting_search s, websearch_to_tsquery('english', :query) q "
+            "      WHERE s.document @@ q ORDER BY rank DESC LIMIT :limit) hits "
+            "JOIN meeting m ON m.id = hits.meeting_id ORDER BY hits.rank DESC"
+        ), {"query": query, "limit": limit}).all()
+
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "created_at": _as_datetime(row.created_at).isoformat(),
+            "snippet": str(escape(row.snippet or "")).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+        }
+        for row in rows
+    ]
+
+def _highlight(content, terms, size=32):
+    """Cut about size words around the first match of any term and mark the matches, like snippet()."""
+    words = content.split()
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+    first = next((i for i, word in enumerate(words) if pattern.search(word)), 0)
+    start = max(0, first - size // 4)
+    window = pattern.sub(lambda match: f"{_MARK_START}{match.group(0)}{_MARK_END}", " ".join(words[start:start + size]))
+    return ("..." if start else "") + window + ("..." if start + size < len(words) else "")
+
+def _as_datetime(value):
+    # Raw SQL on SQLite returns DATETIME columns as strings
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
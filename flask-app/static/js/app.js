@@ -99,6 +99,84 @@ function validateFileInput(fileInput, allowedTypes, maxSize = 100 * 1024 * 1024)
     return true;
 }
 
+/**
+ * Upload a recording in chunks, resuming an earlier interrupted upload of the same file
+ * @param {File} file - The recording to upload
+ * @param {string} title - The meeting title
+ * @param {function} onProgress - Called with the fraction of the file uploaded so far
+ * @returns {Promise<Object>} - The completed upload, including summary_url
+ */
+async function uploadInChunks(file, title, onProgress = () => {}) {
+    const resumeKey = `upload:${file.name}:${file.size}:${file.lastModified}`;
+    let upload = null;
+    
+    // Resume from the server's offset if this file was partially uploaded before
+    const savedId = localStorage.getItem(resumeKey);
+    if (savedId) {
+        const response = await fetch(`/api/uploads/${savedId}`);
+        if (response.ok) {
+            upload = await response.json();
+        }
+    }
+    
+    if (!upload) {
+        const response = await fetch('/api/uploads', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename: file.name, size: file.size, title: title })
+        });
+        upload = await response.json();
+        if (!response.ok) {
+            throw new Error(upload.error || 'Could not start the upload');
+        }
+        localStorage.setItem(resumeKey, upload.id);
+    }
+    
+    let offset = upload.offset;
+    let retries = 0;
+    while (!upload.complete) {
+        const end = Math.min(offset + upload.chunk_size, file.size);
+        let response;
+        try {
+            response = await fetch(upload.upload_url, {
+                method: 'PUT',
+                headers: { 'Content-Range': `bytes ${offset}-${end - 1}/${file.size}` },
+                body: file.slice(offset, end)
+            });
+        } catch (error) {
+            // Network failure: wait, then ask the server where to resume
+            if (++retries > 5) throw error;
+            await new Promise(resolve => setTimeout(resolve, 1000 * 2 ** retries));
+            response = await fetch(`/api/uploads/${upload.id}`);
+            offset = (await response.json()).offset;
+            continue;
+        }
+        
+        const result = await response.json();
+        if (response.status === 409) {
+            offset = result.offset;
+            continue;
+        }
+        if (response.status === 400 && result.offset !== undefined) {
+            // The chunk was cut short on the way; send it again from the server's offset
+            if (++retries > 5) throw new Error(result.error);
+            offset = result.offset;
+            continue;
+        }
+        if (!response.ok) {
+            throw new Error(result.error || 'Upload failed');
+        }
+        
+        retries = 0;
+        offset = result.offset;
+        upload = Object.assign(upload, result);
+        onProgress(offset / file.size);
+    }
+    
+    localStorage.removeItem(resumeKey);
+    return upload;
+}
+
 // Add event listeners when DOM is loaded
 document.addEventListener('DOMContentLoaded', function() {
     // Add file input validation for upload forms
@@ -0,0 +1,197 @@
+import re
+import ast
+import logging
+from datetime import datetime, date
+from sqlalchemy import delete, insert, text, update
+from app import db
+from models import Decision, ActionItem, Meeting
+
+logger = logging.getLogger(__name__)
+
+# The flattened form process_meeting_recording writes to Meeting.action_items
+_ACTION_ITEM_LINE = re.compile(r"^(?P<task>.*) \(Assigned to: (?P<assignee>.*), Deadline: (?P<deadline>.*)\)$")
+
+def normalize_action_item(item):
+    """
+    Coerce an action item from the model into a dict with task, assignee and deadline.
+    
+    Args:
+        item: A dict from the model's JSON, or a bare string
+        
+    Returns:
+        dict: The action item; missing fields are None
+    """
+    if not isinstance(item, dict):
+        return {"task": str(item), "assignee": None, "deadline": None}
+    return {
+        "task": str(item.get('task') or ''),
+        "assignee": item.get('assignee'),
+        "deadline": item.get('deadline')
+    }
+
+def parse_due_date(deadline):
+    """Return the deadline as a date if it is written as an ISO date, otherwise None."""
+    try:
+        return date.fromisoformat(str(deadline).strip()[:10])
+    except (TypeError, ValueError):
+        return None
+
+def apply_summary(meeting, summary_data):
+    """
+    Store a generated summary on a meeting, with its Decision and ActionItem rows.
+    
+    Runs in the current session; the caller commits.
+    
+    Args:
+        meeting (Meeting): The meeting
+        summary_data (dict): summary, decisions and action_items as returned by generate_meeting_summary
+    """
+    decisions = [str(decision) for decision in summary_data.get('decisions', [])]
+    action_items = [normalize_action_item(item) for item in summary_data.get('action_items', [])]
+    meeting.summary = summary_data.get('summary', '')
+    meeting.decisions = '\n'.join(decisions)
+    meeting.action_items = '\n'.join(
+        f"{item['task']} (Assigned to: {item['assignee']}, Deadline: {item['deadline']})"
+        for item in action_items
+    )
+    save_summary_items(meeting.id, decisions, action_items)
+
+def save_summary_items(meeting_id, decisions, action_items, created_at=None):
+    """
+    Replace a meeting's Decision and ActionItem rows, one bulk insert per table.
+    
+    Runs in the current session; the caller commits.
+    
+    Args:
+        meeting_id (str): The ID of the meeting
+        decisions (list): Decision texts
+        action_items (list): Dicts from normalize_action_item
+        created_at (datetime): Creation time of the rows, now if None
+    """
+    db.session.execute(delete(Decision).where(Decision.meeting_id == meeting_id))
+    db.session.execute(delete(ActionItem).where(ActionItem.meeting_id == meeting_id))
+    
+    now = created_at or datetime.utcnow()
+    if decisions:
+        db.session.execute(insert(Decision), [
+            {"meeting_id": meeting_id, "position": position, "text": text, "created_at": now}
+            for position, text in enumerate(decisions)
+        ])
+    if action_items:
+        db.session.execute(insert(ActionItem), [
+            {
+                "meeting_id": meeting_id,
+                "position": position,
+                "task": item['task'],
+                "assignee": str(item['assignee'])[:255] if item['assignee'] else None,
+                "deadline": str(item['deadline'])[:255] if item['deadline'] else None,
+                "due_date": parse_due_date(item['deadline']),
+                "status": "open",
+                "created_at": now
+            }
+            for position, item in enumerate(action_items)
+        ])
+
+def save_partial_item(meeting_id, kind, position, value):
+    """
+    Persist one part of a summary while the rest is still being generated.
+    
+    Commits at once so the summary page can show it; apply_summary later
+    replaces the partial rows with the final ones. Saving the same position
+    again (e.g. from a retried request) replaces the earlier value.
+    
+    Args:
+        meeting_id (str): The ID of the meeting
+        kind (str): "summary", "decision" or "action_item"
+        position (int): Index of the decision or action item
+        value: The summary text, decision text or action item
+    """
+    if kind == "summary":
+        db.session.execute(update(Meeting).where(Meeting.id == meeting_id).values(summary=str(value)))
+    elif kind == "decision":
+        db.session.execute(delete(Decision).where(Decision.meeting_id == meeting_id, Decision.position == position))
+        db.session.add(Decision(meeting_id=meeting_id, position=position, text=str(value)))
+    elif kind == "action_item":
+        item = normalize_action_item(value)
+        db.session.execute(delete(ActionItem).where(ActionItem.meeting_id == meeting_id, ActionItem.position == position))
+        db.session.add(ActionItem(
+            meeting_id=meeting_id,
+            position=position,
+            task=item['task'],
+            assignee=str(item['assignee'])[:255] if item['assignee'] else None,
+            deadline=str(item['deadline'])[:255] if item['deadline'] else None,
+            due_date=parse_due_date(item['deadline'])
+        ))
+    db.session.commit()
+    db.session.close()
+
+def load_partial_summary(meeting_id):
+    """
+    The parts of a summary saved so far by save_partial_item.
+    
+    Returns:
+        dict: summary (or None), decisions (texts) and action_items (dicts), in order
+    """
+    summary = db.session.query(Meeting.summary).filter(Meeting.id == meeting_id).scalar()
+    decisions = db.session.query(Decision.text).filter(Decision.meeting_id == meeting_id).order_by(Decision.position).all()
+    action_items = ActionItem.query.filter(ActionItem.meeting_id == meeting_id).order_by(ActionItem.position).all()
+    return {
+        "summary": summary,
+        "decisions": [text for (text,) in decisions],
+        "action_items": [
+            {"task": item.task, "assignee": item.assignee, "deadline": item.deadline}
+            for item in action_items
+        ]
+    }
+
+def parse_action_item_line(line):
+    """
+    Parse one line of a Meeting.action_items blob back into an action item.
+    
+    Args:
+        line (str): e.g. "Send the email (Assigned to: Marketing, Deadline: None)", or
+            the str() of a dict as written by earlier versions
+        
+    Returns:
+        dict: See normalize_action_item
+    """
+    if line.strip().startswith('{'):
+        try:
+            return normalize_action_item(ast.literal_eval(line.strip()))
+        except (ValueError, SyntaxError):
+            pass
+
+    match = _ACTION_ITEM_LINE.match(line.strip())
+    if not match:
+        return {"task": line.strip(), "assignee": None, "deadline": None}
+    item = match.groupdict()
+    for key in ("assignee", "deadline"):
+        if item[key] == "None":
+            item[key] = None
+    return item
+
+def backfill_summary_items():
+    """
+    Create Decision and ActionItem rows for meetings processed before the tables existed.
+    
+    Only meetings with text in their blobs and no rows yet are parsed. The
+    rows get the meeting's created_at, so they sort and filter by date like
+    the rows of newly processed meetings.
+    """
+    rows = db.session.execute(text(
+        "SELECT id, decisions, action_items, created_at FROM meeting m "
+        "WHERE processed AND error IS NULL "
+        "AND (coalesce(decisions, '') != '' OR coalesce(action_items, '') != '') "
+        "AND NOT EXISTS (SELECT 1 FROM decision d WHERE d.meeting_id = m.id) "
+        "AND NOT EXISTS (SELECT 1 FROM action_item a WHERE a.meeting_id = m.id)"
+    ).columns(created_at=db.DateTime)).all()
+    for meeting_id, decisions, action_items, created_at in rows:
+        save_summary_items(
+            meeting_id,
+            [line.strip() for line in (decisions or '').splitlines() if line.strip()],
+            [parse_action_item_line(line) for line in (action_items or '').splitlines() if line.strip()],
+            created_at=created_at
+        )
+    db.session.commit()
+    if rows:
+        logger.info(f"Backfilled decisions and action items for {len(rows)} meeting(s)")
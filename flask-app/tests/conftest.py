@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read from the environment at import time, so set them before any app module loads
+_workdir = tempfile.mkdtemp(prefix="meeting-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_workdir, 'tests.db')}",
+    "OPENAI_API_KEY": "test",
+    "SESSION_SECRET": "test",
+    "WORKER_COUNT": "0",
+    "RESULT_CACHE_PATH": "",
+    "EMBEDDER": "none",
+    "VECTOR_INDEX_PATH": os.path.join(_workdir, "vector_index"),
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def app(tmp_path):
+    """A fresh application with its own SQLite database and upload folder."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp_path / 'app.db'}"
+    from app import create_app
+    app = create_app()
+    app.config["UPLOAD_FOLDER"] = str(tmp_path / "uploads")
+    os.makedirs(app.config["UPLOAD_FOLDER"])
+    with app.app_context():
+        yield app
+        from app import db
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
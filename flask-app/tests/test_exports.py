@@ -0,0 +1,55 @@
+import io
+import json
+import zipfile
+from datetime import datetime
+
+import exporters
+from app import db
+from models import Meeting
+
+# Quotes, backslashes, newlines and non-ASCII text, split across slices below
+TRANSCRIPT = 'She said "ship it" \\ then left.\nNächste Woche: 会议 ✓ ' * 50
+
+def _processed_meeting(title, **fields):
+    meeting = Meeting(title=title, recording_filename="a.mp3", original_filename="a.mp3",
+                      processed=True, status="done", created_at=datetime(2024, 3, 1, 9, 0),
+                      summary="Agreed to ship.", decisions="Ship it\nHire a designer",
+                      action_items="Send the email (Assigned to: Marketing, Deadline: None)", **fields)
+    meeting.transcript = TRANSCRIPT
+    db.session.add(meeting)
+    db.session.commit()
+    return meeting
+
+def test_json_export_parses(client, monkeypatch):
+    monkeypatch.setattr(exporters, "CHUNK_CHARS", 7)
+    meeting = _processed_meeting("Planning")
+
+    response = client.get(f"/export/{meeting.id}", query_string={"format": "json"})
+
+    assert response.mimetype == "application/json"
+    assert json.loads(response.get_data(as_text=True)) == {
+        "id": meeting.id,
+        "title": "Planning",
+        "created_at": "2024-03-01T09:00:00",
+        "summary": "Agreed to ship.",
+        "decisions": ["Ship it", "Hire a designer"],
+        "action_items": ["Send the email (Assigned to: Marketing, Deadline: None)"],
+        "transcript": TRANSCRIPT
+    }
+
+def test_zip_export_is_a_valid_archive(client, monkeypatch):
+    monkeypatch.setattr(exporters, "CHUNK_CHARS", 7)
+    # Same title and date, so the second entry needs a different name
+    first = _processed_meeting("Planning")
+    second = _processed_meeting("Planning")
+    _processed_meeting("Not finished", error="Transcription failed")
+
+    response = client.get("/export", query_string={"format": "json"})
+
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        assert archive.testzip() is None
+        names = archive.namelist()
+        assert len(names) == 2 and len(set(names)) == 2
+        exported = {json.loads(archive.read(name))["id"]: json.loads(archive.read(name)) for name in names}
+    assert set(exported) == {first.id, second.id}
+    assert all(export["transcript"] == TRANSCRIPT for export in exported.values())
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from app import db
+from models import Meeting
+
+def _meetings(created_ats):
+    meetings = [Meeting(title=f"Meeting {index}", recording_filename="a.mp3", original_filename="a.mp3",
+                        created_at=created_at) for index, created_at in enumerate(created_ats)]
+    db.session.add_all(meetings)
+    db.session.commit()
+    return meetings
+
+def test_cursor_pages_through_equal_timestamps_once(client):
+    now = datetime(2024, 3, 1, 12, 0)
+    # Five meetings share a timestamp, so pages have to break ties by ID
+    meetings = _meetings([now + timedelta(minutes=1)] + [now] * 5 + [now - timedelta(minutes=1)])
+    expected = [meeting.id for meeting in sorted(meetings, key=lambda m: (m.created_at, m.id), reverse=True)]
+
+    seen = []
+    cursor = None
+    while True:
+        page = client.get("/api/meetings", query_string={"limit": 2, "cursor": cursor or ""}).get_json()
+        assert len(page["meetings"]) <= 2
+        seen.extend(meeting["id"] for meeting in page["meetings"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+def test_invalid_cursor_starts_from_the_first_page(client):
+    newest = _meetings([datetime(2024, 3, 1), datetime(2024, 3, 2)])[1]
+    page = client.get("/api/meetings", query_string={"limit": 1, "cursor": "not-a-cursor"}).get_json()
+    assert [meeting["id"] for meeting in page["meetings"]] == [newest.id]
@@ -0,0 +1,69 @@
+import os
+
+import routes
+from app import db
+from importer import Checkpoint, find_recordings, import_recordings, run_import_workers
+from jobs import PRIORITY_BULK, claim_next_job, enqueue_meeting
+from models import Job, Meeting
+
+def _archive(tmp_path, files):
+    archive = tmp_path / "archive"
+    for name, content in files.items():
+        path = archive / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return list(find_recordings(str(archive), {"mp3", "wav"}))
+
+def test_import_skips_duplicate_recordings(app, tmp_path):
+    paths = _archive(tmp_path, {
+        "2023/standup.mp3": b"standup",
+        "2023/standup copy.mp3": b"standup",
+        "2024/retro.wav": b"retro",
+        "notes.txt": b"not a recording"
+    })
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+
+    assert import_recordings(app, paths, checkpoint, batch_size=2) == (2, 1)
+
+    assert Meeting.query.count() == 2
+    assert checkpoint.files[paths[0]] == checkpoint.files[paths[1]]
+    assert Checkpoint(checkpoint.path).files == checkpoint.files
+
+    # A second archive with one of the same recordings under another name adds only the new one
+    more = _archive(tmp_path / "more", {"copy.wav": b"retro", "planning.mp3": b"planning"})
+    assert import_recordings(app, more, Checkpoint(None)) == (1, 1)
+    assert Meeting.query.count() == 3
+    assert Job.query.count() == 3
+
+def test_imported_jobs_wait_for_uploads(app, tmp_path):
+    import_recordings(app, _archive(tmp_path, {"old.mp3": b"old"}), Checkpoint(None))
+    meeting = Meeting(title="New upload", recording_filename="new.mp3", original_filename="new.mp3")
+    db.session.add(meeting)
+    db.session.flush()
+    upload = enqueue_meeting(meeting.id, "new.mp3")
+    db.session.commit()
+
+    assert {job.priority for job in Job.query.filter(Job.id != upload.id)} == {PRIORITY_BULK}
+    # The upload was queued last but is claimed first
+    assert claim_next_job("worker") == upload.id
+    assert db.session.get(Job, claim_next_job("worker")).priority == PRIORITY_BULK
+    assert claim_next_job("worker") is None
+
+def test_import_workers_leave_uploads_alone(app, tmp_path, monkeypatch):
+    import_recordings(app, _archive(tmp_path, {"a.mp3": b"a", "b.mp3": b"b"}), Checkpoint(None))
+    meeting = Meeting(title="New upload", recording_filename="new.mp3", original_filename="new.mp3")
+    db.session.add(meeting)
+    db.session.flush()
+    upload = enqueue_meeting(meeting.id, "new.mp3")
+    db.session.commit()
+    upload_id, meeting_id = upload.id, meeting.id
+
+    processed = []
+    monkeypatch.setattr(routes, "process_meeting_recording",
+                        lambda meeting_id, file_path, progress=None: processed.append(meeting_id))
+    app.config["JOB_POLL_INTERVAL"] = 0.01
+
+    run_import_workers(app, workers=2, poll_interval=0.01)
+
+    assert len(processed) == 2 and meeting_id not in processed
+    assert db.session.get(Job, upload_id).status == "pending"
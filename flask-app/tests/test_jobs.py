@@ -0,0 +1,143 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from jobs import (
+    JobLost, WorkerPool, claim_next_job, enqueue_meeting, heartbeat, recover_stale_jobs, report_progress
+)
+from models import Job, Meeting
+
+def _queue_meeting(max_attempts=3):
+    meeting = Meeting(title="Test", recording_filename="a.mp3", original_filename="a.mp3")
+    db.session.add(meeting)
+    db.session.flush()
+    job = enqueue_meeting(meeting.id, "a.mp3", max_attempts=max_attempts)
+    db.session.commit()
+    return meeting.id, job.id
+
+def test_claim_is_won_by_exactly_one_session(app):
+    _, job_id = _queue_meeting()
+    start = threading.Barrier(8)
+    results = []
+
+    def claim(index):
+        with app.app_context():
+            start.wait()
+            results.append(claim_next_job(f"worker-{index}"))
+            db.session.remove()
+
+    threads = [threading.Thread(target=claim, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results, key=str) == [job_id] + [None] * 7
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts) == ("running", 1)
+
+def test_claim_prefers_higher_priority_and_respects_min_priority(app):
+    meeting_id, normal_id = _queue_meeting()
+    db.session.get(Job, normal_id).priority = -10
+    _, urgent_id = _queue_meeting()
+    db.session.commit()
+
+    assert claim_next_job("w", min_priority=0) == urgent_id
+    assert claim_next_job("w", min_priority=0) is None
+    assert claim_next_job("w") == normal_id
+
+def test_failed_job_is_retried_with_backoff_then_marked_failed(app):
+    meeting_id, job_id = _queue_meeting(max_attempts=2)
+    calls = []
+
+    def failing_handler(meeting_id, file_path, progress):
+        calls.append(meeting_id)
+        progress("transcribing")
+        raise RuntimeError("transcription failed")
+
+    pool = WorkerPool(app, failing_handler, retry_delay=30)
+    assert claim_next_job("w") == job_id
+    pool._execute(job_id, "w")
+
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts, job.error) == ("pending", 1, "transcription failed")
+    assert job.run_after > datetime.utcnow() + timedelta(seconds=25)
+    assert claim_next_job("w") is None  # Not runnable until the backoff has passed
+
+    job.run_after = datetime.utcnow()
+    db.session.commit()
+    assert claim_next_job("w") == job_id
+    pool._execute(job_id, "w")
+
+    job = db.session.get(Job, job_id)
+    meeting = db.session.get(Meeting, meeting_id)
+    assert (job.status, job.attempts) == ("failed", 2)
+    assert (meeting.status, meeting.processed, meeting.error) == ("error", True, "transcription failed")
+    assert len(calls) == 2
+
+def test_successful_job_is_marked_done(app):
+    _, job_id = _queue_meeting()
+    pool = WorkerPool(app, lambda meeting_id, file_path, progress: progress("summarizing"))
+    claim_next_job("w")
+    pool._execute(job_id, "w")
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.stage, job.error) == ("done", "summarizing", None)
+
+def test_stale_job_is_recovered_and_the_old_worker_loses_it(app):
+    _, job_id = _queue_meeting()
+    assert claim_next_job("old") == job_id
+    assert heartbeat(job_id, "old", 1)
+
+    job = db.session.get(Job, job_id)
+    job.updated_at = datetime.utcnow() - timedelta(seconds=120)
+    db.session.commit()
+    assert recover_stale_jobs(60) == 1
+    assert claim_next_job("new") == job_id
+
+    assert not heartbeat(job_id, "old", 1)
+    with pytest.raises(JobLost):
+        report_progress(job_id, "summarizing", "old", 1)
+    report_progress(job_id, "summarizing", "new", 2)
+
+def test_stale_job_without_attempts_left_is_failed(app):
+    meeting_id, job_id = _queue_meeting(max_attempts=2)
+    for worker_id in ("first", "second"):
+        # Each worker dies while running the job, e.g. killed for running out of memory
+        assert claim_next_job(worker_id) == job_id
+        job = db.session.get(Job, job_id)
+        job.updated_at = datetime.utcnow() - timedelta(seconds=120)
+        db.session.commit()
+        assert recover_stale_jobs(60) == 1
+
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts, job.worker_id) == ("failed", 2, None)
+    meeting = db.session.get(Meeting, meeting_id)
+    assert (meeting.status, meeting.processed) == ("error", True)
+    assert meeting.error
+    assert claim_next_job("third") is None
+
+def test_recent_heartbeat_keeps_job_from_recovery(app):
+    _, job_id = _queue_meeting()
+    claim_next_job("w")
+    job = db.session.get(Job, job_id)
+    job.updated_at = datetime.utcnow() - timedelta(seconds=120)
+    db.session.commit()
+    heartbeat(job_id, "w", 1)
+    assert recover_stale_jobs(60) == 0
+
+def test_run_that_lost_its_job_does_not_touch_the_new_claim(app):
+    _, job_id = _queue_meeting()
+    claim_next_job("old")
+
+    def handler(meeting_id, file_path, progress):
+        # Another worker takes over while this one is still running
+        db.session.execute(db.update(Job).where(Job.id == job_id).values(status="pending", worker_id=None))
+        db.session.commit()
+        claim_next_job("new")
+        progress("saving")
+
+    WorkerPool(app, handler)._execute(job_id, "old")
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.worker_id, job.attempts) == ("running", "new", 2)
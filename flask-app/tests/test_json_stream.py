@@ -0,0 +1,100 @@
+import json
+import random
+
+import pytest
+
+from json_stream import JSONStreamParser
+
+DOCUMENTS = [
+    {"summary": "Plain text", "decisions": [], "action_items": []},
+    {
+        "summary": "Quotes \" backslashes \\ slashes / and \b\f\n\r\t control escapes",
+        "decisions": ["Ship on Friday", "Drop the \"legacy\" flag"],
+        "action_items": [{"task": "Write docs", "assignee": None, "deadline": "2026-11-01"}]
+    },
+    {"summary": "Unicode: café, 会议, emoji \U0001F680 and \U0001F9EA", "decisions": ["über"]},
+    {"a": {"b": {"c": [1, [2, [3, {"d": "deep"}]]]}}, "e": [[], {}, [{}]], "f": ""},
+    {"int": 42, "negative": -7, "float": 3.25, "exponent": 1.5e-3, "true": True, "false": False, "null": None},
+    {},
+]
+
+def _feed_in_pieces(text, cuts):
+    parser = JSONStreamParser()
+    completed = []
+    start = 0
+    for cut in sorted(cuts) + [len(text)]:
+        completed.extend(parser.feed(text[start:cut]))
+        start = cut
+    return parser, completed
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_every_single_split_point_matches_json_loads(document, ensure_ascii):
+    text = json.dumps(document, ensure_ascii=ensure_ascii)
+    for cut in range(len(text) + 1):
+        parser, _ = _feed_in_pieces(text, [cut])
+        assert parser.done
+        assert parser.result == json.loads(text)
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_random_chunking_matches_json_loads(document):
+    rng = random.Random(1234)
+    for indent in (None, 2):
+        text = json.dumps(document, indent=indent)
+        for _ in range(50):
+            cuts = rng.sample(range(len(text) + 1), rng.randint(0, min(len(text), 20)))
+            parser, _ = _feed_in_pieces(text, cuts)
+            assert parser.result == json.loads(text)
+
+def test_one_character_at_a_time():
+    text = json.dumps(DOCUMENTS[1])
+    parser, completed = _feed_in_pieces(text, range(len(text)))
+    assert parser.result == json.loads(text)
+    assert [path for path, _ in completed][-1] == ("action_items",)
+
+def test_reports_top_level_fields_and_array_elements_as_they_complete():
+    document = DOCUMENTS[1]
+    text = json.dumps(document)
+    parser = JSONStreamParser()
+    reported = []
+    for char in text:
+        for path, value in parser.feed(char):
+            reported.append((path, value))
+            # A value is reported as soon as its last character has arrived
+            assert value == _lookup(document, path)
+    assert reported == [
+        (("summary",), document["summary"]),
+        (("decisions", 0), "Ship on Friday"),
+        (("decisions", 1), 'Drop the "legacy" flag'),
+        (("decisions",), document["decisions"]),
+        (("action_items", 0), document["action_items"][0]),
+        (("action_items",), document["action_items"]),
+    ]
+
+def test_max_depth_limits_what_is_reported():
+    text = json.dumps({"a": [{"b": [1, 2]}], "c": 3})
+    parser = JSONStreamParser(max_depth=1)
+    assert [path for path, _ in parser.feed(text)] == [("a",), ("c",)]
+
+def test_surrogate_pair_split_across_chunks():
+    text = '{"summary": "launch \\ud83d\\ude80 done"}'
+    split = text.index("\\ude80")
+    parser, _ = _feed_in_pieces(text, [split - 2, split, split + 3])
+    assert parser.result == {"summary": "launch \U0001F680 done"}
+
+def test_ignores_code_fence_and_trailing_text():
+    text = 'Here you go:\n```json\n{"summary": "x", "decisions": ["y"]}\n```\nAnything else?'
+    parser, _ = _feed_in_pieces(text, [5, 20, 30])
+    assert parser.done
+    assert parser.result == {"summary": "x", "decisions": ["y"]}
+
+def test_incomplete_document_is_not_done():
+    parser = JSONStreamParser()
+    parser.feed('{"summary": "still writing')
+    assert not parser.done
+    assert parser.result is None
+
+def _lookup(document, path):
+    for key in path:
+        document = document[key]
+    return document
@@ -0,0 +1,83 @@
+import os
+import wave
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+import live
+from live import LIVE_SAMPLE_RATE, LiveSession, recover_live_meetings
+from models import Job, Meeting
+
+NOTES = {"summary": "Talked about the roadmap.", "decisions": ["Ship it"], "action_items": []}
+
+def _live_meeting(app, idle_for=None, audio_frames=None):
+    meeting = Meeting(title="Standup", recording_filename=f"{os.urandom(8).hex()}.wav",
+                      original_filename="live.wav", status="live")
+    db.session.add(meeting)
+    db.session.commit()
+    if idle_for is not None:
+        meeting.updated_at = datetime.utcnow() - idle_for
+        db.session.commit()
+    if audio_frames is not None:
+        with wave.open(os.path.join(app.config["UPLOAD_FOLDER"], meeting.recording_filename), "wb") as recording:
+            recording.setnchannels(1)
+            recording.setsampwidth(2)
+            recording.setframerate(LIVE_SAMPLE_RATE)
+            recording.writeframes(b"\0\0" * audio_frames)
+    return meeting.id
+
+def test_abandoned_live_meetings_are_recovered(app):
+    with_audio = _live_meeting(app, idle_for=timedelta(hours=1), audio_frames=LIVE_SAMPLE_RATE)
+    without_audio = _live_meeting(app, idle_for=timedelta(hours=1))
+    active = _live_meeting(app, audio_frames=LIVE_SAMPLE_RATE)
+
+    assert recover_live_meetings(idle_seconds=600) == 2
+    db.session.expire_all()
+
+    assert db.session.get(Meeting, with_audio).status == "uploaded"
+    assert Job.query.filter_by(meeting_id=with_audio).count() == 1
+    assert db.session.get(Meeting, without_audio).status == "error"
+    assert Job.query.filter_by(meeting_id=without_audio).count() == 0
+    assert db.session.get(Meeting, active).status == "live"
+
+    # A second process starting up finds nothing left to do
+    assert recover_live_meetings(idle_seconds=600) == 0
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    windows = iter(range(1000))
+
+    def transcribe_pcm(pcm, sample_rate, offset, prompt=None):
+        index = next(windows)
+        return {"text": f"window{index}", "segments": [{"start": offset, "end": offset + 1, "text": f"window{index}"}]}
+
+    monkeypatch.setattr(live, "transcribe_pcm", transcribe_pcm)
+    monkeypatch.setattr(live, "update_running_summary", lambda notes, new_text: NOTES)
+    monkeypatch.setattr(live, "generate_meeting_summary", lambda transcript: NOTES)
+
+def test_transcript_is_saved_periodically_and_on_finish(app, fake_openai, monkeypatch):
+    meeting_id = _live_meeting(app)
+    path = os.path.join(app.config["UPLOAD_FOLDER"], "live.wav")
+    window = b"\0\0" * int(live.LIVE_WINDOW_SECONDS * LIVE_SAMPLE_RATE)
+
+    monkeypatch.setattr(live, "LIVE_PERSIST_SECONDS", 3600)
+    session = LiveSession(app, meeting_id, path)
+    for _ in range(3):
+        session.feed(window)
+    session._transcriber.submit(lambda: None).result()
+    db.session.expire_all()
+    assert db.session.get(Meeting, meeting_id).transcript is None
+
+    monkeypatch.setattr(live, "LIVE_PERSIST_SECONDS", 0)
+    session.feed(window)
+    session._transcriber.submit(lambda: None).result()
+    db.session.expire_all()
+    assert db.session.get(Meeting, meeting_id).transcript == "window0 window1 window2 window3"
+
+    session.finish()
+    db.session.expire_all()
+    meeting = db.session.get(Meeting, meeting_id)
+    assert meeting.status == "done"
+    assert meeting.transcript.split() == [f"window{index}" for index in range(len(meeting.transcript.split()))]
+    assert meeting.summary == NOTES["summary"]
@@ -0,0 +1,57 @@
+import pytest
+
+import audio
+import meeting_assistant
+from audio import plan_segments
+
+def test_plan_covers_recording_with_overlap():
+    plan = plan_segments(700, [(290, 292), (588, 590)], segment_seconds=300, overlap_seconds=5)
+
+    assert plan == [(0.0, 0.0, 291.0, 296.0), (286.0, 291.0, 589.0, 594.0), (584.0, 589.0, 700, 700)]
+    # The owned ranges [begin, cut) partition the recording
+    assert [begin for _, begin, _, _ in plan[1:]] == [cut for _, _, cut, _ in plan[:-1]]
+
+def test_plan_cuts_at_target_without_silence():
+    plan = plan_segments(650, [], segment_seconds=300, overlap_seconds=5)
+    assert plan == [(0.0, 0.0, 300, 305), (295, 300, 600, 605), (595, 600, 650, 650)]
+
+def test_short_recording_is_one_segment():
+    assert plan_segments(120, [], segment_seconds=300, overlap_seconds=5) == [(0.0, 0.0, 120, 120)]
+
+# One 1.5 s utterance every 2 s; with silences the cuts fall between them, without they split some
+UTTERANCES = [(t, t + 1.5, f"word{t}") for t in range(1, 699, 2)]
+
+@pytest.fixture
+def fake_long_audio(monkeypatch):
+    windows = {}
+
+    def extract_segment(path, start, duration, output_path):
+        windows[output_path] = (start, start + duration)
+
+    def transcribe_file(path, offset=0.0):
+        # Like Whisper: every utterance heard in the window, clipped to its edges
+        start, end = windows[path]
+        segments = [
+            {"start": max(s, start), "end": min(e, end), "text": text}
+            for s, e, text in UTTERANCES if e > start and s < end
+        ]
+        return {"text": " ".join(segment["text"] for segment in segments), "segments": segments}
+
+    monkeypatch.setattr(audio, "probe_duration", lambda path: 700)
+    monkeypatch.setattr(audio, "extract_segment", extract_segment)
+    monkeypatch.setattr(meeting_assistant, "_transcribe_file", transcribe_file)
+    return windows
+
+@pytest.mark.parametrize("silences", [[(292.5, 293), (590.5, 591)], []], ids=["silences", "hard-cuts"])
+def test_stitched_transcript_has_every_utterance_once(fake_long_audio, monkeypatch, silences):
+    monkeypatch.setattr(audio, "detect_silences", lambda path: silences)
+    monkeypatch.setattr(meeting_assistant, "SEGMENT_SECONDS", 300)
+    monkeypatch.setattr(meeting_assistant, "SEGMENT_OVERLAP_SECONDS", 5)
+
+    result = meeting_assistant._transcribe_long_audio("meeting.mp3")
+
+    assert len(fake_long_audio) == 3
+    assert [segment["text"] for segment in result["segments"]] == [text for _, _, text in UTTERANCES]
+    assert result["text"] == " ".join(text for _, _, text in UTTERANCES)
+    starts = [segment["start"] for segment in result["segments"]]
+    assert starts == sorted(starts)
@@ -0,0 +1,67 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+import metrics
+from metrics import JOB_FAILURES, render_metrics
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _run(directory, code):
+    # prometheus_client picks its multiprocess mode at import, so each process is a fresh interpreter
+    return subprocess.run(
+        [sys.executable, "-c", "import tests.conftest\n" + code], cwd=APP_DIR, check=True, capture_output=True,
+        text=True, env={**os.environ, "METRICS_ENABLED": "true", "PROMETHEUS_MULTIPROC_DIR": str(directory)}
+    ).stdout
+
+def _render(directory):
+    return _run(directory, (
+        "from app import create_app\n"
+        "from metrics import render_metrics\n"
+        "with create_app().app_context():\n"
+        "    print(render_metrics())\n"
+    ))
+
+def test_metrics_are_recorded_only_when_enabled(app, monkeypatch):
+    def failures():
+        return metrics.prometheus_client.REGISTRY.get_sample_value("job_failures_total", {"final": "false"}) or 0
+
+    before = failures()
+    JOB_FAILURES.inc(final="false")
+    assert failures() == before
+
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", True)
+    JOB_FAILURES.inc(final="false")
+    assert failures() == before + 1
+    assert "job_queue_depth 0.0" in render_metrics()
+
+def test_values_of_all_processes_are_added(tmp_path):
+    for _ in range(2):
+        _run(tmp_path, "import metrics\n"
+                       "metrics.JOB_FAILURES.inc(final='false')\n"
+                       "metrics.STAGE_SECONDS.observe(0.2, stage='summary')\n")
+
+    text = _render(tmp_path)
+    assert 'job_failures_total{final="false"} 2.0' in text
+    assert 'meeting_stage_seconds_bucket{le="0.25",stage="summary"} 2.0' in text
+    # Sampled by the process serving the scrape
+    assert "job_queue_depth 0.0" in text
+
+def test_gauges_of_exited_processes_are_dropped(tmp_path):
+    # Exits without the atexit hook, like a killed worker
+    pid = int(_run(tmp_path, "import os, jobs, metrics\n"
+                             "jobs.WORKER_THREADS.set(4)\n"
+                             "metrics.JOB_FAILURES.inc(5, final='true')\n"
+                             "os.write(1, str(os.getpid()).encode())\n"
+                             "os._exit(0)\n"))
+    assert "worker_threads 4.0" in _render(tmp_path)
+
+    _run(tmp_path, f"import metrics\nmetrics.mark_process_dead({pid})\n")
+
+    text = _render(tmp_path)
+    assert "worker_threads 4.0" not in text
+    assert 'job_failures_total{final="true"} 5.0' in text
@@ -0,0 +1,73 @@
+import httpx
+import openai
+import pytest
+
+import openai_client
+from openai_client import TokenBucket, call_with_retries
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(openai_client, "time", clock)
+    monkeypatch.setattr(openai_client, "_limiters", {})
+    return clock
+
+def test_token_bucket_refills_over_time(clock):
+    bucket = TokenBucket(60, capacity=2)
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # Empty: the third caller waits for the next token, one second at 60 per minute
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock.sleep(3)
+    # Refilled from one token of debt, but never beyond capacity
+    assert bucket.reserve(2) == 0.0
+    assert bucket.reserve() == pytest.approx(1.0)
+
+def _request(outcomes):
+    calls = []
+
+    def request():
+        calls.append(None)
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return request, calls
+
+_REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+def test_transient_errors_are_retried(clock):
+    request, calls = _request([openai.APIConnectionError(request=_REQUEST),
+                               openai.APITimeoutError(request=_REQUEST), "ok"])
+    assert call_with_retries(request, "chat") == "ok"
+    assert len(calls) == 3
+
+def test_non_retryable_errors_give_up_at_once(clock):
+    error = openai.AuthenticationError("bad key", response=httpx.Response(401, request=_REQUEST), body=None)
+    request, calls = _request([error, "ok"])
+
+    with pytest.raises(openai.AuthenticationError):
+        call_with_retries(request, "chat")
+    assert len(calls) == 1
+    assert clock.now == 0.0
+
+def test_retries_are_limited(clock, monkeypatch):
+    monkeypatch.setattr(openai_client, "OPENAI_MAX_RETRIES", 2)
+    request, calls = _request([openai.APIConnectionError(request=_REQUEST)] * 5)
+
+    with pytest.raises(openai.APIConnectionError):
+        call_with_retries(request, "chat")
+    assert len(calls) == 3
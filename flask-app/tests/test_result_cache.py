@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+import meeting_assistant
+from result_cache import ResultCache
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "results.db"))
+    monkeypatch.setattr(meeting_assistant, "get_cache", lambda: cache)
+    return cache
+
+def test_same_audio_is_transcribed_once(cache, tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(meeting_assistant, "_use_preprocessing", lambda path: False)
+    monkeypatch.setattr(meeting_assistant, "_transcribe_original",
+                        lambda path: calls.append(path) or {"text": "hello", "segments": []})
+    first = tmp_path / "first.wav"
+    first.write_bytes(b"audio one")
+    # Same content under another name is the same recording
+    copy = tmp_path / "copy.wav"
+    copy.write_bytes(b"audio one")
+    other = tmp_path / "other.wav"
+    other.write_bytes(b"audio two")
+
+    for path in (first, copy, other):
+        assert meeting_assistant.transcribe_audio_with_segments(str(path))["text"] == "hello"
+
+    assert calls == [str(first), str(other)]
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+def test_summary_key_changes_with_prompt_version_and_model(cache, monkeypatch):
+    calls = []
+    monkeypatch.setattr(meeting_assistant, "_generate_summary",
+                        lambda transcript, on_item=None: calls.append(transcript) or {"summary": "s"})
+
+    meeting_assistant.generate_meeting_summary("the transcript")
+    meeting_assistant.generate_meeting_summary("the transcript")
+    assert len(calls) == 1
+
+    monkeypatch.setattr(meeting_assistant, "SUMMARY_PROMPT_VERSION", meeting_assistant.SUMMARY_PROMPT_VERSION + 1)
+    meeting_assistant.generate_meeting_summary("the transcript")
+    assert len(calls) == 2
+
+    monkeypatch.setattr(meeting_assistant, "SUMMARY_MODEL", "another-model")
+    meeting_assistant.generate_meeting_summary("the transcript")
+    assert len(calls) == 3
+
+def _stored_bytes(cache):
+    return cache._connect().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+def test_least_recently_used_entries_are_evicted_by_size(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.db"), max_bytes=1000, touch_seconds=0)
+    value = "x" * 198  # 200 bytes as JSON
+    for index in range(5):
+        cache.set(f"key{index}", value)
+        time.sleep(0.01)
+    assert cache.get("key0") == value  # Now the most recently used
+
+    cache.set("key5", value)
+
+    assert cache.get("key0") == value
+    assert cache.get("key1") is None
+    assert cache.get("key5") == value
+    assert cache.stats()["bytes"] == _stored_bytes(cache) <= 1000
+
+def test_running_total_follows_replacements_and_expiry(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.db"), ttl_seconds=60)
+    cache.set("a", "x" * 100)
+    cache.set("a", "x" * 10)
+    cache.set("b", "y")
+    assert cache.stats()["bytes"] == _stored_bytes(cache) == 12 + 3
+
+    cache._connect().execute("UPDATE entries SET created_at = 0 WHERE key = 'a'")
+    cache._connect().commit()
+    assert cache.get("a") is None
+    cache.set("c", "z")
+    assert cache.stats()["bytes"] == _stored_bytes(cache) == 3 + 3
+
+    # Reopening an existing file keeps the total
+    assert ResultCache(cache.path).stats()["bytes"] == 6
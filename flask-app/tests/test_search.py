@@ -0,0 +1,84 @@
+from sqlalchemy import text
+
+from app import db
+from models import Meeting
+from search import ensure_search_index, index_meeting, search_meetings
+
+def _processed_meeting(title, transcript, summary=None, decisions=None):
+    meeting = Meeting(title=title, recording_filename="a.mp3", original_filename="a.mp3",
+                      processed=True, status="done", summary=summary, decisions=decisions)
+    meeting.transcript = transcript
+    db.session.add(meeting)
+    db.session.flush()
+    index_meeting(meeting)
+    db.session.commit()
+    return meeting
+
+def test_search_finds_transcript_words_and_marks_summary(app):
+    meeting = _processed_meeting("Planning", "we talked about the kubernetes migration at length",
+                                 summary="Agreed to start the kubernetes migration next sprint.")
+    _processed_meeting("Retro", "nothing relevant here")
+
+    hits = search_meetings("kubernetes")
+    assert [hit["id"] for hit in hits] == [meeting.id]
+    assert "<mark>kubernetes</mark>" in hits[0]["snippet"]
+
+def test_title_matches_rank_first(app):
+    in_transcript = _processed_meeting("Weekly sync", "the budget was discussed briefly")
+    in_title = _processed_meeting("Budget review", "numbers and more numbers")
+
+    assert [hit["id"] for hit in search_meetings("budget")] == [in_title.id, in_transcript.id]
+
+def test_index_stores_no_copy_of_the_text(app):
+    _processed_meeting("Planning", "a transcript that should only live in meeting_text")
+
+    sql = db.session.execute(text("SELECT sql FROM sqlite_master WHERE name = 'meeting_fts'")).scalar()
+    assert "content = ''" in sql
+    assert not db.session.execute(text(
+        "SELECT name FROM sqlite_master WHERE name = 'meeting_fts_content'"
+    )).all()
+
+def test_reindexed_meeting_is_found_once_by_its_new_text(app):
+    meeting = _processed_meeting("Planning", "old words about apples")
+    meeting.transcript = "new words about oranges"
+    index_meeting(meeting)
+    db.session.commit()
+
+    assert [hit["id"] for hit in search_meetings("oranges")] == [meeting.id]
+    assert search_meetings("apples") == []
+
+def test_index_with_stored_content_is_rebuilt(app):
+    meeting = _processed_meeting("Planning", "the quarterly forecast")
+    # The layout of earlier versions, which kept a full copy of every transcript
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP TABLE meeting_fts"))
+        conn.execute(text("DROP TABLE meeting_fts_docs"))
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE meeting_fts USING fts5("
+            "meeting_id UNINDEXED, title, decisions, action_items, transcript, "
+            "tokenize = 'porter unicode61')"
+        ))
+        conn.execute(text("INSERT INTO meeting_fts (meeting_id, transcript) VALUES (:id, :transcript)"),
+                     {"id": meeting.id, "transcript": "x " * 200_000})
+    pages_before = db.session.execute(text("PRAGMA page_count")).scalar()
+
+    ensure_search_index()
+
+    assert [hit["id"] for hit in search_meetings("forecast")] == [meeting.id]
+    # Vacuumed: the pages of the old copy are returned rather than kept for reuse
+    assert db.session.execute(text("PRAGMA page_count")).scalar() < pages_before / 2
+
+def test_reindexing_leaves_no_dead_entries(app):
+    meeting = _processed_meeting("Planning", "old words about apples")
+    _processed_meeting("Retro", "nothing relevant here")
+    for transcript in ("pears", "plums", "new words about oranges"):
+        meeting.transcript = transcript
+        index_meeting(meeting)
+        db.session.commit()
+
+    # Deleted right away with contentless_delete, otherwise dropped by the rebuild at startup
+    ensure_search_index()
+
+    assert db.session.execute(text("SELECT count(*) FROM meeting_fts")).scalar() == 2
+    assert [hit["id"] for hit in search_meetings("oranges")] == [meeting.id]
+    assert search_meetings("plums") == []
@@ -0,0 +1,57 @@
+import json
+
+from app import db
+from models import Meeting
+
+def _meeting(**fields):
+    meeting = Meeting(title="Standup", recording_filename="a.mp3", original_filename="a.mp3", **fields)
+    db.session.add(meeting)
+    db.session.commit()
+    return meeting
+
+def test_unchanged_status_is_not_modified(app, client):
+    meeting = _meeting(status="transcribing")
+    url = f"/api/meeting/{meeting.id}/status"
+
+    first = client.get(url)
+    assert first.status_code == 200 and first.get_json()["status"] == "transcribing"
+    etag = first.headers["ETag"]
+
+    app.config["STATUS_CHECK_INTERVAL"] = 0.01
+    waited = client.get(url, query_string={"wait": 0.05}, headers={"If-None-Match": etag})
+    assert waited.status_code == 304
+
+    meeting.status = "summarizing"
+    db.session.commit()
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.get_json()["status"] == "summarizing"
+    assert changed.headers["ETag"] != etag
+
+def _events(response):
+    events = []
+    for block in response.get_data(as_text=True).split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append(fields)
+    return events
+
+def test_event_stream_ends_with_the_finished_meeting(app, client):
+    meeting = _meeting(status="done", processed=True, summary="All agreed.")
+
+    with client.get(f"/api/meeting/{meeting.id}/events") as response:
+        events = _events(response)
+
+    assert events[0] == {"retry": str(app.config["SSE_RETRY_MS"])}
+    assert events[-1]["event"] == "complete"
+    assert json.loads(events[-1]["data"])["summary"] == "All agreed."
+
+def test_expired_streams_close_and_free_their_slot(app, client):
+    meeting = _meeting(status="transcribing")
+    app.config["SSE_MAX_SECONDS"] = 0
+
+    # More streams than SSE_MAX_STREAMS, one after the other, all get a slot; like a WSGI
+    # server, closing the response releases it
+    for _ in range(app.config["SSE_MAX_STREAMS"] + 1):
+        with client.get(f"/api/meeting/{meeting.id}/events") as response:
+            assert response.status_code == 200
+            assert _events(response) == [{"retry": str(app.config["SSE_RETRY_MS"])}]
@@ -0,0 +1,45 @@
+import threading
+
+import meeting_assistant
+from meeting_assistant import split_transcript
+
+def _count_words(text):
+    return len(text.split())
+
+def test_split_transcript_breaks_between_sentences(monkeypatch):
+    monkeypatch.setattr(meeting_assistant, "count_tokens", _count_words)
+    transcript = ("One two three. Four five six! Seven eight nine? "
+                  "A single sentence far longer than the budget allows. Ten eleven.")
+
+    chunks = split_transcript(transcript, 7)
+
+    assert chunks == [
+        "One two three. Four five six!",
+        "Seven eight nine?",
+        "A single sentence far longer than the budget allows.",
+        "Ten eleven."
+    ]
+    assert " ".join(chunks) == transcript
+
+def test_notes_are_reduced_in_groups_of_fan_in(monkeypatch):
+    # One "token" per set of notes, so at most three fit in the final prompt
+    monkeypatch.setattr(meeting_assistant, "count_tokens", lambda text: text.count('"summary"'))
+    monkeypatch.setattr(meeting_assistant, "SUMMARY_SINGLE_PASS_TOKENS", 3)
+    monkeypatch.setattr(meeting_assistant, "SUMMARY_REDUCE_FAN_IN", 3)
+    group_sizes = []
+    lock = threading.Lock()
+
+    def merge_notes(partials, on_item=None):
+        with lock:
+            group_sizes.append(len(partials))
+        return {"summary": "(" + " ".join(partial["summary"] for partial in partials) + ")",
+                "decisions": [], "action_items": []}
+
+    monkeypatch.setattr(meeting_assistant, "_merge_notes", merge_notes)
+    partials = [{"summary": f"p{index}", "decisions": [], "action_items": []} for index in range(10)]
+
+    result = meeting_assistant._reduce_notes(partials)
+
+    # 10 notes -> 4 groups -> 2 groups -> one final merge, keeping the meeting's order
+    assert sorted(group_sizes) == sorted([3, 3, 3, 1, 3, 1, 2])
+    assert result["summary"] == "(((p0 p1 p2) (p3 p4 p5) (p6 p7 p8)) ((p9)))"
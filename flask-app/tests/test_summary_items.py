@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from app import db
+from models import ActionItem, Decision, Meeting
+from summary_items import backfill_summary_items
+
+def test_backfilled_rows_keep_the_meeting_date(app):
+    created_at = datetime(2023, 5, 4, 9, 30)
+    meeting = Meeting(title="Planning", recording_filename="a.mp3", original_filename="a.mp3",
+                      processed=True, status="done", created_at=created_at,
+                      decisions="Ship it\nHire a designer",
+                      action_items="Send the email (Assigned to: Marketing, Deadline: None)")
+    db.session.add(meeting)
+    db.session.commit()
+
+    backfill_summary_items()
+
+    decisions = Decision.query.filter_by(meeting_id=meeting.id).order_by(Decision.position).all()
+    assert [decision.text for decision in decisions] == ["Ship it", "Hire a designer"]
+    assert {decision.created_at for decision in decisions} == {created_at}
+    action_item = ActionItem.query.filter_by(meeting_id=meeting.id).one()
+    assert (action_item.task, action_item.assignee, action_item.created_at) == ("Send the email", "Marketing", created_at)
@@ -0,0 +1,103 @@
+import io
+import os
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from models import Job, Meeting, UploadSession
+import uploads
+from uploads import UploadInterrupted, expire_upload_sessions, write_chunk
+
+RECORDING = os.urandom(10_000)
+
+def _start(client, size=len(RECORDING)):
+    response = client.post("/api/uploads", json={"filename": "meeting.wav", "size": size, "title": "Weekly sync"})
+    assert response.status_code == 201
+    return response.get_json()
+
+def _put(client, upload, start, end):
+    return client.put(
+        upload["upload_url"],
+        data=RECORDING[start:end],
+        headers={"Content-Range": f"bytes {start}-{end - 1}/{len(RECORDING)}"}
+    )
+
+def test_chunked_upload_queues_meeting_with_sha256(app, client):
+    upload = _start(client)
+    for start in range(0, len(RECORDING), 4096):
+        response = _put(client, upload, start, min(start + 4096, len(RECORDING)))
+        assert response.status_code == 200
+    state = response.get_json()
+
+    assert state["complete"] and state["offset"] == len(RECORDING)
+    session = db.session.get(UploadSession, upload["id"])
+    assert session.sha256 == hashlib.sha256(RECORDING).hexdigest()
+    with open(os.path.join(app.config["UPLOAD_FOLDER"], session.stored_filename), "rb") as f:
+        assert f.read() == RECORDING
+    assert db.session.get(Meeting, state["meeting_id"]).status == "uploaded"
+    assert Job.query.filter_by(meeting_id=state["meeting_id"]).count() == 1
+
+def test_resume_rebuilds_hash_from_disk(client):
+    upload = _start(client)
+    assert _put(client, upload, 0, 3000).status_code == 200
+
+    # As if the next chunk landed on another process or after a restart
+    uploads._hashers.clear()
+    state = client.get(f"/api/uploads/{upload['id']}").get_json()
+    assert state["offset"] == 3000 and not state["complete"]
+
+    assert _put(client, upload, 3000, len(RECORDING)).get_json()["complete"]
+    assert db.session.get(UploadSession, upload["id"]).sha256 == hashlib.sha256(RECORDING).hexdigest()
+
+def test_out_of_order_chunk_is_rejected_with_offset(client):
+    upload = _start(client)
+    assert _put(client, upload, 0, 4096).status_code == 200
+
+    response = _put(client, upload, 8192, len(RECORDING))
+    assert response.status_code == 409
+    assert response.get_json()["offset"] == 4096
+
+    # Sending the same chunk twice is a conflict as well
+    response = _put(client, upload, 0, 4096)
+    assert response.status_code == 409
+    assert response.get_json()["offset"] == 4096
+
+def test_short_chunk_keeps_offset(app, client):
+    upload = _start(client)
+    session = db.session.get(UploadSession, upload["id"])
+
+    with pytest.raises(UploadInterrupted) as error:
+        write_chunk(session, 0, 4096, io.BytesIO(RECORDING[:1000]), app.config["UPLOAD_FOLDER"])
+    assert error.value.offset == 0
+    db.session.refresh(session)
+    assert session.received == 0
+
+    # The retried chunk overwrites the partial bytes and the final hash is unaffected
+    assert _put(client, upload, 0, len(RECORDING)).get_json()["complete"]
+    assert db.session.get(UploadSession, upload["id"]).sha256 == hashlib.sha256(RECORDING).hexdigest()
+
+def test_hash_state_cache_is_bounded(client):
+    uploads._hashers.clear()
+    for _ in range(uploads.MAX_CACHED_HASHERS + 5):
+        assert _put(client, _start(client), 0, 100).status_code == 200
+    assert len(uploads._hashers) == uploads.MAX_CACHED_HASHERS
+
+def test_abandoned_uploads_expire(app, client):
+    abandoned = _start(client)
+    assert _put(client, abandoned, 0, 100).status_code == 200
+    finished = _start(client)
+    assert _put(client, finished, 0, len(RECORDING)).status_code == 200
+
+    long_ago = datetime.utcnow() - timedelta(days=2)
+    UploadSession.query.update({UploadSession.updated_at: long_ago})
+    db.session.commit()
+    stored_filename = db.session.get(UploadSession, abandoned["id"]).stored_filename
+
+    assert expire_upload_sessions(3600, app.config["UPLOAD_FOLDER"]) == 1
+    assert db.session.get(UploadSession, abandoned["id"]) is None
+    assert abandoned["id"] not in uploads._hashers
+    assert not os.path.exists(os.path.join(app.config["UPLOAD_FOLDER"], stored_filename))
+    # Completed uploads belong to their meeting and are kept
+    assert db.session.get(UploadSession, finished["id"]) is not None
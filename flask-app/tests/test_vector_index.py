@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from app import db
+import vector_index
+from models import Meeting, TranscriptChunk
+from vector_index import HashingEmbedder, VectorIndex, embed_meeting, related_meetings, search_chunks
+
+BUDGET = ("We went through the budget for next quarter. Marketing spend goes up while travel is cut. "
+          "Finance wants the revised budget spreadsheet by Friday.")
+CLUSTER = ("The kubernetes cluster upgrade is blocked on the ingress controller. "
+           "We will drain the old nodes once the cluster runs the new version.")
+
+@pytest.fixture
+def hashing_index(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "EMBEDDER", "hashing")
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX_PATH", str(tmp_path / "vector_index"))
+    monkeypatch.setattr(vector_index, "_index", None)
+    return tmp_path / "vector_index"
+
+def _meeting(title, transcript):
+    meeting = Meeting(title=title, recording_filename="a.mp3", original_filename="a.mp3", processed=True, status="done")
+    meeting.transcript = transcript
+    db.session.add(meeting)
+    db.session.commit()
+    return meeting.id
+
+def test_question_finds_the_matching_passage(hashing_index):
+    budget = _meeting("Planning", BUDGET)
+    cluster = _meeting("Platform sync", CLUSTER)
+    assert embed_meeting(budget) == 1
+    assert embed_meeting(cluster) == 1
+
+    hits = search_chunks("when is the kubernetes cluster upgrade", k=2)
+    assert [hit["meeting_id"] for hit in hits] == [cluster, budget]
+    assert hits[0]["meeting_title"] == "Platform sync"
+    assert hits[0]["score"] > hits[1]["score"]
+
+def test_reindexed_meeting_replaces_its_passages(hashing_index):
+    cluster = _meeting("Platform sync", CLUSTER)
+    embed_meeting(cluster)
+    first_rows = {chunk.vector_row for chunk in TranscriptChunk.query.filter_by(meeting_id=cluster)}
+
+    meeting = db.session.get(Meeting, cluster)
+    meeting.transcript = BUDGET
+    db.session.commit()
+    embed_meeting(cluster)
+
+    chunks = TranscriptChunk.query.filter_by(meeting_id=cluster).all()
+    assert len(chunks) == 1 and chunks[0].vector_row not in first_rows
+    # The old vector is still in the file but no longer matches a passage
+    hits = search_chunks("kubernetes cluster upgrade", k=5)
+    assert [hit["meeting_id"] for hit in hits] == [cluster]
+    assert "budget" in hits[0]["text"]
+
+def test_related_meetings_skip_the_meeting_itself(hashing_index):
+    first = _meeting("Platform sync", CLUSTER)
+    second = _meeting("Platform follow-up", CLUSTER + " The ingress fix is merged.")
+    other = _meeting("Planning", BUDGET)
+    for meeting_id in (first, second, other):
+        embed_meeting(meeting_id)
+
+    related = related_meetings(first, limit=2)
+    assert [meeting["id"] for meeting in related] == [second, other]
+
+def test_index_reopens_from_disk(hashing_index):
+    embed_meeting(_meeting("Platform sync", CLUSTER))
+    embed_meeting(_meeting("Planning", BUDGET))
+    query = HashingEmbedder().embed(["cluster upgrade"])
+    before = vector_index.get_vector_index().search(query, k=2)
+
+    reopened = VectorIndex(str(hashing_index), HashingEmbedder())
+    assert len(reopened) == 2
+    assert reopened.search(query, k=2) == before
+
+    with pytest.raises(ValueError):
+        VectorIndex(str(hashing_index), HashingEmbedder(dimensions=64))
+
+def test_append_drops_a_partial_row(hashing_index):
+    index = VectorIndex(str(hashing_index), HashingEmbedder())
+    vectors = HashingEmbedder().embed(["first passage", "second passage"])
+    assert index.append(vectors[:1]) == 0
+
+    # As if a process died half way through writing a row
+    with open(index.vectors_path, "ab") as f:
+        f.write(b"\0" * (index.row_bytes // 2))
+    assert len(index) == 1
+
+    assert index.append(vectors[1:]) == 1
+    assert os.path.getsize(index.vectors_path) == 2 * index.row_bytes
+    assert index.search(vectors[1:], k=1)[0][0][0] == 1
@@ -0,0 +1,57 @@
+import os
+import zlib
+import logging
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Codec for newly written text: zstd when the zstandard package is installed, zlib otherwise.
+# Each stored value records its codec, so the setting can change without rewriting old rows.
+TEXT_CODEC = os.environ.get("TEXT_CODEC", "zstd" if zstandard else "zlib")
+TEXT_COMPRESSION_LEVEL = int(os.environ.get("TEXT_COMPRESSION_LEVEL", 9 if TEXT_CODEC == "zstd" else 6))
+
+if TEXT_CODEC == "zstd" and zstandard is None:
+    logger.warning("TEXT_CODEC is zstd but the zstandard package is not installed; using zlib")
+    TEXT_CODEC = "zlib"
+
+def compress_text(value):
+    """
+    Compress a string with the configured codec.
+
+    Args:
+        value (str): The text
+
+    Returns:
+        tuple: (codec, compressed bytes)
+    """
+    raw = value.encode("utf-8")
+    if TEXT_CODEC == "zstd":
+        return "zstd", zstandard.ZstdCompressor(level=TEXT_COMPRESSION_LEVEL).compress(raw)
+    if TEXT_CODEC == "zlib":
+        return "zlib", zlib.compress(raw, TEXT_COMPRESSION_LEVEL)
+    return "none", raw
+
+def decompress_text(codec, data):
+    """
+    Reverse compress_text.
+
+    Args:
+        codec (str): The codec recorded with the data
+        data (bytes): The compressed bytes
+
+    Returns:
+        str: The text
+    """
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Text was stored with zstd; install the zstandard package to read it")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        raw = zlib.decompress(data)
+    else:
+        raw = data
+    return bytes(raw).decode("utf-8")
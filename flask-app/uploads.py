@@ -0,0 +1,217 @@
+import os
+import re
+import uuid
+import hashlib
+import logging
+import threading
+import click
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app import db
+from models import UploadSession
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 1024 * 1024
+MAX_CACHED_HASHERS = 32  # Hash states kept in memory; an evicted one is rebuilt from disk on the next chunk
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+# Running SHA-256 state per upload, keyed by session ID: (offset hashed so far, hasher).
+# hashlib objects cannot be stored in the database, so a chunk that lands on
+# another process (or after a restart) rebuilds the state from the bytes on disk.
+# Least recently used first, so abandoned uploads fall out once MAX_CACHED_HASHERS is reached.
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+class UploadConflict(Exception):
+    """Raised when a chunk does not start where the upload currently ends."""
+
+    def __init__(self, offset):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+class UploadInterrupted(Exception):
+    """Raised when the request body ends before the chunk is complete; the upload stays at offset."""
+
+    def __init__(self, offset):
+        super().__init__(f"Chunk ended early; resume the upload from offset {offset}")
+        self.offset = offset
+
+def parse_content_range(header):
+    """
+    Parse a Content-Range request header.
+
+    Args:
+        header (str): e.g. "bytes 0-8388607/52428800"
+
+    Returns:
+        tuple: (start, end, total) with end inclusive, or None if the header is malformed
+    """
+    match = _CONTENT_RANGE.match(header or "")
+    if not match:
+        return None
+    start, end, total = (int(group) for group in match.groups())
+    if start > end or end >= total:
+        return None
+    return start, end, total
+
+def create_upload_session(title, filename, size, upload_folder):
+    """
+    Start a chunked upload and reserve its file in the upload folder.
+
+    Args:
+        title (str): Meeting title
+        filename (str): Sanitized original filename
+        size (int): Total size of the recording in bytes
+        upload_folder (str): Directory the recording is written to
+
+    Returns:
+        UploadSession: The new session (added to the current DB session, not committed)
+    """
+    file_extension = filename.rsplit('.', 1)[1].lower()
+    stored_filename = f"{uuid.uuid4()}.{file_extension}"
+    open(os.path.join(upload_folder, stored_filename), "wb").close()
+
+    upload = UploadSession(
+        title=title,
+        original_filename=filename,
+        stored_filename=stored_filename,
+        total_size=size
+    )
+    db.session.add(upload)
+    return upload
+
+def write_chunk(upload, start, length, stream, upload_folder):
+    """
+    Write one chunk of an upload straight to disk, hashing it on the way.
+
+    Memory use is bounded by BLOCK_SIZE regardless of chunk or file size.
+
+    Args:
+        upload (UploadSession): The upload being written
+        start (int): Offset of the chunk
+        length (int): Size of the chunk in bytes
+        stream: Readable request body
+        upload_folder (str): Directory holding the upload's file
+
+    Returns:
+        bool: True if this chunk completed the upload; upload.sha256 is then
+        set and the caller must commit
+
+    Raises:
+        UploadConflict: If start is not the upload's current offset
+        UploadInterrupted: If the stream ends before length bytes were read
+    """
+    if start != upload.received:
+        raise UploadConflict(upload.received)
+
+    path = os.path.join(upload_folder, upload.stored_filename)
+    hasher = _take_hasher(upload.id, start, path)
+
+    with open(path, "r+b") as f:
+        f.seek(start)
+        remaining = length
+        while remaining:
+            block = stream.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                # The hasher has seen a partial chunk, so it is dropped; the client resumes from upload.received
+                raise UploadInterrupted(upload.received)
+            f.write(block)
+            hasher.update(block)
+            remaining -= len(block)
+
+    # Only one request may advance the offset, even if the same chunk is sent twice concurrently
+    end = start + length
+    result = db.session.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload.id, UploadSession.received == start)
+        .values(received=end, updated_at=datetime.utcnow())
+    )
+    if result.rowcount != 1:
+        db.session.rollback()
+        db.session.refresh(upload)
+        raise UploadConflict(upload.received)
+
+    if end == upload.total_size:
+        # Left uncommitted so the caller can commit it together with the queued meeting
+        upload.received = end
+        upload.sha256 = hasher.hexdigest()
+        return True
+
+    db.session.commit()
+
+    with _hashers_lock:
+        _hashers[upload.id] = (end, hasher)
+        while len(_hashers) > MAX_CACHED_HASHERS:
+            _hashers.popitem(last=False)
+    return False
+
+def expire_upload_sessions(max_age, upload_folder):
+    """
+    Delete unfinished uploads that have not received a chunk for max_age seconds, with their partial files.
+
+    Args:
+        max_age (int): Seconds since the last chunk after which an upload is abandoned
+        upload_folder (str): Directory holding the partial files
+
+    Returns:
+        int: Number of uploads removed
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+    expired = UploadSession.query.filter(
+        UploadSession.meeting_id.is_(None),
+        UploadSession.updated_at < cutoff
+    ).all()
+    for upload in expired:
+        db.session.delete(upload)
+    db.session.commit()
+
+    for upload in expired:
+        with _hashers_lock:
+            _hashers.pop(upload.id, None)
+        try:
+            os.remove(os.path.join(upload_folder, upload.stored_filename))
+        except FileNotFoundError:
+            pass
+    if expired:
+        logger.info(f"Removed {len(expired)} abandoned uploads")
+    return len(expired)
+
+def _take_hasher(upload_id, offset, path):
+    with _hashers_lock:
+        entry = _hashers.pop(upload_id, None)
+    if entry and entry[0] == offset:
+        return entry[1]
+
+    # Rebuild the running hash from the bytes already received
+    logger.debug(f"Rebuilding hash state for upload {upload_id} at offset {offset}")
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        remaining = offset
+        while remaining:
+            block = f.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+def register_commands(app):
+    """
+    Register the upload maintenance command line tools.
+
+    Args:
+        app: The Flask application
+    """
+
+    @app.cli.command("expire-uploads")
+    @click.option("--max-age", type=int, default=None, help="Seconds without a chunk before an upload is "
+                                                            "abandoned (default: UPLOAD_SESSION_TTL)")
+    def expire_uploads_command(max_age):
+        """Delete abandoned chunked uploads and their partial files."""
+        if max_age is None:
+            max_age = app.config["UPLOAD_SESSION_TTL"]
+        removed = expire_upload_sessions(max_age, app.config["UPLOAD_FOLDER"])
+        click.echo(f"Removed {removed} abandoned upload(s)")
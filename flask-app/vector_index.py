@@ -0,0 +1,462 @@
+import os
+import re
+import json
+import zlib
+import logging
+import threading
+from contextlib import contextmanager
+import click
+from sqlalchemy import delete, insert
+from app import db
+from models import Meeting, TranscriptChunk
+from meeting_assistant import count_tokens, split_transcript
+from openai_client import call_with_retries, get_client
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+logger = logging.getLogger(__name__)
+
+# Vector index settings
+VECTOR_INDEX_PATH = os.environ.get("VECTOR_INDEX_PATH", os.path.join(os.getcwd(), "vector_index"))
+# openai (every processed meeting is billed for embeddings), hashing (local and free, but it only
+# matches shared words; for tests and offline installs) or none
+EMBEDDER = os.environ.get("EMBEDDER", "openai")
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSIONS = int(os.environ.get("EMBEDDING_DIMENSIONS", 256))
+EMBEDDING_BATCH_SIZE = 256  # Texts per embeddings request
+VECTOR_CHUNK_TOKENS = int(os.environ.get("VECTOR_CHUNK_TOKENS", 200))
+SEARCH_BLOCK_ROWS = 65536  # Vectors scored per matrix multiply, bounding memory per search
+
+_WORD = re.compile(r"\w+")
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder: signed feature hashing of words and word pairs.
+
+    Needs no network or model, and the same text always gets the same vector
+    in every process, so it suits tests and offline installs. It matches
+    shared vocabulary rather than meaning.
+    """
+    name = "hashing"
+
+    def __init__(self, dimensions=EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, digest % self.dimensions] += 1.0 if digest & 0x80000000 else -1.0
+        return _normalize(vectors)
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API, shortened to the configured number of dimensions."""
+    name = "openai"
+
+    def __init__(self, model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS):
+        self.model = model
+        self.dimensions = dimensions
+
+    def embed(self, texts):
+        vectors = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+            response = call_with_retries(
+                lambda: get_client().embeddings.create(model=self.model, input=batch, dimensions=self.dimensions),
+                "embeddings",
+                tokens=sum(count_tokens(text) for text in batch)
+            )
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(texts), self.dimensions))
+
+_EMBEDDERS = {"hashing": HashingEmbedder, "openai": OpenAIEmbedder}
+
+def get_embedder():
+    """The configured embedder, or None if EMBEDDER is "none" or NumPy is missing."""
+    if np is None or EMBEDDER == "none":
+        return None
+    return _EMBEDDERS[EMBEDDER]()
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+_append_lock = threading.Lock()
+
+@contextmanager
+def _exclusive_lock(path):
+    """
+    Hold an exclusive lock on path, shared by every process using the index.
+
+    Uses flock on Unix and msvcrt.locking on Windows; where neither exists
+    only threads of this process are kept apart.
+    """
+    with _append_lock, open(path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+            return
+        if msvcrt is None:
+            yield
+            return
+        lock_file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                continue  # LK_LOCK gives up after about 10 seconds; keep waiting
+        try:
+            yield
+        finally:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+class VectorIndex:
+    """
+    An append-only file of unit-length float32 vectors, searched through a memory map.
+
+    Row n of the file is the vector of the TranscriptChunk with vector_row n.
+    Appends take an exclusive file lock, so any number of processes can add
+    to the index; readers map whatever complete rows the file holds and
+    remap it when it grows. Vectors of re-embedded or deleted meetings stay
+    in the file but no longer match a chunk, and are skipped.
+    """
+
+    def __init__(self, path, embedder):
+        """
+        Args:
+            path (str): Directory holding the index
+            embedder: Produces the vectors; its name and dimensions are recorded with the index
+        """
+        self.path = path
+        self.embedder = embedder
+        self.dimensions = embedder.dimensions
+        self.row_bytes = self.dimensions * 4
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self._map = None
+        self._mapped_rows = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        info_path = os.path.join(path, "index.json")
+        info = {"embedder": embedder.name, "dimensions": self.dimensions}
+        if os.path.exists(info_path):
+            with open(info_path) as f:
+                existing = json.load(f)
+            if existing != info:
+                raise ValueError(
+                    f"Vector index at {path} was built with {existing}, not {info}; "
+                    f"rebuild it with: flask index-vectors --rebuild"
+                )
+        else:
+            with open(info_path, "w") as f:
+                json.dump(info, f)
+
+    def __len__(self):
+        return os.path.getsize(self.vectors_path) // self.row_bytes if os.path.exists(self.vectors_path) else 0
+
+    def append(self, vectors):
+        """
+        Add vectors to the end of the index.
+
+        Args:
+            vectors (ndarray): (n, dimensions) unit-length float32 vectors
+
+        Returns:
+            int: Row of the first appended vector; the rest follow in order
+        """
+        data = np.ascontiguousarray(vectors, dtype=np.float32).tobytes()
+        with _exclusive_lock(os.path.join(self.path, "index.lock")):
+            with open(self.vectors_path, "ab") as f:
+                size = f.tell()
+                first_row = size // self.row_bytes
+                if size % self.row_bytes:
+                    # An earlier append was cut short; drop its partial row so later rows stay aligned
+                    logger.warning(f"Discarding a partial row at the end of {self.vectors_path}")
+                    f.truncate(first_row * self.row_bytes)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        return first_row
+
+    def vectors(self):
+        """A read-only memory map of every complete row, remapped when the file has grown."""
+        rows = len(self)
+        with self._lock:
+            if rows != self._mapped_rows:
+                self._map = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dimensions)) if rows else None
+                self._mapped_rows = rows
+            return self._map
+
+    def search(self, queries, k=10):
+        """
+        Find the nearest rows to each query by cosine similarity.
+
+        All queries are scored against each block of the index in one
+        matrix multiply, and only the running top k per query is kept.
+
+        Args:
+            queries (ndarray): (q, dimensions) unit-length query vectors
+            k (int): Results per query
+
+        Returns:
+            list: For each query, a list of (row, score), best first
+        """
+        vectors = self.vectors()
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if vectors is None:
+            return [[] for _ in queries]
+
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+            scores = queries @ vectors[start:start + SEARCH_BLOCK_ROWS].T
+            take = min(k, scores.shape[1])
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        return [
+            [(int(row), float(score)) for row, score in zip(rows[ranking], scores[ranking])]
+            for rows, scores, ranking in zip(best_rows, best_scores, order)
+        ]
+
+_index = None
+_index_lock = threading.Lock()
+
+def _reset_after_fork():
+    global _index, _index_lock, _append_lock
+    _index = None
+    _index_lock = threading.Lock()
+    _append_lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):  # Not available on Windows, which cannot fork
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_vector_index():
+    """This process's VectorIndex, or None when no embedder is configured."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                embedder = get_embedder()
+                if embedder is None:
+                    return None
+                _index = VectorIndex(VECTOR_INDEX_PATH, embedder)
+    return _index
+
+def chunk_transcript(transcript, segments=None, max_tokens=VECTOR_CHUNK_TOKENS):
+    """
+    Split a transcript into passages for embedding.
+
+    With timestamped segments, consecutive segments are grouped so each
+    passage knows when in the meeting it was said.
+
+    Args:
+        transcript (str): The transcript text, used when there are no segments
+        segments (list): Optional {"start", "end", "text"} dicts
+        max_tokens (int): Token budget per passage
+
+    Returns:
+        list: {"start", "end", "text"} dicts; start and end are None without segments
+    """
+    if not segments:
+        return [{"start": None, "end": None, "text": text} for text in split_transcript(transcript or "", max_tokens) if text.strip()]
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for segment in segments:
+        text = (segment.get("text") or "").strip()
+        if not text:
+            continue
+        tokens = count_tokens(text)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current = []
+            current_tokens = 0
+        current.append(segment)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return [
+        {"start": group[0]["start"], "end": group[-1]["end"], "text": " ".join(segment["text"].strip() for segment in group)}
+        for group in chunks
+    ]
+
+def embed_meeting(meeting_id):
+    """
+    Embed a processed meeting's transcript into the vector index, replacing earlier chunks.
+
+    Failures are logged rather than raised: a meeting without vectors is
+    still complete, and index-vectors picks it up later.
+
+    Args:
+        meeting_id (str): The ID of the meeting
+
+    Returns:
+        int: Number of chunks indexed
+    """
+    try:
+        index = get_vector_index()
+        if index is None:
+            return 0
+        meeting = Meeting.query.get(meeting_id)
+        segments = json.loads(meeting.transcript_segments) if meeting.transcript_segments else None
+        chunks = chunk_transcript(meeting.transcript, segments)
+        db.session.close()
+
+        vectors = index.embedder.embed([chunk["text"] for chunk in chunks]) if chunks else None
+        first_row = index.append(vectors) if chunks else 0
+
+        db.session.execute(delete(TranscriptChunk).where(TranscriptChunk.meeting_id == meeting_id))
+        if chunks:
+            db.session.execute(insert(TranscriptChunk), [
+                {
+                    "meeting_id": meeting_id,
+                    "vector_row": first_row + position,
+                    "position": position,
+                    "start": chunk["start"],
+                    "end": chunk["end"],
+                    "text": chunk["text"]
+                }
+                for position, chunk in enumerate(chunks)
+            ])
+        db.session.commit()
+        return len(chunks)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to embed meeting {meeting_id}: {str(e)}", exc_info=True)
+        return 0
+
+def _load_chunks(rows):
+    """The chunks (with their meetings) at the given vector rows; rows with no chunk are dropped."""
+    if not rows:
+        return {}
+    results = db.session.query(TranscriptChunk, Meeting.title, Meeting.created_at).join(
+        Meeting, Meeting.id == TranscriptChunk.meeting_id
+    ).filter(TranscriptChunk.vector_row.in_(rows)).all()
+    return {chunk.vector_row: (chunk, title, created_at) for chunk, title, created_at in results}
+
+def search_chunks(question, k=8):
+    """
+    The transcript passages most similar to a question.
+
+    Args:
+        question (str): Free text
+        k (int): Number of passages
+
+    Returns:
+        list: Passage dicts (see TranscriptChunk.to_dict) with meeting_title and score, best first
+    """
+    index = get_vector_index()
+    if index is None:
+        return []
+    hits = index.search(index.embedder.embed([question]), k)[0]
+    chunks = _load_chunks([row for row, _ in hits])
+    return [
+        dict(chunks[row][0].to_dict(), meeting_title=chunks[row][1],
+             meeting_created_at=chunks[row][2].isoformat(), score=score)
+        for row, score in hits if row in chunks
+    ]
+
+def related_meetings(meeting_id, limit=5):
+    """
+    Meetings whose transcripts are closest to the given meeting's.
+
+    The meeting is represented by the mean of its chunk vectors; other
+    meetings are ranked by their best-matching chunk.
+
+    Args:
+        meeting_id (str): The ID of the meeting
+        limit (int): Number of meetings
+
+    Returns:
+        list: Dicts with id, title, created_at, score and the best-matching passage
+    """
+    index = get_vector_index()
+    if index is None:
+        return []
+    rows = [row for (row,) in db.session.query(TranscriptChunk.vector_row).filter(TranscriptChunk.meeting_id == meeting_id)]
+    vectors = index.vectors()
+    rows = [row for row in rows if vectors is not None and row < len(vectors)]
+    if not rows:
+        return []
+
+    query = _normalize(np.asarray(vectors[rows]).mean(axis=0, keepdims=True))
+    # Over-fetch passages, since several may come from the same meeting
+    hits = index.search(query, (limit + 1) * 10)[0]
+    chunks = _load_chunks([row for row, _ in hits])
+
+    related = {}
+    for row, score in hits:
+        if row not in chunks or chunks[row][0].meeting_id == meeting_id or chunks[row][0].meeting_id in related:
+            continue
+        chunk, title, created_at = chunks[row]
+        related[chunk.meeting_id] = {
+            "id": chunk.meeting_id,
+            "title": title,
+            "created_at": created_at.isoformat(),
+            "score": score,
+            "passage": chunk.to_dict()
+        }
+        if len(related) == limit:
+            break
+    return list(related.values())
+
+def register_commands(app):
+    """
+    Register the vector index command line tools.
+
+    Args:
+        app: The Flask application
+    """
+
+    @app.cli.command("index-vectors")
+    @click.option("--rebuild", is_flag=True, help="Discard the index and embed every meeting again "
+                                                  "(needed after changing EMBEDDER or EMBEDDING_DIMENSIONS)")
+    def index_vectors_command(rebuild):
+        """Embed processed meetings that are not in the vector index yet."""
+        global _index
+        if get_embedder() is None:
+            raise click.ClickException("No embedder configured (set EMBEDDER and install numpy)")
+
+        if rebuild:
+            for name in ("vectors.f32", "index.json"):
+                if os.path.exists(os.path.join(VECTOR_INDEX_PATH, name)):
+                    os.remove(os.path.join(VECTOR_INDEX_PATH, name))
+            _index = None
+            db.session.execute(delete(TranscriptChunk))
+            db.session.commit()
+
+        indexed = db.session.query(TranscriptChunk.meeting_id).distinct()
+        meeting_ids = [meeting_id for (meeting_id,) in db.session.query(Meeting.id).filter(
+            Meeting.status == "done", Meeting.id.not_in(indexed)
+        )]
+        total = 0
+        for count, meeting_id in enumerate(meeting_ids, 1):
+            total += embed_meeting(meeting_id)
+            if count % 100 == 0:
+                click.echo(f"Embedded {count}/{len(meeting_ids)} meetings")
+        click.echo(f"Embedded {len(meeting_ids)} meeting(s) as {total} chunk(s)")
@@ -0,0 +1,17 @@
+import os
+import signal
+
+# Standalone worker process. Run the web app with WORKER_COUNT=0 and scale
+# processing by starting as many of these as needed.
+os.environ["WORKER_COUNT"] = os.environ.get("WORKER_THREADS", "2")
+
+from app import configure_logging, create_app, start_workers
+
+if __name__ == "__main__":
+    configure_logging()
+    pool = start_workers(create_app())
+    signal.signal(signal.SIGTERM, lambda signum, frame: pool.stop())
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pool.stop()